@@ -0,0 +1,75 @@
+"""
+Time how long a build takes to turn into the xml sent to luaPoB for each calculation, for builds of different sizes.
+  build_to_xml_text() is what the calc worker is sent. save_to_xml() (without a filename) is the same text parsed by ElementTree,
+  as used for saving files. Neither is the ElementTree serializer that build_to_xml_text() replaced, so this isn't a before and after.
+
+Usage: python benchmark_calc_xml.py [build.xml]
+  With no build, builds of increasing size are made up from copies of a few items, socket groups and specs.
+"""
+
+from copy import deepcopy
+import sys
+import time
+
+sys.path.insert(1, "../src/")
+sys.path.insert(1, "../src/PoB")
+
+from PoB.constants import empty_build, empty_gem_dict, empty_socket_group_dict, empty_spec_dict
+from PoB.pob_xml import build_to_xml_text, load_from_xml, load_item_from_xml, save_to_xml
+
+item_text = """Rarity: RARE
+Doom Knuckle
+Coral Ring
+Item Level: 84
+LevelReq: 60
+Implicits: 1
++25 to maximum Life
++40 to maximum Life
++30% to Fire Resistance
++20% to Cold Resistance
+"""
+
+
+def make_build(size) -> dict:
+    """
+    :param size: int: how many items, socket groups (of 6 gems) and item sets. One spec per 10.
+    :return: dict: a build.
+    """
+    build = deepcopy(empty_build)
+    json_PoB = build["PathOfBuilding"]
+    for idx in range(size):
+        json_PoB["Items"]["Items"].append(load_item_from_xml(item_text, idx + 1))
+        json_PoB["Items"]["ItemSets"].append({"title": f"Set {idx}", "id": idx, "useSecondWeaponSet": False, "Slots": {}})
+        sg = deepcopy(empty_socket_group_dict)
+        sg["Gems"] = [dict(deepcopy(empty_gem_dict), variantId="Arc", skillId="Arc", nameSpec="Arc") for i in range(6)]
+        json_PoB["Skills"]["SkillSets"][0]["SGroups"].append(sg)
+        if idx % 10 == 0:
+            json_PoB["Tree"]["Specs"].append(deepcopy(empty_spec_dict))
+    return build
+
+
+def time_it(function, *args) -> float:
+    """
+    :return: float: the best of 5 runs, in ms.
+    """
+    best = None
+    for run in range(5):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = best is None and elapsed or min(best, elapsed)
+    return best
+
+
+if len(sys.argv) > 1:
+    builds = [(sys.argv[1], load_from_xml(sys.argv[1]))]
+else:
+    builds = [(f"size {size}", make_build(size)) for size in (0, 10, 50, 200, 1000)]
+
+print(f"{'build':>20} {'xml KB':>8} {'text ms':>9} {'text+parse ms':>15}")
+for name, build in builds:
+    text = build_to_xml_text(build, True)
+    print(
+        f"{name:>20} {len(text.encode('utf8')) / 1024:8.1f} {time_it(build_to_xml_text, build, True):9.2f} "
+        f"{time_it(save_to_xml, None, build, True):15.2f}"
+    )
@@ -31,6 +31,7 @@ from PoB.constants import (
 )
 from PoB.settings import Settings
 from PoB.tree import Tree
+from PoB.tree_loader import TreeLoader
 from PoB.spec import Spec
 from PoB.pob_file import read_json, write_json
 from PoB.pob_xml import read_v1_custom_mods, read_xml, write_xml
@@ -59,6 +60,8 @@ class Build:
         # An dict of tree versions used in the build. Load the default tree first.
         self.trees = {_VERSION_str: Tree(self.settings, _VERSION_str)}
         self.current_tree = self.trees.get(_VERSION_str)
+        # Loads other tree versions in the background
+        self.tree_loader = TreeLoader(self.settings)
 
         # list of Spec() in this build
         self.specs = []
@@ -407,6 +410,10 @@ class Build:
         self.specs.clear()
         for spec in self.json_tree["Specs"]:
             self.specs.append(Spec(self, spec))
+            # Start loading any other tree versions now, so they are likely ready when change_tree() wants them
+            version = self.specs[-1].treeVersion
+            if self.trees.get(version, None) is None and not self.tree_loader.loading(version):
+                self.tree_loader.load(version, self.tree_loaded)
         self.current_spec = self.specs[0]
 
         # new
@@ -523,9 +530,9 @@ class Build:
         new_spec = self.specs[tree_id]
         different_version = self.current_spec.treeVersion != new_spec.treeVersion
         # print(f"change_tree: {tree_id=}, {self.current_spec.treeVersion=}, {new_spec.treeVersion}")
-        # Check if this version is loaded
+        # Check if this version is loaded. It has usually been started in the background by new()
         if self.trees.get(new_spec.treeVersion, None) is None:
-            self.trees[new_spec.treeVersion] = Tree(self.settings, new_spec.treeVersion)
+            self.trees[new_spec.treeVersion] = self.tree_loader.wait(new_spec.treeVersion)
         self.current_tree = self.trees[new_spec.treeVersion]
 
         self.activeSpec: int = tree_id
@@ -533,6 +540,15 @@ class Build:
         self.count_allocated_nodes()
         return different_version
 
+    def tree_loaded(self, tree: Tree):
+        """
+        A tree has finished loading in the background. Keep it for when a spec needs it.
+
+        :param tree: Tree:
+        :return: N/A
+        """
+        self.trees[tree.version] = tree
+
     def check_socket_group_for_an_active_gem(self, _sg):
         """
         Check a socket group and if the first gem is not an active gem, find an active gem in the group
@@ -0,0 +1,180 @@
+"""
+BuildIndex Class
+
+Remembers the class, ascendancy and level of builds (see read_build_header()), so listing a folder of builds doesn't open every file.
+
+Entries are by the file's full path, and are only used while the file's size and modification time are unchanged.
+The index is kept in build_index.pkl, next to settings.json, between runs.
+
+Files that aren't in the index are read by a background thread. The results are handed back in the main thread, a batch at a time,
+  so a list of thousands of builds fills in as they are read, rather than after all of them.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+
+from PySide6.QtCore import QTimer
+
+from PoB.pob_file import read_build_header, read_pickle, write_pickle
+from PoB.settings import Settings
+from PoB.utils import _debug
+
+# How many results are handed back each time the timer runs, so the window stays responsive.
+results_per_batch = 100
+
+
+def file_stamp(path) -> tuple:
+    """
+    :param path: str: full path of a file.
+    :return: tuple: (modification time in ns, size), or None if the file can't be found.
+    """
+    try:
+        stat = os.stat(path)
+    # parent of IOError, OSError *and* WindowsError where available
+    except EnvironmentError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class BuildIndex:
+    def __init__(self, _settings: Settings) -> None:
+        """
+        BuildIndex
+        :param _settings: A pointer to the settings
+        """
+        self.settings = _settings
+        self.index_file_path = Path(self.settings._exe_dir, "build_index.pkl")
+        # {full path: (mtime_ns, size, header)}. A header of None is a file that isn't a build, so it isn't read again either.
+        self.entries = read_pickle(self.index_file_path)
+        if type(self.entries) is not dict:
+            self.entries = {}
+        # True when entries has changed since it was last saved.
+        self.changed = False
+
+        # One thread. Reading files is mostly waiting on the disk, so more would only fight over it.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="BuildIndex")
+        self.future = None
+        # Each scan() gets a new id. The thread gives up on an old scan, and its results are only remembered, not handed on.
+        self.scan_id = 0
+        # function(path: str, header: dict) for the current scan.
+        self.on_header = None
+        # (scan_id, path, stamp, header) from the thread, waiting for the main thread. A deque's append and popleft are thread safe.
+        self.results = deque()
+        # Hands results back. Only runs while a scan is running.
+        self.timer = QTimer()
+        self.timer.setInterval(50)
+        self.timer.timeout.connect(self.check_results)
+
+    def cached(self, path) -> tuple:
+        """
+        Look a file up, without reading it.
+        :param path: str: the file. Relative paths are relative to the current directory.
+        :return: tuple: (bool: True if the index is up to date for this file, dict: the header or None)
+        """
+        full_path = os.path.abspath(path)
+        entry = self.entries.get(full_path, None)
+        if entry is not None and entry[:2] == file_stamp(full_path):
+            return True, entry[2]
+        return False, None
+
+    def header(self, path) -> dict:
+        """
+        Get a file's header, reading the file now if the index isn't up to date for it. For a few files, EG: the recent builds.
+        :param path: str: the file. Relative paths are relative to the current directory.
+        :return: dict: see read_build_header(). None if it isn't a build.
+        """
+        found, header = self.cached(path)
+        if not found:
+            full_path = os.path.abspath(path)
+            stamp = file_stamp(full_path)
+            header = stamp is not None and read_build_header(full_path) or None
+            self.remember(full_path, stamp, header)
+        return header
+
+    def remember(self, full_path, stamp, header):
+        """
+        :param full_path: str:
+        :param stamp: tuple: from file_stamp(). Nothing is remembered if None.
+        :param header: dict: from read_build_header().
+        :return: N/A
+        """
+        if stamp is not None:
+            self.entries[full_path] = (*stamp, header)
+            self.changed = True
+
+    def scan(self, paths, on_header):
+        """
+        Read the headers of files in the background, replacing any scan that is still running.
+        :param paths: list: the files. Relative paths are relative to the current directory.
+        :param on_header: function(path: str (full path), header: dict or None). Called from the main thread for each file.
+        :return: N/A
+        """
+        self.cancel()
+        if not paths:
+            return
+        self.on_header = on_header
+        self.future = self.executor.submit(self.read_headers, self.scan_id, [os.path.abspath(path) for path in paths])
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def read_headers(self, scan_id, full_paths):
+        """
+        Run in the thread. Read the files, stopping if another scan starts.
+        :param scan_id: int: the scan this is for.
+        :param full_paths: list: the files.
+        :return: N/A
+        """
+        _debug(f"BuildIndex: reading {len(full_paths)} files")
+        for full_path in full_paths:
+            if scan_id != self.scan_id:
+                return
+            stamp = file_stamp(full_path)
+            header = stamp is not None and read_build_header(full_path) or None
+            self.results.append((scan_id, full_path, stamp, header))
+
+    def check_results(self):
+        """
+        Called by self.timer. Remember what the thread has read and pass on the current scan's results.
+        :return: N/A
+        """
+        for i in range(min(len(self.results), results_per_batch)):
+            scan_id, full_path, stamp, header = self.results.popleft()
+            self.remember(full_path, stamp, header)
+            if scan_id == self.scan_id and self.on_header is not None:
+                self.on_header(full_path, header)
+        if not self.results and (self.future is None or self.future.done()):
+            self.timer.stop()
+            self.future = None
+            self.save()
+
+    def cancel(self):
+        """
+        Stop handing on results, EG: when the list they were for has gone. Anything already read is still remembered.
+        :return: N/A
+        """
+        self.scan_id += 1
+        self.on_header = None
+
+    def save(self):
+        """
+        Write the index, if it has changed.
+        :return: N/A
+        """
+        if self.changed:
+            write_pickle(self.index_file_path, self.entries)
+            self.changed = False
+
+    def stop(self):
+        """
+        Stop the thread and save the index.
+        :return: N/A
+        """
+        self.cancel()
+        self.timer.stop()
+        while self.results:
+            scan_id, full_path, stamp, header = self.results.popleft()
+            self.remember(full_path, stamp, header)
+        self.save()
+        self.executor.shutdown(wait=False, cancel_futures=True)
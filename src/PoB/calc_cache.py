@@ -0,0 +1,217 @@
+"""
+CalcCache Class
+
+Remembers the output of calculations, so a build that has been calculated before shows its stats straight away.
+EG: opening a build again, switching back to an earlier spec or item set, or undoing an edit.
+
+Entries are by key(): a hash of the parts of the build that calcs depend on (see canonical_build()), the output groups
+  asked for and the luaPoB version (see engine_version()), plus any deltas sent since the build (see fold_deltas()).
+  Dictionaries are written with sorted keys and node lists are sorted, so the order things were added in doesn't matter.
+The most recently used max_entries are kept in calc_cache.pkl, next to settings.json, between runs.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+
+from PoB.pob_file import read_pickle, write_pickle
+from PoB.settings import Settings
+from PoB.utils import _debug
+
+# Each entry is one mainOutput, about 50KB once pickled.
+max_entries = 200
+# EG: "{1234,5}" in masteryEffects and Sockets
+pair_regex = re.compile(r"\{(\d+),(\d+)\}")
+# Parts of the build that are written by calcs, or only change the UI.
+ignored_build_keys = ("PlayerStat", "MinionStat", "viewMode")
+ignored_set_keys = ("title", "URL")
+
+
+def sorted_numbers(value) -> list:
+    """
+    :param value: str: EG: "3,1,2". A list is sorted as is.
+    :return: list: EG: [1, 2, 3]
+    """
+    if type(value) is str:
+        return sorted(int(number) for number in value.split(",") if number.strip().isdigit())
+    return sorted(value or [])
+
+
+def sorted_pairs(value) -> list:
+    """
+    :param value: str: EG: "{3,1},{1,2}". Anything else is returned as is.
+    :return: list: EG: [(1, 2), (3, 1)]
+    """
+    if type(value) is str:
+        return sorted((int(a), int(b)) for a, b in pair_regex.findall(value))
+    return value
+
+
+def active_entry(entries, index) -> dict:
+    """
+    :param entries: list: EG: the Specs, ItemSets or SkillSets.
+    :param index: int: the active one.
+    :return: dict: a copy of the active entry without its title, or {} if there isn't one.
+    """
+    entry = 0 <= index < len(entries) and dict(entries[index]) or {}
+    for key in ignored_set_keys:
+        entry.pop(key, None)
+    return entry
+
+
+def canonical_build(build) -> dict:
+    """
+    The parts of a build that calcs depend on. Only the active spec, item set and skill set are used.
+    :param build: dict: the build's json. See Build().json
+    :return: dict
+    """
+    json_PoB = build["PathOfBuilding"]
+    tree = json_PoB["Tree"]
+    spec = active_entry(tree.get("Specs", []), tree.get("activeSpec", 0))
+    spec["nodes"] = sorted_numbers(spec.get("nodes", ""))
+    spec["masteryEffects"] = sorted_pairs(spec.get("masteryEffects", ""))
+    spec["Sockets"] = sorted_pairs(spec.get("Sockets", ""))
+    items = json_PoB["Items"]
+    skills = json_PoB["Skills"]
+    return {
+        "Build": dict((key, value) for key, value in json_PoB["Build"].items() if key not in ignored_build_keys),
+        "Spec": spec,
+        "Items": items.get("Items", []),
+        "ItemSet": active_entry(items.get("ItemSets", []), items.get("activeItemSet", 0)),
+        "Skills": dict((key, value) for key, value in skills.items() if key != "SkillSets"),
+        "SkillSet": active_entry(skills.get("SkillSets", []), skills.get("activeSkillSet", 0)),
+        "Config": json_PoB.get("Config", {}),
+        "Calcs": json_PoB.get("Calcs", {}).get("Input", {}),
+        "Party": json_PoB.get("Party", {}),
+    }
+
+
+def fold_deltas(state: dict, deltas: list):
+    """
+    Add deltas to what has changed since the last full build. Only the last change to each node, slot or input is kept,
+      so the state doesn't depend on the order of the changes.
+    :param state: dict: {"node:<id>" | "item:<slot>" | "config:<name>": the change}. Updated in place.
+    :param deltas: list of dicts from calc_worker's node_delta(), item_delta() or config_delta().
+    :return: N/A
+    """
+    for delta in deltas:
+        match delta["kind"]:
+            case "node":
+                state[f"node:{delta['id']}"] = (delta["alloc"], delta.get("effect", 0))
+            case "item":
+                state[f"item:{delta['slot']}"] = delta["itemId"]
+            case "config":
+                state[f"config:{delta['name']}"] = delta["value"]
+
+
+def engine_version(exe_dir) -> str:
+    """
+    A stamp of the luaPoB files, so outputs from another version of the calcs aren't used.
+    Lua PoB has no version number of its own in its src directory, so this is made from the files' count, sizes and times.
+    :param exe_dir: str: the program's directory. See Settings._exe_dir.
+    :return: str
+    """
+    files = [Path(exe_dir, "lua", "PoB_jit.lua")]
+    for dir_path, dir_names, file_names in os.walk(Path(exe_dir, "lua", "src")):
+        files.extend(Path(dir_path, file_name) for file_name in file_names)
+    count, size, newest = 0, 0, 0
+    for path in files:
+        try:
+            stat = os.stat(path)
+        # parent of IOError, OSError *and* WindowsError where available
+        except EnvironmentError:
+            continue
+        count += 1
+        size += stat.st_size
+        newest = max(newest, stat.st_mtime_ns)
+    return f"{count}:{size}:{newest}"
+
+
+class CalcCache:
+    def __init__(self, _settings: Settings) -> None:
+        """
+        CalcCache
+        :param _settings: A pointer to the settings
+        """
+        self.settings = _settings
+        self.cache_file_path = Path(self.settings._exe_dir, "calc_cache.pkl")
+        self.engine = engine_version(self.settings._exe_dir)
+        # {key: mainOutput}, least recently used first.
+        self.entries = OrderedDict()
+        saved = read_pickle(self.cache_file_path)
+        # Everything from another version of luaPoB is out of date
+        if type(saved) is dict and saved.get("engine", "") == self.engine and type(saved.get("entries", None)) is OrderedDict:
+            self.entries = saved["entries"]
+        # True when entries has changed since it was last saved.
+        self.changed = False
+        self.hits = 0
+        self.misses = 0
+
+    def build_key(self, build, output_groups=()) -> str:
+        """
+        :param build: dict: the build's json, as sent in a full calc. See Build().json
+        :param output_groups: list: the output groups asked for. See CalcWorker.output_groups.
+        :return: str: the key of this build's output, before any deltas.
+        """
+        text = json.dumps([self.engine, list(output_groups), canonical_build(build)], sort_keys=True, default=str)
+        return hashlib.sha1(text.encode("utf8")).hexdigest()
+
+    def key(self, build_key, delta_state=None) -> str:
+        """
+        :param build_key: str: from build_key(), for the last full calc.
+        :param delta_state: dict: the deltas sent since. See fold_deltas().
+        :return: str: the key of the output luaPoB will reply with.
+        """
+        if not delta_state:
+            return build_key
+        text = json.dumps([build_key, sorted(delta_state.items())], default=str)
+        return hashlib.sha1(text.encode("utf8")).hexdigest()
+
+    def get(self, key) -> dict:
+        """
+        :param key: str: from key().
+        :return: dict: the output, or None if this build hasn't been calculated.
+        """
+        output = self.entries.get(key, None)
+        if output is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return output
+
+    def put(self, key, output: dict):
+        """
+        Remember an output, forgetting the least recently used if there are too many.
+        :param key: str: from key().
+        :param output: dict: mainOutput from Lua PoB.
+        :return: N/A
+        """
+        if not key:
+            return
+        self.entries[key] = output
+        self.entries.move_to_end(key)
+        while len(self.entries) > max_entries:
+            self.entries.popitem(last=False)
+        self.changed = True
+
+    def report(self) -> str:
+        """
+        :return: str: one line of counts for the debug output.
+        """
+        total = self.hits + self.misses
+        percent = total and self.hits * 100 // total or 0
+        return f"CalcCache: {len(self.entries)} entries, {self.hits} hits, {self.misses} misses ({percent}% hits)"
+
+    def save(self):
+        """
+        Write the cache, if it has changed.
+        :return: N/A
+        """
+        if self.changed:
+            _debug(self.report())
+            write_pickle(self.cache_file_path, {"engine": self.engine, "entries": self.entries})
+            self.changed = False
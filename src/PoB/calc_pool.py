@@ -0,0 +1,198 @@
+"""
+CalcPool Class
+
+A small pool of CalcWorker()s for batches of what-if calculations, like node power or comparing many items.
+These are kept apart from the main CalcWorker, so the stats panel never waits on a batch.
+
+A batch is one job (see runJob() in PoB_jit.lua) whose list of candidates is cut into chunks.
+Chunks are handed to workers as they become free, so a slow chunk doesn't hold the others up.
+Batches are named (EG: "node_power", "items") and several can run at once, taking turns for free workers.
+Results are passed on as each one arrives. Starting a batch with the same name, or cancel(), throws away the remains of the old one.
+"""
+
+import os
+
+from PoB.settings import Settings
+from PoB.calc_worker import CalcWorker
+
+
+def default_pool_size() -> int:
+    """
+    Leave a core for the UI and the main CalcWorker. Each luajit holds a full copy of PoB, so don't go overboard.
+    :return: int
+    """
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class CalcPool:
+    def __init__(self, _settings: Settings, _size: int = 0) -> None:
+        """
+        CalcPool
+        :param _settings: A pointer to the settings
+        :param _size: int: Number of luajit processes. 0 for default_pool_size().
+        """
+        self.settings = _settings
+        self.size = _size or default_pool_size()
+        self.workers = []
+        self.idle_workers = []
+        # The build xml each worker was last given, so it is only sent again when it changes. {worker: xml}
+        self.worker_xml = {}
+        # {name: dict}. See run() for the entries.
+        self.batches = {}
+        # Every batch gets a new generation, so results from a cancelled batch can be recognised and ignored.
+        self.generation = 0
+
+    def running(self, name: str) -> bool:
+        return name in self.batches
+
+    def progress(self, name: str) -> tuple:
+        """
+        :param name: str: the batch.
+        :return: tuple: (results received, number of candidates) for the batch.
+        """
+        batch = self.batches.get(name, None)
+        return batch is None and (0, 0) or (batch["done_count"], batch["total"])
+
+    def start(self):
+        """
+        Start the luajit processes. They take a while to load PoB, so start them before they are needed if you can.
+        :return: N/A
+        """
+        while len(self.workers) < self.size:
+            worker = CalcWorker(self.settings, lambda output: None)
+            worker.start()
+            self.workers.append(worker)
+            self.idle_workers.append(worker)
+
+    def stop(self):
+        """
+        Stop all luajit processes.
+        :return: N/A
+        """
+        self.batches.clear()
+        for worker in self.workers:
+            worker.stop()
+        self.workers.clear()
+        self.idle_workers.clear()
+        self.worker_xml.clear()
+
+    def run(self, name: str, xml_text: str, job: dict, candidates_key: str, on_part, on_done=None, chunk_size=25) -> int:
+        """
+        Run a batch, cancelling any batch of the same name still running.
+        :param name: str: the batch's name. EG: "node_power".
+        :param xml_text: str: the build as xml. See pob_xml.save_to_xml_string().
+        :param job: dict: see runJob() in PoB_jit.lua.
+        :param candidates_key: str: the entry in job that holds the list to be split up. EG: "nodes".
+        :param on_part: function(part: dict). Called with each result as it arrives.
+        :param on_done: function(). Called once every chunk has finished.
+        :param chunk_size: int: Candidates per chunk. Smaller chunks cancel quicker, bigger ones have less overhead.
+        :return: int: the generation of this batch.
+        """
+        self.cancel(name)
+        self.start()
+        self.generation += 1
+        candidates = job[candidates_key]
+        self.batches[name] = {
+            "generation": self.generation,
+            "xml": xml_text,
+            "chunks": [dict(job, **{candidates_key: candidates[i : i + chunk_size]}) for i in range(0, len(candidates), chunk_size)],
+            "busy": 0,
+            "on_part": on_part,
+            "on_done": on_done,
+            "total": len(candidates),
+            "done_count": 0,
+        }
+        if not candidates:
+            self.batch_finished(name)
+        while self.idle_workers and self.next_chunk(self.idle_workers[0]):
+            pass
+        return self.generation
+
+    def cancel(self, name: str = None):
+        """
+        Stop handing out chunks of a batch and ignore any of its results still to come.
+        A chunk luajit is part way through will still finish, but its results are dropped.
+        :param name: str: the batch. None for all batches.
+        :return: N/A
+        """
+        if name is None:
+            self.batches.clear()
+        else:
+            self.batches.pop(name, None)
+
+    def next_chunk(self, worker: CalcWorker) -> bool:
+        """
+        Give a free worker the next chunk, taking turns between batches.
+        :param worker: CalcWorker:
+        :return: bool: True if the worker was given a chunk.
+        """
+        batches = [name for name in self.batches if self.batches[name]["chunks"]]
+        if not batches:
+            if worker not in self.idle_workers:
+                self.idle_workers.append(worker)
+            return False
+        # The batch with the fewest chunks running goes next
+        name = min(batches, key=lambda _name: self.batches[_name]["busy"])
+        batch = self.batches[name]
+        if worker in self.idle_workers:
+            self.idle_workers.remove(worker)
+        if self.worker_xml.get(worker, None) != batch["xml"]:
+            worker.calc(batch["xml"])
+            self.worker_xml[worker] = batch["xml"]
+        batch["busy"] += 1
+        generation = batch["generation"]
+        worker.job(
+            batch["chunks"].pop(0),
+            lambda part: self.part(name, generation, part),
+            lambda result: self.chunk_done(name, generation, worker, result),
+        )
+        return True
+
+    def current_batch(self, name: str, generation: int):
+        """
+        :return: dict: the batch if it is still the one with this generation, else None.
+        """
+        batch = self.batches.get(name, None)
+        return batch is not None and batch["generation"] == generation and batch or None
+
+    def part(self, name: str, generation: int, part: dict):
+        """
+        A worker has a result. Pass it on if it belongs to a current batch.
+        :param name: str: the batch this result belongs to.
+        :param generation: int: the generation of that batch.
+        :param part: dict: {"key", "values", ...}. See runJob() in PoB_jit.lua.
+        :return: N/A
+        """
+        batch = self.current_batch(name, generation)
+        if batch is None:
+            return
+        batch["done_count"] += 1
+        batch["on_part"](part)
+
+    def chunk_done(self, name: str, generation: int, worker: CalcWorker, result: dict):
+        """
+        A worker has finished a chunk. Give it another.
+        :param name: str: the batch this chunk belonged to.
+        :param generation: int: the generation of that batch.
+        :param worker: CalcWorker:
+        :param result: dict: {"id", "ok", "error"}
+        :return: N/A
+        """
+        batch = self.current_batch(name, generation)
+        if batch is not None:
+            if not result.get("ok", False):
+                print(f"CalcPool: {name} chunk failed: {result.get('error')}")
+            batch["busy"] -= 1
+            if not batch["chunks"] and batch["busy"] == 0:
+                self.batch_finished(name)
+        self.next_chunk(worker)
+
+    def batch_finished(self, name: str):
+        """
+        Remove a finished batch and tell its owner.
+        :param name: str: the batch.
+        :return: N/A
+        """
+        batch = self.batches.pop(name)
+        if batch["on_done"] is not None:
+            batch["on_done"]()
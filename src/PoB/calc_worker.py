@@ -0,0 +1,440 @@
+"""
+CalcWorker Class
+
+This class owns a long-lived, headless luajit process running PoB_jit.lua in worker mode.
+Lua PoB is booted once and then every build is sent to it over stdin, so a calculation no longer pays for a cold start.
+
+Protocol (see the bottom of PoB_jit.lua):
+  Request:  "CALC <id> <size> <groups>\n" followed by <size> bytes of build xml. "QUIT\n" stops the worker.
+            groups is a comma separated list of the parts of mainOutput to reply with. See output_groups. Also for DELTA.
+            "DELTA <id> <size>\n" followed by <size> bytes of a json list of changes to apply to the build luajit holds.
+            "JOB <id> <size>\n" followed by <size> bytes of a json what-if job (node power, item comparison).
+  Response: "@@CALC@@ <json>\n" where json is {"id": int, "ok": bool, "output": dict | "error": str}. Jobs have no output.
+            output has only the groups asked for. See Player.set_output() for how it is decoded.
+            "@@PART@@ <json>\n" for each result of a job, as it is calculated. json is {"id": int, "key": ..., "values": dict}.
+  "@@READY@@" is printed once Lua PoB has finished initialising. All other output is PoB chatter and is ignored.
+
+A delta is much cheaper than a full build, as there is no xml to write or parse, so small edits (a node, an item swap or
+  a config input) are sent as deltas. See node_delta(), item_delta() and config_delta() for their format.
+
+If the process dies it is restarted, and the last full build plus the deltas since are sent again.
+
+Scheduling:
+  request() coalesces a burst of full calcs (EG: a tree change asks several times in a row) into one, sent once the burst is over.
+  The build is only turned into xml then, so the latest state is always what is calculated.
+    Deltas that arrive meanwhile are held. The full build includes them, so they are dropped once it is queued.
+  Every calc, delta or request bumps the build revision. A result for an older revision is dropped rather than shown,
+    as a newer result is on its way. luajit can't be interrupted, so a superseded calc still finishes, but nothing waits on it.
+  metrics holds counts and timings, see metrics_report().
+"""
+
+import json
+import time
+
+from PySide6.QtCore import QProcess, QTimer
+
+from PoB.settings import Settings
+from PoB.utils import _debug
+
+ready_marker = b"@@READY@@"
+response_marker = b"@@CALC@@ "
+part_marker = b"@@PART@@ "
+# Number of times in a row the worker can die before we give up restarting it.
+max_restarts = 3
+# The parts of mainOutput each calc replies with. "Player" is the top level numbers and booleans, the rest are tables of mainOutput.
+player_output_groups = ("Player", "MainHand", "OffHand")
+minion_output_groups = ("Player", "MainHand", "OffHand", "Minion")
+# How long, in ms, request() waits for more requests before building the xml. Long enough for a burst of signals to settle.
+coalesce_ms = 30
+
+
+class CalcWorker:
+    def __init__(self, _settings: Settings, _callback) -> None:
+        """
+        CalcWorker
+        :param _settings: A pointer to the settings
+        :param _callback: function(output: dict). Called with the mainOutput of each finished calculation.
+        """
+        self.settings = _settings
+        self.callback = _callback
+        self.process = None
+        self.ready = False
+        # The request id that luajit is working on, and the (on_part, on_done) functions if it is a job.
+        self.in_flight = None
+        self.in_flight_job = None
+        # The next full build to send. Only the latest is kept, as an older one would be out of date by the time it ran.
+        self.pending = None
+        # Deltas waiting to be sent. They are sent together, after any pending full build.
+        self.pending_deltas = []
+        # What luajit holds (or will hold once in_flight finishes): the last full build and deltas sent on top of it.
+        #   Used to rebuild luajit's state after a restart.
+        self.last_full = None
+        self.sent_deltas = []
+        # What-if jobs waiting to be sent, as (json bytes, on_part, on_done). These don't change luajit's build.
+        self.pending_jobs = []
+        self.last_id = 0
+        # What calcs reply with. Set to minion_output_groups when the main skill has minions.
+        self.output_groups = player_output_groups
+        # Bumped by every change to the build. in_flight_revision is the revision the in flight calc or delta was sent at.
+        self.revision = 0
+        self.in_flight_revision = 0
+        # function() -> str: makes the xml for a coalesced request. See request().
+        self.make_xml = None
+        self.coalesce_timer = QTimer()
+        self.coalesce_timer.setSingleShot(True)
+        self.coalesce_timer.setInterval(coalesce_ms)
+        self.coalesce_timer.timeout.connect(self.send_request)
+        # perf_counter() of the first change not yet shown, and of the last send. For the latency metrics.
+        self.changed_at = None
+        self.sent_at = None
+        self.metrics = {
+            "requested": 0,
+            "coalesced": 0,
+            "sent": 0,
+            "stale": 0,
+            "shown": 0,
+            "last_calc_ms": 0.0,
+            "last_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+        self.restarts = 0
+        self.stopping = False
+        self._stdout_buffer = b""
+
+    @property
+    def busy(self) -> bool:
+        return self.in_flight is not None
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        :return: int: requests waiting to be sent, counting a coalesced request and all pending deltas as one each.
+        """
+        return (self.pending is not None or self.coalesce_timer.isActive()) + (len(self.pending_deltas) > 0) + len(self.pending_jobs)
+
+    def metrics_report(self) -> str:
+        """
+        :return: str: one line of metrics for the debug output.
+        """
+        m = self.metrics
+        return (
+            f"CalcWorker: depth {self.queue_depth}, requested {m['requested']}, coalesced {m['coalesced']}, sent {m['sent']}, "
+            f"stale {m['stale']}, shown {m['shown']}, calc {m['last_calc_ms']:.1f}ms, "
+            f"latency {m['last_latency_ms']:.1f}ms (max {m['max_latency_ms']:.1f}ms)"
+        )
+
+    def start(self):
+        """
+        Start luajit in worker mode. Lua PoB will load once and then wait for requests.
+        :return: N/A
+        """
+        if self.process is not None:
+            return
+        self.stopping = False
+        self.ready = False
+        self._stdout_buffer = b""
+        self.process = QProcess()
+        self.process.readyReadStandardOutput.connect(self.read_stdout)
+        self.process.finished.connect(self.process_finished)
+        self.process.errorOccurred.connect(self.process_error)
+        self.process.setWorkingDirectory(f"{self.settings._exe_dir}/lua/src")
+        _debug("CalcWorker: starting luajit")
+        self.process.start(f"{self.settings._exe_dir}/lua/runtime/luajit.exe", ["../PoB_jit.lua", "--worker"])
+
+    def stop(self):
+        """
+        Ask luajit to quit, killing it if it doesn't.
+        :return: N/A
+        """
+        if self.process is None:
+            return
+        self.stopping = True
+        if self.process.state() == QProcess.Running:
+            self.process.write(b"QUIT\n")
+            if not self.process.waitForFinished(2000):
+                self.process.kill()
+                self.process.waitForFinished(1000)
+        self.process = None
+        self.ready = False
+        self.coalesce_timer.stop()
+        self.make_xml = None
+        self.in_flight = None
+        self.pending = None
+        self.pending_deltas.clear()
+        self.last_full = None
+        self.sent_deltas.clear()
+        self.pending_jobs.clear()
+        self.in_flight_job = None
+
+    def calc(self, xml_text: str) -> int:
+        """
+        Queue a build for calculation. If the worker is busy, this replaces anything still waiting to be sent.
+        :param xml_text: str: the build as xml. See pob_xml.save_to_xml_string().
+        :return: int: the id of the request.
+        """
+        self.pending = xml_text.encode("utf8")
+        self.pending_deltas.clear()
+        self.changed()
+        if self.process is None:
+            self.start()
+        return self.send_next()
+
+    def calc_delta(self, deltas: list) -> int:
+        """
+        Queue changes to the build luajit already holds. Luajit recalculates without reloading the build.
+        :param deltas: list of dicts from node_delta(), item_delta() or config_delta().
+        :return: int: the id of the request, or 0 if luajit has no build yet and a full calc is needed.
+        """
+        coalescing = self.coalesce_timer.isActive()
+        if self.last_full is None and self.pending is None and not coalescing:
+            return 0
+        self.pending_deltas.extend(deltas)
+        self.changed()
+        if coalescing:
+            # The full build is made when the timer runs out, so it will include these changes and calc() will drop them.
+            #   Until then they are kept, so they are still sent if luajit becomes idle first.
+            return self.last_id + 1
+        if self.process is None:
+            self.start()
+        return self.send_next()
+
+    def request(self, make_xml):
+        """
+        Ask for a full calc, coalescing it with any others that follow within coalesce_ms.
+        The xml is made once, when the timer runs out, so the build is only written for the last of a burst of requests.
+        :param make_xml: function() -> str: returns the build as xml. See pob_xml.save_to_xml_string().
+        :return: N/A
+        """
+        self.metrics["requested"] += 1
+        if self.coalesce_timer.isActive():
+            self.metrics["coalesced"] += 1
+        self.make_xml = make_xml
+        self.changed()
+        self.coalesce_timer.start()
+
+    def send_request(self):
+        """
+        Called by self.coalesce_timer. Make the xml for the last request() and queue it.
+        :return: N/A
+        """
+        make_xml, self.make_xml = self.make_xml, None
+        if make_xml is not None:
+            self.calc(make_xml())
+
+    def changed(self):
+        """
+        The build has changed. Results for the current revision are now out of date.
+        :return: N/A
+        """
+        self.revision += 1
+        if self.changed_at is None:
+            self.changed_at = time.perf_counter()
+
+    def job(self, job: dict, on_part, on_done) -> int:
+        """
+        Queue a what-if job. It runs against the build luajit holds once any pending build and deltas have been sent.
+        :param job: dict: see runJob() in PoB_jit.lua.
+        :param on_part: function(part: dict). Called with each result as it arrives.
+        :param on_done: function(result: dict). Called when the job has finished, with {"id", "ok", "error"}.
+        :return: int: the position of the job in the queue.
+        """
+        self.pending_jobs.append((json.dumps(job).encode("utf8"), on_part, on_done))
+        if self.process is None:
+            self.start()
+        self.send_next()
+        return len(self.pending_jobs)
+
+    def cancel_jobs(self):
+        """
+        Drop all jobs waiting to be sent. A job luajit is running can't be stopped and will still finish.
+        :return: N/A
+        """
+        self.pending_jobs.clear()
+
+    def send_next(self) -> int:
+        """
+        Send the pending full build, the pending deltas, or the next job, if luajit is ready and idle.
+        :return: int: the id the request was, or will be, sent with.
+        """
+        # Deltas held for a coalesced first build have nothing to apply to yet
+        deltas = self.pending_deltas and (self.pending is not None or self.last_full is not None)
+        if not self.ready or self.in_flight is not None or (self.pending is None and not deltas and not self.pending_jobs):
+            return self.last_id + 1
+        self.last_id += 1
+        if self.pending is not None:
+            command, payload = "CALC", self.pending
+            self.last_full, self.pending = self.pending, None
+            self.sent_deltas.clear()
+            self.in_flight_revision = self.revision
+        elif deltas:
+            command, payload = "DELTA", json.dumps(self.pending_deltas).encode("utf8")
+            self.sent_deltas.extend(self.pending_deltas)
+            self.pending_deltas.clear()
+            self.in_flight_revision = self.revision
+        else:
+            payload, on_part, on_done = self.pending_jobs.pop(0)
+            command = "JOB"
+            self.in_flight_job = (payload, on_part, on_done)
+        self.in_flight = self.last_id
+        self.metrics["sent"] += 1
+        self.sent_at = time.perf_counter()
+        groups = command != "JOB" and f" {','.join(self.output_groups)}" or ""
+        self.process.write(f"{command} {self.last_id} {len(payload)}{groups}\n".encode("utf8") + payload)
+        return self.last_id
+
+    def read_stdout(self):
+        """
+        Split luajit's output into lines and act on the ones meant for us.
+        :return: N/A
+        """
+        self._stdout_buffer += bytes(self.process.readAllStandardOutput())
+        *lines, self._stdout_buffer = self._stdout_buffer.split(b"\n")
+        for line in lines:
+            line = line.rstrip(b"\r")
+            if line.startswith(part_marker):
+                self.part(line[len(part_marker) :])
+            elif line.startswith(response_marker):
+                self.response(line[len(response_marker) :])
+            elif line.startswith(ready_marker):
+                _debug("CalcWorker: luajit ready")
+                self.ready = True
+                self.send_next()
+            elif line:
+                _debug(f"CalcWorker: {line.decode('utf8', 'replace')}")
+
+    def part(self, json_text: bytes):
+        """
+        Decode one result of a job and pass it on.
+        :param json_text: bytes: the json text after the part marker.
+        :return: N/A
+        """
+        if self.in_flight_job is None:
+            return
+        try:
+            self.in_flight_job[1](json.loads(json_text))
+        except json.JSONDecodeError:
+            print(f"CalcWorker: Unable to decode part: {json_text[:100]}")
+
+    def response(self, json_text: bytes):
+        """
+        Decode a response and pass the results to the callback.
+        :param json_text: bytes: the json text after the response marker.
+        :return: N/A
+        """
+        try:
+            result = json.loads(json_text)
+        except json.JSONDecodeError:
+            print(f"CalcWorker: Unable to decode response: {json_text[:100]}")
+            result = {}
+        self.in_flight = None
+        self.restarts = 0
+        now = time.perf_counter()
+        if self.sent_at is not None:
+            self.metrics["last_calc_ms"] = (now - self.sent_at) * 1000
+        if self.in_flight_job is not None:
+            on_done = self.in_flight_job[2]
+            self.in_flight_job = None
+            on_done(result)
+        elif result.get("ok", False):
+            # Only show the result if nothing has changed since it was sent and nothing newer is waiting
+            if self.in_flight_revision == self.revision and self.pending is None and not self.pending_deltas:
+                if self.changed_at is not None:
+                    latency = (now - self.changed_at) * 1000
+                    self.metrics["last_latency_ms"] = latency
+                    self.metrics["max_latency_ms"] = max(latency, self.metrics["max_latency_ms"])
+                    self.changed_at = None
+                self.metrics["shown"] += 1
+                self.callback(result.get("output", {}))
+            else:
+                self.metrics["stale"] += 1
+                _debug(f"CalcWorker: dropped result {result.get('id')} for revision {self.in_flight_revision}, now {self.revision}")
+        else:
+            print(f"CalcWorker: calculation {result.get('id')} failed: {result.get('error')}")
+            # luajit's build is no longer known to match ours. Deltas are refused until the next full calc.
+            self.last_full = None
+            self.sent_deltas.clear()
+            if self.pending is None:
+                self.pending_deltas.clear()
+        self.send_next()
+
+    def process_error(self, error):
+        """
+        luajit couldn't be started. There is no point retrying as nothing will have changed.
+        :param error: QProcess.ProcessError
+        :return: N/A
+        """
+        if error == QProcess.FailedToStart:
+            print(f"CalcWorker: Unable to start {self.settings._exe_dir}/lua/runtime/luajit.exe")
+            self.process = None
+            self.in_flight = None
+            self.pending = None
+            self.pending_deltas.clear()
+            self.pending_jobs.clear()
+            self.in_flight_job = None
+
+    def process_finished(self, exit_code, exit_status):
+        """
+        luajit has exited. Unless we asked it to, restart it and rebuild the state it had.
+        :param exit_code: int
+        :param exit_status: QProcess.ExitStatus
+        :return: N/A
+        """
+        if self.stopping:
+            return
+        print(f"CalcWorker: luajit exited unexpectedly, {exit_code=}, {exit_status=}")
+        self.process = None
+        self.ready = False
+        # A newer full build makes what luajit held irrelevant
+        if self.pending is None and self.last_full is not None:
+            self.pending = self.last_full
+            self.pending_deltas[:0] = self.sent_deltas
+        self.sent_deltas.clear()
+        if self.in_flight_job is not None:
+            self.pending_jobs.insert(0, self.in_flight_job)
+            self.in_flight_job = None
+        self.in_flight = None
+        self.restarts += 1
+        if self.restarts > max_restarts:
+            print(f"CalcWorker: luajit failed {max_restarts} times in a row. Not restarting.")
+            self.pending = None
+            self.pending_deltas.clear()
+            self.last_full = None
+            for _payload, _on_part, on_done in self.pending_jobs:
+                on_done({"ok": False, "error": "luajit is not running"})
+            self.pending_jobs.clear()
+            return
+        self.start()
+
+
+def node_delta(node_id: int, alloc: bool, effect_id: int = 0) -> dict:
+    """
+    A delta to allocate or deallocate a passive node.
+    :param node_id: int
+    :param alloc: bool: True to allocate.
+    :param effect_id: int: The chosen effect, if the node is a mastery.
+    :return: dict
+    """
+    delta = {"kind": "node", "id": node_id, "alloc": alloc}
+    if effect_id:
+        delta["effect"] = effect_id
+    return delta
+
+
+def item_delta(slot_name: str, item_id: int) -> dict:
+    """
+    A delta to put an item in a slot of the active item set.
+    :param slot_name: str: EG: "Weapon 1", "Body Armour".
+    :param item_id: int: The item's id, or 0 to empty the slot.
+    :return: dict
+    """
+    return {"kind": "item", "slot": slot_name, "itemId": item_id}
+
+
+def config_delta(name: str, value) -> dict:
+    """
+    A delta to set a config input.
+    :param name: str: the name of the Input, EG: "enemyIsBoss".
+    :param value: bool, int, float, str, or None to remove the input.
+    :return: dict
+    """
+    return {"kind": "config", "name": name, "value": value}
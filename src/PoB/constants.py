@@ -892,6 +892,9 @@ post_http_headers = {
     "Content-Type": "text/html; charset=utf-8",
 }
 
+# Stats that node power and item comparisons can be measured against. Labels come from player_stats_list.
+comparison_stats = ["CombinedDPS", "FullDPS", "TotalEHP", "Life", "EnergyShield", "Mana", "Armour", "Evasion", "Ward"]
+
 # valid_websites = ("pastebin.com", "pastebinp.com", "pobb.in", "rentry.co", "poe.ninja/pob")
 website_list = {
     "pobb.in": {
@@ -18,7 +18,7 @@ from PoB.constants import (
     weapon_classes,
 )
 from PoB.settings import Settings
-from PoB.mod import Mod
+from PoB.mod import Mod, parse_mod_line
 from PoB.utils import _debug, html_colour_text, search_stats_for_skill, print_call_stack
 from widgets.ui_utils import search_stats_list_for_regex
 
@@ -877,3 +877,68 @@ class Item:
 
         # print(f"get_active_stats2: {self.title=}, {self.active_stats=}")
         return self.active_stats
+
+
+class ItemRecord:
+    """
+    A light stand-in for a unique or rare template Item() in the import list. There are over a thousand of these and
+      most are never looked at, so only what the list filters on is kept. The Item() is made the first time it is needed.
+    """
+
+    __slots__ = (
+        "settings",
+        "base_items",
+        "json",
+        "rarity",
+        "quality",
+        "name",
+        "base_item",
+        "type",
+        "sub_type",
+        "slots",
+        "league",
+        "source",
+        "mods_text",
+        "_item",
+    )
+
+    def __init__(self, _settings: Settings, _base_items, _json, _rarity, _quality=0) -> None:
+        """
+        :param _settings: A pointer to the settings
+        :param _base_items: dict: the loaded base_items.json
+        :param _json: dict: the item's entry from uniques.json or rare_templates.json
+        :param _rarity: str: "UNIQUE" or "RARE"
+        :param _quality: int: quality to give the Item() when it is made. 0 to leave it alone.
+        """
+        self.settings = _settings
+        self.base_items = _base_items
+        self.json = _json
+        self.rarity = _rarity
+        self.quality = _quality
+        self._item = None
+        # Let an empty Item() work out the name, type and slots. It's the mods and tooltip that are costly.
+        shell = Item(_settings, _base_items, template=True)
+        shell.title = _json.get("title", "")
+        shell.base_name = _json.get("base_name", "")
+        self.name = shell.name
+        self.base_item = shell.base_item
+        self.type = shell.type
+        self.sub_type = shell.sub_type
+        self.slots = shell.slots
+        self.league = _json.get("Attribs", {}).get("League", "")
+        self.source = _json.get("Source", "")
+        # One long string of all the mods (including variants) to search in, without the {variant} and such.
+        self.mods_text = " ".join(parse_mod_line(line).original_line for line in _json["Implicits"] + _json["Explicits"]).lower()
+
+    @property
+    def item(self) -> Item:
+        """The full Item(), made on first use."""
+        if self._item is None:
+            self._item = Item(self.settings, self.base_items, template=True)
+            self._item.load_from_json(self.json, self.rarity)
+            if self.quality:
+                self._item.quality = self.quality
+        return self._item
+
+    def tooltip(self) -> str:
+        return self.item.tooltip()
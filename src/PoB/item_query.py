@@ -0,0 +1,223 @@
+"""
+ItemQuery Class
+
+Numeric queries over lists of items. EG: "uniques with at least 60 to maximum Life that need level 40 or less".
+
+Each item's numbers are read once, when it is added, into columns (an array of floats per value, and the rows they belong to).
+A query then runs down a few columns rather than reading the text of every item again.
+
+Columns:
+  "Level", "Str", "Dex", "Int": from Requires, falling back to the base item's, then 0.
+  "Armour", "Evasion", "Energy Shield": from the item, falling back to the base item's (before any mods).
+  "min:<key>", "max:<key>": the low and high values of a mod, where key is the mod with its numbers replaced by #.
+      EG: "+(40-60) to maximum Life" gives "min:+# to maximum Life" = 40 and "max:+# to maximum Life" = 60.
+      A mod without a range has the same value in both, negative if it has a minus sign.
+      A mod with more than one number has a pair of columns for each, with its position after the key.
+      EG: "Adds (5-8) to (12-15) Fire Damage" gives "min:Adds # to # Fire Damage#0" = 5 ... "max:Adds # to # Fire Damage#1" = 15.
+Items without a value fail every test on it.
+
+Predicates are ("Level", "<=", 40), or ("and", [predicates]) and ("or", [predicates]) to combine them.
+
+This is a base PoB class. It only imports parse_mod_line() from PoB.mod.
+"""
+
+from array import array
+import math
+import operator
+import re
+
+from PoB.mod import parse_mod_line
+
+# Short names that can be typed in a search, for the columns that aren't mods.
+named_columns = {
+    "level": "Level",
+    "lvl": "Level",
+    "str": "Str",
+    "strength": "Str",
+    "dex": "Dex",
+    "dexterity": "Dex",
+    "int": "Int",
+    "intelligence": "Int",
+    "armour": "Armour",
+    "evasion": "Evasion",
+    "es": "Energy Shield",
+    "energy shield": "Energy Shield",
+}
+operators = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt, "=": operator.eq}
+# EG: "life>=60", "level <= 40", "fire res > 30"
+numeric_term_regex = re.compile(r"([a-z][a-z ]*?)\s*(>=|<=|>|<|=)\s*([\d.]+)", re.IGNORECASE)
+# A range, EG: "(-10-10)", or a number with its minus sign, EG: "-10% to Fire Resistance" is -10 with the key "#% to Fire Resistance".
+#   A plus sign stays in the key, EG: "+#% to Fire Resistance"
+mod_number_regex = re.compile(r"\((-?[0-9.]+)-(-?[0-9.]+)\)|(-?[0-9]+(?:\.[0-9]+)?)")
+
+
+def mod_key(line) -> str:
+    """
+    :param line: str: a mod line without its {marks}. EG: "+(40-60) to maximum Life"
+    :return: str: the line with its numbers replaced by #. EG: "+# to maximum Life"
+    """
+    return mod_number_regex.sub("#", line)
+
+
+def to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def item_values(pob_item, base_item) -> dict:
+    """
+    Read the numbers a query can use out of an item.
+    :param pob_item: dict: the item's json. EG: Item().pob_item or an entry of uniques.json
+    :param base_item: dict: the item's entry from base_items.json, or None.
+    :return: dict: {column: float}
+    """
+    base_item = base_item or {}
+    values = {}
+    requires = pob_item.get("Requires", {})
+    base_reqs = base_item.get("req", {})
+    # No requirement is a requirement of 0, so requirement filters let these items through
+    for req in ("Level", "Str", "Dex", "Int"):
+        value = to_float(requires.get(req, base_reqs.get(req, 0)))
+        values[req] = math.isnan(value) and 0.0 or value
+
+    # Attribs are "armour" for uniques and "Armour" for rare templates
+    attribs = dict((name.lower(), value) for name, value in pob_item.get("Attribs", {}).items())
+    base_armour = base_item.get("armour", {})
+    for column, attrib, base_name in (
+        ("Armour", "armour", "ArmourBaseMax"),
+        ("Evasion", "evasion", "EvasionBaseMax"),
+        ("Energy Shield", "energy_shield", "EnergyShieldBaseMax"),
+    ):
+        value = to_float(attribs.get(attrib, attribs.get(column.lower(), base_armour.get(base_name, math.nan))))
+        if value and not math.isnan(value):
+            values[column] = value
+
+    for line in pob_item.get("Implicits", []) + pob_item.get("Explicits", []):
+        original_line = parse_mod_line(line).original_line
+        numbers = list(mod_number_regex.finditer(original_line))
+        key = mod_key(original_line)
+        for position, m in enumerate(numbers):
+            low, high = m.group(3) is None and (float(m.group(1)), float(m.group(2))) or (float(m.group(3)), float(m.group(3)))
+            column = len(numbers) > 1 and f"{key}#{position}" or key
+            # Variants can have the same mod more than once, so keep the widest values
+            values[f"min:{column}"] = min(low, values.get(f"min:{column}", low))
+            values[f"max:{column}"] = max(high, values.get(f"max:{column}", high))
+    return values
+
+
+class ItemQuery:
+    def __init__(self) -> None:
+        # What each row is. EG: an ItemRecord() or an Item()
+        self.entries = []
+        # {column: (array of row, array of float)}. Only the rows that have the value are in a column.
+        #   Most mods are on only a few items, so this is far smaller than a value for every row.
+        self.columns = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.columns.clear()
+
+    def add(self, entry, pob_item, base_item=None):
+        """
+        Add a row for an item.
+        :param entry: anything. What query() returns for this row.
+        :param pob_item: dict: the item's json.
+        :param base_item: dict: the item's entry from base_items.json, or None.
+        :return: N/A
+        """
+        row = len(self.entries)
+        self.entries.append(entry)
+        for column, value in item_values(pob_item, base_item).items():
+            if column not in self.columns:
+                self.columns[column] = (array("l"), array("d"))
+            rows, values = self.columns[column]
+            rows.append(row)
+            values.append(value)
+
+    def find_columns(self, name) -> list:
+        """
+        Turn what the user typed into columns. EG: "level" is ["Level"], "life" is every max:<key> mentioning life.
+        :param name: str:
+        :return: list: column names. Empty if nothing matches.
+        """
+        name = name.strip().lower()
+        if name in named_columns:
+            return [named_columns[name]]
+        return [column for column in self.columns if column.startswith("max:") and name in column.lower()]
+
+    def rows(self, predicate) -> set:
+        """
+        :param predicate: tuple: see the module docstring.
+        :return: set: the rows that pass.
+        """
+        match predicate:
+            case ("and", predicates):
+                result = None
+                for _predicate in predicates:
+                    result = self.rows(_predicate) if result is None else result & self.rows(_predicate)
+                    if not result:
+                        return set()
+                return set(range(len(self.entries))) if result is None else result
+            case ("or", predicates):
+                return set().union(*(self.rows(_predicate) for _predicate in predicates))
+            case (column, op, value):
+                _op = operators[op]
+                rows, values = self.columns.get(column, ((), ()))
+                return set(row for row, cell in zip(rows, values) if _op(cell, value))
+        return set()
+
+    def query(self, predicate=None, sort_by="", reverse=True) -> list:
+        """
+        Find the entries that pass a predicate.
+        :param predicate: tuple: see the module docstring. None for all entries.
+        :param sort_by: str: column to sort on. Rows without a value go last. "" to keep the order they were added.
+        :param reverse: bool: biggest first.
+        :return: list: entries.
+        """
+        rows = predicate is None and list(range(len(self.entries))) or sorted(self.rows(predicate))
+        if sort_by in self.columns:
+            cells = dict(zip(*self.columns[sort_by]))
+            present = [row for row in rows if row in cells]
+            rows = sorted(present, key=cells.__getitem__, reverse=reverse) + [row for row in rows if row not in cells]
+        return [self.entries[row] for row in rows]
+
+    def parse(self, text) -> tuple:
+        """
+        Split numeric terms out of a search. EG: "tabula level<=10 maximum life>=20" is
+          (("and", [("Level", "<=", 10), ("or", [("max:+# to maximum Life", ">=", 20), ...])]), "tabula")
+        The longest run of words before the operator that names a column is used, and any words before that are left in the text.
+        A term whose name matches several columns passes if any of them do. One that matches none fails.
+        :param text: str: what the user typed.
+        :return: tuple: (predicate or None, the rest of the text).
+        """
+        predicates = []
+        rest = []
+        for m in numeric_term_regex.finditer(text):
+            words = m.group(1).split()
+            columns = []
+            for i in range(len(words)):
+                columns = self.find_columns(" ".join(words[i:]))
+                if columns:
+                    rest.extend(words[:i])
+                    break
+            value = float(m.group(3))
+            predicates.append(
+                len(columns) == 1 and (columns[0], m.group(2), value) or ("or", [(column, m.group(2), value) for column in columns])
+            )
+        rest.insert(0, numeric_term_regex.sub(" ", text))
+        return predicates and ("and", predicates) or None, " ".join(" ".join(rest).split())
+
+    def sort_column(self, predicate) -> str:
+        """
+        :param predicate: tuple: from parse().
+        :return: str: the column of the first numeric term, if it is a single column. "" otherwise.
+        """
+        if predicate is None:
+            return ""
+        first = predicate[1][0]
+        return first[0] != "or" and first[0] or ""
@@ -1,14 +1,130 @@
 """
 A class to encapsulate one mod.
 Numeric values default to 'None' so that they can be checked for non use. -1 or 0 could be legitimate values.
+
+The same mod lines turn up on many uniques, rare templates and build items, so the text of each distinct line is only
+  parsed once per process (see parse_mod_line()). Mod() itself is per item, as its range can be changed.
 """
 
+from collections import namedtuple
 import re
 import locale
+import sys
 
 from PoB.constants import ColourCodes
 from PoB.utils import _debug, html_colour_text, format_number, print_call_stack, search_stats_for_skill
 
+# Everything Mod() can learn from the text of a line. Shared between Mod()s, so it is immutable.
+ParsedModLine = namedtuple(
+    "ParsedModLine",
+    "marks original_line corrupted crafted fractured tooltip_colour tooltip grants_skill tags my_variants "
+    "range_groups min max range_sep min2 max2 line_unformatted range_value",
+)
+# Every line parsed so far. {line: ParsedModLine}
+parsed_mod_lines = {}
+mod_cache_stats = {"hits": 0, "misses": 0}
+
+
+def mod_cache_report() -> str:
+    """
+    :return: str: how well parse_mod_line() is doing. EG: for _debug().
+    """
+    hits, misses = mod_cache_stats["hits"], mod_cache_stats["misses"]
+    rate = hits + misses and hits * 100 / (hits + misses) or 0
+    return f"Mod cache: {len(parsed_mod_lines)} lines, {hits} hits, {misses} misses, {rate:.1f}% hit rate"
+
+
+def parse_mod_line(_line) -> ParsedModLine:
+    """
+    Parse the text of a mod line, or return the result of parsing it last time.
+    :param _line: str: the full line of the mod, including variant stanzas.
+    :return: ParsedModLine:
+    """
+    parsed = parsed_mod_lines.get(_line, None)
+    if parsed is not None:
+        mod_cache_stats["hits"] += 1
+        return parsed
+    mod_cache_stats["misses"] += 1
+
+    # this is the text without {variant}, {crafted}. At this point {range} is still present
+    m = re.search(r"({.*})(.*)", _line)
+    # All the {variants}, {tags} and such
+    marks = sys.intern(m and m.group(1) or "")
+    original_line = sys.intern(m and m.group(2) or _line)
+
+    corrupted = original_line == "Corrupted"
+    crafted = "{crafted}" in marks
+    fractured = "{fractured}" in marks
+    tooltip_colour = ColourCodes.MAGIC.value
+    if crafted:
+        tooltip_colour = ColourCodes.CRAFTED.value
+    elif fractured:
+        tooltip_colour = ColourCodes.FRACTURED.value
+    elif corrupted:
+        tooltip_colour = ColourCodes.STRENGTH.value
+
+    skill, level = search_stats_for_skill(original_line)
+    grants_skill = skill and (skill, level) or ()
+
+    # check for and keep tag information
+    m = re.search(r"({tags:[\w,]+})", marks)
+    tags = m and m.group(1) or ""
+
+    # check for and keep variant information
+    m = re.search(r"{variant:([\d,]+)}", marks)
+    my_variants = m and tuple(int(variant) for variant in m.group(1).split(",")) or ()
+
+    # sort out the range, min, max and the unformatted line, if applicable
+    range_groups, _min, _max, range_sep, min2, max2, line_unformatted = 0, 0, 0, "", 0, 0, ""
+    m2 = (
+        re.search(r"\(([0-9.]+)-([0-9.]+)\)(.*)\(([0-9.]+)-([0-9.]+)\)(.*)", original_line)
+        or re.search(r"\(([0-9.]+)-([0-9.]+)\)(.*)", original_line)
+        or re.search(r"([0-9.]+) to ([0-9.]+)", original_line)
+    )
+    if m2:
+        range_groups = len(m2.groups())
+        match range_groups:
+            case 2:
+                # Adds 1 to 40 Lightning Damage to Attacks
+                # This is not an error, just not a ranged mod
+                pass
+            case 3:  # '{range:0.5}+(12-16)% to Fire and Cold Resistances'
+                _min = float(m2.group(1))
+                _max = float(m2.group(2))
+                line_unformatted = re.sub(r"\([0-9.]+-[0-9.]+\)", "{}", original_line)
+            case 6:  # '{range:0.5}Adds (8-13) to (20-30) Physical Damage'
+                _min = float(m2.group(1))
+                _max = float(m2.group(2))
+                range_sep = m2.group(3)
+                min2 = float(m2.group(4))
+                max2 = float(m2.group(5))
+                _tmp_str = re.sub(r"\([0-9.]+-[0-9.]+\)", "{0}", original_line, count=1)
+                line_unformatted = re.sub(r"\([0-9.]+-[0-9.]+\)", "{1}", _tmp_str, count=1)
+    m1 = re.search(r"{range:([0-9.]+)}", marks)
+
+    parsed = ParsedModLine(
+        marks,
+        original_line,
+        corrupted,
+        crafted,
+        fractured,
+        tooltip_colour,
+        f"{html_colour_text(tooltip_colour, original_line)}",
+        grants_skill,
+        sys.intern(tags),
+        my_variants,
+        range_groups,
+        _min,
+        _max,
+        range_sep,
+        min2,
+        max2,
+        line_unformatted,
+        m1 and float(m1.group(1)) or 0.5,
+    )
+    parsed_mod_lines[_line] = parsed
+    return parsed
+
 
 class Mod:
     def __init__(self, settings, _line, template=False) -> None:
@@ -19,21 +135,17 @@ class Mod:
         """
         self.settings = settings
         self.template = template
-        self.grants_skill = ()
-        self.my_variants = []
+        parsed = parse_mod_line(_line)
 
-        # this is the text without {variant}, {crafted}. At this point {range} is still present
-        m = re.search(r"({.*})(.*)", _line)
         # All the {variants}, {tags} and such
-        self.marks = m and m.group(1) or ""
-        self.original_line = m and m.group(2) or _line
-        # if m:
-        #     print(f"{m.groups()=}")
+        self.marks = parsed.marks
+        # this is the text without {variant}, {crafted}. At this point {range} is still present
+        self.original_line = parsed.original_line
 
         # The formatted line with the ranged values filled in, if range is present. Used by calc routines
         self.line = self.original_line
 
-        self.corrupted = self.original_line == "Corrupted"
+        self.corrupted = parsed.corrupted
 
         # value for managing the range of values. EG: 20-40% of ... _range will be between 0 and 1
         self._range_value = -1
@@ -46,63 +158,27 @@ class Mod:
         self.value = 0
         self.value2 = 0
 
-        self.crafted = "{crafted}" in self.marks
-        self.fractured = "{fractured}" in self.marks
-        self.tooltip_colour = ColourCodes.MAGIC.value
-        if self.crafted:
-            self.tooltip_colour = ColourCodes.CRAFTED.value
-        elif self.fractured:
-            self.tooltip_colour = ColourCodes.FRACTURED.value
-        elif self.corrupted:
-            self.tooltip_colour = ColourCodes.STRENGTH.value
+        self.crafted = parsed.crafted
+        self.fractured = parsed.fractured
+        self.tooltip_colour = parsed.tooltip_colour
         # No range? Let's set the tooltip.
-        self.tooltip = f"{html_colour_text(self.tooltip_colour, self.original_line)}"
-
-        skill, level = search_stats_for_skill(self.original_line)
-        if skill:
-            self.grants_skill = (skill, level)
-
-        # check for and keep tag information
-        m = re.search(r"({tags:[\w,]+})", self.marks)
-        self.tags = m and m.group(1) or ""
-
-        # check for and keep variant information
-        m = re.search(r"{variant:([\d,]+)}", self.marks)
-        self.my_variants = m and [int(variant) for variant in m.group(1).split(",")] or []
+        self.tooltip = parsed.tooltip
+        self.grants_skill = parsed.grants_skill
+        self.tags = parsed.tags
+        self.my_variants = list(parsed.my_variants)
 
         """ sort out the range, min, max, value and the tooltip, if applicable"""
         # If there is a range, then this will be self.original_line with {0} and/or {1} replacing the range values.
         self.line_unformatted = ""
-        # print(f"init 1: {self.line=}, {self.original_line=}")
-        m2 = (
-            re.search(r"\(([0-9.]+)-([0-9.]+)\)(.*)\(([0-9.]+)-([0-9.]+)\)(.*)", self.original_line)
-            or re.search(r"\(([0-9.]+)-([0-9.]+)\)(.*)", self.original_line)
-            or re.search(r"([0-9.]+) to ([0-9.]+)", self.original_line)
-        )
-        if m2:
-            if not self.template:
-                match len(m2.groups()):
-                    case 2:
-                        # Adds 1 to 40 Lightning Damage to Attacks
-                        # This is not an error, just not a ranged mod
-                        # print(f"2: {m2.groups()=}, original_line: {_line}")
-                        pass
-                    case 3:  # '{range:0.5}+(12-16)% to Fire and Cold Resistances'
-                        self.min = float(m2.group(1))
-                        self.max = float(m2.group(2))
-                        self.line_unformatted = re.sub(r"\([0-9.]+-[0-9.]+\)", "{}", self.original_line)
-                    case 6:  # '{range:0.5}Adds (8-13) to (20-30) Physical Damage'
-                        self.min = float(m2.group(1))
-                        self.max = float(m2.group(2))
-                        self.range_sep = m2.group(3)
-                        self.min2 = float(m2.group(4))
-                        self.max2 = float(m2.group(5))
-                        _tmp_str = re.sub(r"\([0-9.]+-[0-9.]+\)", "{0}", self.original_line, count=1)
-                        self.line_unformatted = re.sub(r"\([0-9.]+-[0-9.]+\)", "{1}", _tmp_str, count=1)
-
-                # trigger property to update value and tooltip
-                m1 = re.search(r"{range:([0-9.]+)}", self.marks)
-                self.range_value = m1 and float(m1.group(1)) or 0.5
+        if parsed.range_groups and not self.template:
+            self.min = parsed.min
+            self.max = parsed.max
+            self.range_sep = parsed.range_sep
+            self.min2 = parsed.min2
+            self.max2 = parsed.max2
+            self.line_unformatted = parsed.line_unformatted
+            # trigger property to update value and tooltip
+            self.range_value = parsed.range_value
 
         # print(f"init 2: {self.line=}, {self.line_unformatted=}, {self.original_line=}")
 
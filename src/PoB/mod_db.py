@@ -0,0 +1,154 @@
+"""
+ModDB Class
+
+An index of parsed stat lines from nodes and items, for Player()'s stat math.
+
+Each stat line is parsed once (see parse_stat_line()) into ModRecord()s, which are indexed by operation and stat key.
+EG: "+12 to maximum Life" is {value: 12, op: "add", key: "maximum Life"}.
+Lookups match a pattern against the (few) distinct keys, not every line, and the matching keys are remembered.
+
+Sources (a node or an item) are added and removed individually, so a changed tree or item set only updates what changed.
+
+This is a base PoB class. It doesn't import any other PoB classes.
+"""
+
+import re
+
+# op: regex. The value is group 1, the % is group 2 and the key is group 3.
+stat_line_regexes = {
+    "add": re.compile(r"^([-+]?[\d\.]+)(%?) to (.*)$"),
+    "inc": re.compile(r"^([-+]?[\d\.]+)(%) increased (.*)$"),
+    "red": re.compile(r"^([-+]?[\d\.]+)(%) reduced (.*)$"),
+    "more": re.compile(r"^([-+]?[\d\.]+)(%) more (.*)$"),
+    "less": re.compile(r"^([-+]?[\d\.]+)(%) less (.*)$"),
+}
+# Minion stats are the player's lines with this in front. EG: "Minions have 10% increased maximum Life"
+minion_prefix = "Minions have "
+# Every line parsed so far. Many nodes and items share lines. {line: tuple of ModRecord}
+parsed_lines = {}
+
+
+class ModRecord:
+    """One parsed stat. These are shared between sources, so don't change them."""
+
+    __slots__ = ("value", "op", "key", "percent", "minion", "line")
+
+    def __init__(self, value, op, key, percent, minion, line) -> None:
+        self.value = value
+        self.op = op
+        self.key = key
+        self.percent = percent
+        self.minion = minion
+        self.line = line
+
+    def __repr__(self) -> str:
+        return f"ModRecord({self.op} {self.value}{self.percent and '%' or ''} {self.key}{self.minion and ', minion' or ''})"
+
+
+def parse_stat_line(line) -> tuple:
+    """
+    Parse a stat line into ModRecord()s. Each distinct line is only parsed once per process.
+    :param line: str: EG: "8% increased maximum Life"
+    :return: tuple of ModRecord. Empty if the line isn't one we understand.
+    """
+    records = parsed_lines.get(line, None)
+    if records is None:
+        records = ()
+        minion = line.startswith(minion_prefix)
+        stat = minion and line[len(minion_prefix) :] or line
+        for op, regex in stat_line_regexes.items():
+            m = regex.match(stat)
+            if m:
+                value = float(m.group(1)) if "." in m.group(1) else int(m.group(1))
+                records = (ModRecord(value, op, m.group(3), m.group(2) == "%", minion, line),)
+                break
+        parsed_lines[line] = records
+    return records
+
+
+class ModDB:
+    def __init__(self) -> None:
+        # The records from each source. {(group, source_id): (lines, [ModRecord])}. EG group: "node", "item".
+        self.sources = {}
+        # {op: {key: {(group, source_id): [ModRecord]}}}
+        self.index = dict((op, {}) for op in stat_line_regexes)
+        # Keys that match a pattern, per op. Forgotten when a new key is added. {(op, pattern): [key]}
+        self.key_matches = {}
+
+    def clear(self):
+        self.sources.clear()
+        for keys in self.index.values():
+            keys.clear()
+        self.key_matches.clear()
+
+    def add_source(self, group, source_id, lines):
+        """
+        Add, or replace, the stat lines of a node or item.
+        :param group: str: what sort of source. EG: "node", "item".
+        :param source_id: int: the node or item id.
+        :param lines: list of str.
+        :return: N/A
+        """
+        source = (group, source_id)
+        lines = tuple(lines)
+        if self.sources.get(source, (None,))[0] == lines:
+            return
+        self.remove_source(group, source_id)
+        records = [record for line in lines for record in parse_stat_line(line)]
+        self.sources[source] = (lines, records)
+        for record in records:
+            keys = self.index[record.op]
+            if record.key not in keys:
+                keys[record.key] = {}
+                self.key_matches.clear()
+            keys[record.key].setdefault(source, []).append(record)
+
+    def remove_source(self, group, source_id):
+        """
+        Remove the stat lines of a node or item.
+        :param group: str: what sort of source. EG: "node", "item".
+        :param source_id: int: the node or item id.
+        :return: N/A
+        """
+        source = (group, source_id)
+        lines, records = self.sources.pop(source, (None, []))
+        for record in records:
+            self.index[record.op].get(record.key, {}).pop(source, None)
+
+    def set_sources(self, group, lines_by_id):
+        """
+        Make a group hold exactly these sources, only touching the ones that have changed.
+        :param group: str: what sort of source. EG: "node", "item".
+        :param lines_by_id: dict: {source_id: list of str}
+        :return: N/A
+        """
+        for _group, source_id in [source for source in self.sources if source[0] == group and source[1] not in lines_by_id]:
+            self.remove_source(group, source_id)
+        for source_id, lines in lines_by_id.items():
+            self.add_source(group, source_id, lines)
+
+    def values(self, op, pattern, group=None, minion=False, percent=None, default_value=0) -> list:
+        """
+        Get the values of every stat of an op whose key matches a pattern. Takes the place of search_stats_list_for_regex().
+        :param op: str: "add", "inc", "red", "more" or "less".
+        :param pattern: str: regex searched for in the key. EG: "maximum Life", "Fire.*Resistance", "^all Attributes$".
+        :param group: str: only this sort of source. None for all.
+        :param minion: bool: minion stats (True) or player stats (False).
+        :param percent: bool: only stats with (True) or without (False) a %. None for either.
+        :param default_value: int: A value that suits the calculation if no stats found (EG: 1 for multiplication, 0 for addition).
+        :return: list: the values. Some results need to be sum'd and others product'd.
+        """
+        keys = self.key_matches.get((op, pattern), None)
+        if keys is None:
+            regex = re.compile(pattern)
+            keys = [key for key in self.index[op] if regex.search(key)]
+            self.key_matches[(op, pattern)] = keys
+        value = [
+            record.value
+            for key in keys
+            for source, records in self.index[op][key].items()
+            if group is None or source[0] == group
+            for record in records
+            if record.minion == minion and (percent is None or record.percent == percent)
+        ]
+        return value == [] and [int(default_value)] or value
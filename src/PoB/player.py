@@ -4,16 +4,15 @@ A unique Player is defined by: level, class selection, ascendancy selection,
 skill selection, and itemization across the item sets.
 """
 
-from copy import deepcopy
 import math
 import re
 
 from PySide6.QtWidgets import QLabel, QSpinBox
 
 from PoB.constants import PlayerClasses, bad_text, default_max_charges, extraSaveStats, player_stats_list
+from PoB.mod_db import ModDB
 from PoB.utils import format_number, print_call_stack
 from ui.PoB_Main_Window import Ui_MainWindow
-from widgets.ui_utils import search_stats_list_for_regex
 
 # 2 base accuracy per level.
 # 50 life and gains additional 12 life per level.
@@ -42,6 +41,23 @@ class_stats = {
 }
 
 
+def split_output(output: dict, stats: dict, conditions: dict):
+    """
+    Split part of a calc's mainOutput by the type of each value. Strings and nested dicts are skipped.
+    :param output: dict: mainOutput, or one of its groups.
+    :param stats: dict: numbers are added here.
+    :param conditions: dict: booleans are added here.
+    :return: N/A
+    """
+    for key, value in output.items():
+        match value:
+            # bool() must come before int
+            case bool():
+                conditions[key] = value
+            case int() | float():
+                stats[key] = value
+
+
 class Player:
     def __init__(self, settings, build, _win: Ui_MainWindow, _minion=False) -> None:
         self.minion = _minion
@@ -58,6 +74,9 @@ class Player:
         self.offhand = {}
         # dictionary list of things like ManaHasCost = True
         self.conditions = {}
+        # The minion of the main skill. Numbers go to stats and booleans to conditions, as for the player.
+        self.minion_stats = {}
+        self.minion_conditions = {}
         # self.skills = []
         # self.item_sets = set()
         # self.minions = set()
@@ -65,12 +84,8 @@ class Player:
         self.json_player_class = None
         self.nodes = set()  # set of active Nodes()
         self.items = []
-        self.item_player_stats = {}
-        self.node_player_stats = {}
-        self.all_player_stats = {}
-        self.item_minion_stats = {}
-        self.node_minion_stats = {}
-        self.all_minion_stats = {}
+        # Parsed stats of the nodes and items above, for the stat math. Kept between calcs and updated with the changes.
+        self.mod_db = ModDB()
         # List of warnings
         self.warnings = []
         self.current_skill = {}
@@ -78,6 +93,13 @@ class Player:
     def __repr__(self) -> str:
         return f"Level {self.level} {self.player_class.name}"
 
+    @property
+    def skill_flags(self) -> list:
+        """
+        :return: list: the baseFlags of the main skill's granted effect. EG: ["attack", "projectile"]. [] if there is no main skill.
+        """
+        return (self.current_skill or {}).get("grantedEffect", {}).get("baseFlags", [])
+
     def load(self, _build, minion=False):
         """
         ToDo: Should we load and keep stats - or clear them ???
@@ -156,51 +178,26 @@ class Player:
         self.items = active_items
 
         # Get all the nodes that have stat values
+        node_lines = {}
         for node_id in self.build.current_spec.nodes:
             node = self.build.current_tree.nodes.get(node_id, None)
             # print(f"{node_id=}, {node.name=}, {node.stats=}")
             if node is not None and node.stats:
-                # print(node_id, node.stats)
                 self.nodes.add(node)
-                for stat in node.stats:
-                    if "Minion" in stat:
-                        self.node_minion_stats[f"{stat}::{node.id}"] = {"id": f"{node_id}", "name": f"{node.name}"}
-                    else:
-                        self.node_player_stats[f"{stat}::{node.id}"] = {"id": f"{node_id}", "name": f"{node.name}"}
+                node_lines[node_id] = list(node.stats)
 
         # Get all the Mastery nodes that have stat values
         for node_id in self.build.current_spec.masteryEffects:
             node = self.build.current_tree.nodes.get(node_id, None)
             if node:
-                # print(f"{node_id=}, {node.stats=}")
                 self.nodes.add(node)
-                effect_id = self.build.current_spec.get_mastery_effect(node_id)
-                effect = node.masteryEffects[effect_id]
+                effect = node.masteryEffects.get(self.build.current_spec.get_mastery_effect(node_id), None)
                 if effect:
-                    stat = effect["stats"][0]
-                    if "Minion" in stat:
-                        self.node_minion_stats[f"{stat}::{node.id}"] = {"id": f"{node_id}", "name": f"{node.name}"}
-                    else:
-                        self.node_player_stats[f"{stat}::{node.id}"] = {"id": f"{node_id}", "name": f"{node.name}"}
-        # print(f"{len(self.node_player_stats)=}, {self.node_player_stats=}")
-
-        # Get stats from all active items
-        # print(self.items)
-        for item in self.items:
-            # print(f"{item.name=}, {item.active_stats=}")
-            for stat in item.active_stats:
-                if "Minion" in stat:
-                    self.item_minion_stats[f"{stat}::{item.id}"] = {"id": f"{item.id}", "name": f"{item.name}"}
-                else:
-                    self.item_player_stats[f"{stat}::{item.id}"] = {"id": f"{item.id}", "name": f"{item.name}"}
-
-        # print(f"{len(self.item_player_stats)=}, {self.item_player_stats=}")
-        self.all_player_stats.update(self.node_player_stats)
-        self.all_player_stats.update(self.item_player_stats)
-        self.all_minion_stats.update(self.node_minion_stats)
-        self.all_minion_stats.update(self.item_minion_stats)
-        # print(f"{len(self.all_player_stats)=}, {self.all_player_stats.keys()=}")
-        # print(f"{len(self.all_minion_stats)=}, {self.all_minion_stats.keys()=}")
+                    node_lines.setdefault(node_id, []).append(effect["stats"][0])
+
+        # Only the nodes and items that changed since the last calc are parsed and indexed
+        self.mod_db.set_sources("node", node_lines)
+        self.mod_db.set_sources("item", dict((item.id, item.active_stats) for item in self.items))
 
         self.calc_attribs()
         self.calc_life()
@@ -226,33 +223,25 @@ class Player:
         """
         # find increases and additions. Some objects have things like '+21 to Dexterity and Intelligence', so use .* in regex.
         # for resistances % will be used (+30%). Others like life, dex, armour do not.
-        adds = sum(search_stats_list_for_regex(self.all_player_stats, rf"([-+]?\d+)%? to.*{search_str}", default_value, debug))
+        adds = sum(self.mod_db.values("add", search_str, default_value=default_value))
         value = start_value + adds
         if debug:
             print(f"get_simple_stat: {search_str}: {value=}, {start_value=}, {adds=}")
 
-        node_multiples = sum(
-            search_stats_list_for_regex(self.node_player_stats, rf"([-+]?\d+)% increased {search_str}", default_value, debug)
-        )
-        node_multiples -= sum(
-            search_stats_list_for_regex(self.node_player_stats, rf"([-+]?\d+)% reduced {search_str}", default_value, debug)
-        )
+        node_multiples = sum(self.mod_db.values("inc", search_str, "node", default_value=default_value))
+        node_multiples -= sum(self.mod_db.values("red", search_str, "node", default_value=default_value))
         if spec_str:
             self.stats[f"{spec_str}"] = node_multiples
 
-        item_multiples = sum(
-            search_stats_list_for_regex(self.item_player_stats, rf"([-+]?\d+)% increased {search_str}", default_value, debug)
-        )
-        item_multiples -= sum(
-            search_stats_list_for_regex(self.item_player_stats, rf"([-+]?\d+)% reduced {search_str}", default_value, debug)
-        )
+        item_multiples = sum(self.mod_db.values("inc", search_str, "item", default_value=default_value))
+        item_multiples -= sum(self.mod_db.values("red", search_str, "item", default_value=default_value))
         multiples = node_multiples + item_multiples
         value += multiples / 100 * value
         if debug:
             print(f"get_simple_stat: {value=}, {node_multiples=}, {item_multiples=}")
 
-        more = math.prod(search_stats_list_for_regex(self.item_player_stats, rf"^([-+]?\d+)% more {search_str}", 0, debug))
-        more -= math.prod(search_stats_list_for_regex(self.item_player_stats, rf"^([-+]?\d+)% less {search_str}", 0, debug))
+        more = math.prod(self.mod_db.values("more", f"^{search_str}", "item"))
+        more -= math.prod(self.mod_db.values("less", f"^{search_str}", "item"))
         if debug:
             print(f"get_simple_stat: {value=}, {more=}, {((more  / 100 ) + 1 )=}")
         if more:
@@ -272,7 +261,7 @@ class Player:
         :param debug: bool: Ease of printing facts for a given specification
         :return: N/A
         """
-        all_attribs = sum(search_stats_list_for_regex(self.all_player_stats, r"^([-+]?[\d\.]+) to all Attributes", 0, debug))
+        all_attribs = sum(self.mod_db.values("add", "^all Attributes$", percent=False))
         for attrib in ("Str", "Dex", "Int"):
             # attrib = "Str"
             long_str = player_stats_list[attrib]["label"]
@@ -407,9 +396,7 @@ class Player:
         :return: N/A
         """
         for charge_type in ("Power", "Frenzy", "Endurance", "Siphoning", "Challenger", "Blitz"):
-            extra_charges = sum(
-                search_stats_list_for_regex(self.all_player_stats, rf"([-+]?\d+) to Maximum {charge_type} Charges", 0, debug)
-            )
+            extra_charges = sum(self.mod_db.values("add", f"^Maximum {charge_type} Charges"))
             if debug:
                 print(f"calc_charges, {charge_type=}, {extra_charges=}")
             # Get extra charges (which could be negative) and set that value, or 0 if it goes negative.
@@ -432,10 +419,8 @@ class Player:
         # Setbase value.
         end_chg_res = self.win.check_EnduranceCharges.isChecked() and (self.win.spin_NumEnduranceCharges.value() * 4) or 0
 
-        all_ele_res = end_chg_res + sum(
-            search_stats_list_for_regex(self.all_player_stats, r"^([-+]?\d+)% to all Elemental Resistances", 0, debug)
-        )
-        max_res = 75 + sum(search_stats_list_for_regex(self.all_player_stats, r"^([-+]?\d+)% to all maximum Resistances", 0, debug))
+        all_ele_res = end_chg_res + sum(self.mod_db.values("add", "^all Elemental Resistances", percent=True))
+        max_res = 75 + sum(self.mod_db.values("add", "^all maximum Resistances", percent=True))
         for res in ("Fire", "Cold", "Lightning", "Chaos"):
             if res == "Chaos":
                 # to all Elemental Resistances doesn't affect chaos
@@ -463,316 +448,295 @@ class Player:
         """Erase internal variables"""
         self.items.clear()
         self.nodes.clear()
-        self.node_player_stats.clear()
-        self.item_player_stats.clear()
-        self.item_minion_stats.clear()
-        self.node_minion_stats.clear()
-        self.all_player_stats.clear()
-        self.all_minion_stats.clear()
         self.stats.clear()
         self.conditions.clear()
         self.mainhand.clear()
         self.offhand.clear()
+        self.minion_stats.clear()
+        self.minion_conditions.clear()
 
-    def stat_conditions(self, stat_name: str, stat_value: any, stat: dict, skill_flags: list, max_value: int = 0) -> bool:
+    def set_output(self, output: dict):
+        """
+        Fill the stats from a calc's mainOutput. Only the groups the calc was asked for are present (see CalcWorker.output_groups).
+        Numbers go to stats and booleans to conditions. MainHand, OffHand and Minion are nested dicts.
+        :param output: dict: mainOutput from Lua PoB.
+        :return: N/A
         """
-        Check if this stat can be shown.
-        :param max_value:
+        self.clear()
+        split_output(output, self.stats, self.conditions)
+        self.mainhand.update(output.get("MainHand", {}))
+        self.offhand.update(output.get("OffHand", {}))
+        split_output(output.get("Minion", {}), self.minion_stats, self.minion_conditions)
+
+    def stat_condition(self, stat_name: str, stat_value: any, skill_flags=()) -> bool:
+        """
+        Check if this stat can be shown. For stats with a condition of "Y" in player_stats_list.
+        Stats without a test here are shown if they aren't 0.
         :param stat_name: str
         :param stat_value: int or float
-        :param stat: dictionary from player_stats_list constant (this is deepcopied so can be altered)
-        :param skill_flags: list. The baseFlags entry from the current skill, or []
-        :param max_value: int
-        :return:
-            bool: true if stat_value is not 0
-            stat: a copy of the passed in stat, altered if needed.
+        :param skill_flags: list. See skill_flags.
+        :return: bool: True if the stat should be shown.
         """
-        # print(f"stat_conditions: {stat_name=}, {stat_value=}")
-
-        # match statement, according to research on the internet, is just one big if/then/elif.
-        #   This OP shows it's gets slower the further down the list it gets: https://stackoverflow.com/questions/68476576
-        # Whilst this is more unwieldy from an admin point of view, it is fast - as a dictionary is a hash table
-        #   and all the entries are constants.
+        func = self.stat_funcs.get(stat_name, None)
+        if func is None:
+            return stat_value != 0
+        return bool(func(self, stat_value, skill_flags))
+
+    # The tests below are methods, rather than functions nested in stat_condition(), so they aren't all redefined for every stat.
+    # Which entry of a stat with several (EG: Speed's attack, spell and trigger) is shown is chosen once per main skill.
+    #   See widgets.stats_model.stat_entry().
+
+    def cond_true(self, stat_value, skill_flags) -> bool:
+        # ToDo: AverageDamage: what is monster explode and where do we get it.
+        # ToDo: CorruptingBloodDPS: v >= data.misc.DotDpsCap
+        return True
+
+    def cond_speed(self, stat_value, skill_flags) -> bool:
+        if "attack" in skill_flags or "spell" in skill_flags:
+            return stat_value > 0 and self.stats.get("TriggerTime", 0) == 0
+        return self.stats.get("TriggerTime", 0) != 0
+
+    def cond_hitchance(self, stat_value, skill_flags) -> bool:
+        # enemyHasSpellBlock is a boolean, so it is in conditions.
+        if self.conditions.get("enemyHasSpellBlock", False):
+            return True
+        return ("attack" in skill_flags or "spell" in skill_flags) and stat_value != 0
+
+    def cond_elemaximumhittaken(self, stat_value, skill_flags) -> bool:
+        # Todo: Revist for Ele Max hit (alt Tag ?)
+        return not (
+            self.stats.get("LightningMaximumHitTaken", bad_text)
+            == self.stats.get("FireMaximumHitTaken", bad_text)
+            == self.stats.get("ColdMaximumHitTaken", bad_text)
+        )
 
-        # Local variable we can overwrite when needed
-        _stat = deepcopy(stat)
+    def cond_averageburstdamage(self, stat_value, skill_flags) -> bool:
+        return self.stats.get("AverageBurstHits", 0) > 1 and stat_value > 0
 
-        def averagedamage():
-            nonlocal _stat
-            # ToDo: what is monster explode and where do we get it.
-            _stat = stat["attack"]
-            return True
+    def cond_not_triggertime(self, stat_value, skill_flags) -> bool:
+        return self.stats.get("TriggerTime", bad_text) == bad_text
 
-        def averageburstdamage():
-            return self.stats.get("AverageBurstHits", 0) > 1 and stat_value > 0
-
-        def speed():
-            nonlocal _stat
-            if "attack" in skill_flags:
-                _stat = stat["attack"]
-                return stat_value > 0 and self.stats.get("TriggerTime", 0) == 0
-            elif "spell" in skill_flags:
-                _stat = stat["spell"]
-                return stat_value > 0 and self.stats.get("TriggerTime", 0) == 0
-            else:
-                _stat = stat["trigger"]
-                return self.stats.get("TriggerTime", 0) != 0
-
-        def not_triggertime():
-            return self.stats.get("TriggerTime", bad_text) == bad_text
-
-        def critchance():
-            return stat_value != self.stats.get("PreEffectiveCritChance", 0)
-
-        def critmultiplier():
-            return self.stats.get("CritChance", 0) != 0
-
-        def hitchance():
-            nonlocal _stat
-            if self.stats.get("enemyHasSpellBlock", bad_text) != bad_text:
-                _stat = stat["enemyHasSpellBlock"]
-                return
-            else:
-                _stat = stat["attack"]
-                return "attack" in skill_flags
-
-        def totaldps():
-            nonlocal _stat
-            # ToDo: Need to work out the diff for "showAverage" and "notAverage".
-            _stat = stat["showAverage"]
-            return True
+    def cond_critchance(self, stat_value, skill_flags) -> bool:
+        return stat_value != self.stats.get("PreEffectiveCritChance", 0)
 
-        def withdotdps():
-            return (
-                stat_value != self.stats["TotalDPS"]
-                and self.stats.get("PoisonDPS", 0) == 0
-                and self.stats.get("IgniteDPS", 0) == 0
-                and self.stats.get("ImpaleDPS", 0) == 0
-                and self.stats.get("BleedDPS", 0) == 0
-            )
+    def cond_critmultiplier(self, stat_value, skill_flags) -> bool:
+        return self.stats.get("CritChance", 0) != 0
 
-        def corruptingblooddps():
-            # ToDo: v >= data.misc.DotDpsCap
-            return True
+    def cond_withdotdps(self, stat_value, skill_flags) -> bool:
+        return (
+            stat_value != self.stats["TotalDPS"]
+            and self.stats.get("PoisonDPS", 0) == 0
+            and self.stats.get("IgniteDPS", 0) == 0
+            and self.stats.get("ImpaleDPS", 0) == 0
+            and self.stats.get("BleedDPS", 0) == 0
+        )
 
-        def withbleeddps():
-            return (
-                stat_value != self.stats["TotalDPS"]
-                and self.stats.get("PoisonDPS", 0) == 0
-                and self.stats.get("IgniteDPS", 0) == 0
-                and self.stats.get("ImpaleDPS", 0) == 0
-                and self.stats.get("TotalDot", 0) == 0
-            )
+    def cond_withbleeddps(self, stat_value, skill_flags) -> bool:
+        return (
+            stat_value != self.stats["TotalDPS"]
+            and self.stats.get("PoisonDPS", 0) == 0
+            and self.stats.get("IgniteDPS", 0) == 0
+            and self.stats.get("ImpaleDPS", 0) == 0
+            and self.stats.get("TotalDot", 0) == 0
+        )
 
-        def mirageburninggrounddps():
-            return stat_value != self.stats.get("BurningGroundDPS", bad_text)
+    def cond_mirageburninggrounddps(self, stat_value, skill_flags) -> bool:
+        return stat_value != self.stats.get("BurningGroundDPS", bad_text)
 
-        def withignitedps():
-            return (
-                stat_value != self.stats["TotalDPS"]
-                and self.stats.get("PoisonDPS", 0) == 0
-                and self.stats.get("BleedDPS", 0) == 0
-                and self.stats.get("ImpaleDPS", 0) == 0
-                and self.stats.get("TotalDot", 0) == 0
-            )
+    def cond_withignitedps(self, stat_value, skill_flags) -> bool:
+        return (
+            stat_value != self.stats["TotalDPS"]
+            and self.stats.get("PoisonDPS", 0) == 0
+            and self.stats.get("BleedDPS", 0) == 0
+            and self.stats.get("ImpaleDPS", 0) == 0
+            and self.stats.get("TotalDot", 0) == 0
+        )
 
-        def miragecausticgrounddps():
-            return stat_value != self.stats.get("CausticGroundDPS", bad_text)
+    def cond_miragecausticgrounddps(self, stat_value, skill_flags) -> bool:
+        return stat_value != self.stats.get("CausticGroundDPS", bad_text)
 
-        def withpoisondps():
-            return (
-                stat_value != self.stats["TotalDPS"]
-                and self.stats.get("IgniteDPS", 0) == 0
-                and self.stats.get("BleedDPS", 0) == 0
-                and self.stats.get("ImpaleDPS", 0) == 0
-                and self.stats.get("TotalDot", 0) == 0
-            )
+    def cond_withpoisondps(self, stat_value, skill_flags) -> bool:
+        return (
+            stat_value != self.stats["TotalDPS"]
+            and self.stats.get("IgniteDPS", 0) == 0
+            and self.stats.get("BleedDPS", 0) == 0
+            and self.stats.get("ImpaleDPS", 0) == 0
+            and self.stats.get("TotalDot", 0) == 0
+        )
 
-        def totaldotdps():
-            return self.stats.get("showTotalDotDPS", 0) or (
-                stat_value != self.stats.get("TotalDot", 0)
-                and stat_value != self.stats.get("TotalPoisonDPS", 0)
-                and stat_value != self.stats.get("CausticGroundDPS", 0)
-                and stat_value != (self.stats.get("TotalIgniteDPS", 0) or self.stats.get("IgniteDPS", 0))
-                and stat_value != self.stats.get("BurningGroundDPS", 0)
-                and stat_value != self.stats.get("BleedDPS", 0)
-                and stat_value != self.stats.get("CorruptingBloodDPS", 0)
-                and stat_value != self.stats.get("MirageCausticGroundDPS", 0)
-                and stat_value != self.stats.get("MirageBurningGroundDPS", 0)
-            )
+    def cond_totaldotdps(self, stat_value, skill_flags) -> bool:
+        return self.stats.get("showTotalDotDPS", 0) or (
+            stat_value != self.stats.get("TotalDot", 0)
+            and stat_value != self.stats.get("TotalPoisonDPS", 0)
+            and stat_value != self.stats.get("CausticGroundDPS", 0)
+            and stat_value != (self.stats.get("TotalIgniteDPS", 0) or self.stats.get("IgniteDPS", 0))
+            and stat_value != self.stats.get("BurningGroundDPS", 0)
+            and stat_value != self.stats.get("BleedDPS", 0)
+            and stat_value != self.stats.get("CorruptingBloodDPS", 0)
+            and stat_value != self.stats.get("MirageCausticGroundDPS", 0)
+            and stat_value != self.stats.get("MirageBurningGroundDPS", 0)
+        )
 
-        def withimpaledps():
-            return (
-                stat_value != self.stats["TotalDPS"]
-                and self.stats.get("IgniteDPS", 0) == 0
-                and self.stats.get("BleedDPS", 0) == 0
-                and self.stats.get("PoisonDPS", 0) == 0
-                and self.stats.get("TotalDot", 0) == 0
-            )
+    def cond_withimpaledps(self, stat_value, skill_flags) -> bool:
+        return (
+            stat_value != self.stats["TotalDPS"]
+            and self.stats.get("IgniteDPS", 0) == 0
+            and self.stats.get("BleedDPS", 0) == 0
+            and self.stats.get("PoisonDPS", 0) == 0
+            and self.stats.get("TotalDot", 0) == 0
+        )
 
-        def combineddps():
-            return (
-                stat_value != (self.stats.get("TotalDPS", 0) + (self.stats.get("TotalDot", 0)))
-                and stat_value != self.stats.get("WithImpaleDPS", 0)
-                and (
-                    self.stats.get("showTotalDotDPS", 0) != 0
-                    or (
-                        stat_value != self.stats.get("WithPoisonDPS", 0) != 0
-                        and stat_value != self.stats.get("WithIgniteDPS", 0) != 0
-                        and stat_value != self.stats.get("WithBleedDPS", 0) != 0
-                    )
+    def cond_combineddps(self, stat_value, skill_flags) -> bool:
+        return (
+            stat_value != (self.stats.get("TotalDPS", 0) + (self.stats.get("TotalDot", 0)))
+            and stat_value != self.stats.get("WithImpaleDPS", 0)
+            and (
+                self.stats.get("showTotalDotDPS", 0) != 0
+                or (
+                    stat_value != self.stats.get("WithPoisonDPS", 0) != 0
+                    and stat_value != self.stats.get("WithIgniteDPS", 0) != 0
+                    and stat_value != self.stats.get("WithBleedDPS", 0) != 0
                 )
             )
+        )
 
-        def combinedavg():
-            return (
-                stat_value != self.stats.get("AverageDamage", 0)
-                and (self.stats.get("TotalDot", 0) == 0)
-                and (
-                    stat_value != self.stats.get("WithPoisonDPS", 0)
-                    or stat_value != self.stats.get("WithIgniteDPS", 0)
-                    or stat_value != self.stats.get("WithBleedDPS", 0)
-                )
+    def cond_combinedavg(self, stat_value, skill_flags) -> bool:
+        return (
+            stat_value != self.stats.get("AverageDamage", 0)
+            and (self.stats.get("TotalDot", 0) == 0)
+            and (
+                stat_value != self.stats.get("WithPoisonDPS", 0)
+                or stat_value != self.stats.get("WithIgniteDPS", 0)
+                or stat_value != self.stats.get("WithBleedDPS", 0)
             )
+        )
 
-        def reqstr():
-            ret = stat_value > self.stats["Str"]
-            if ret:
-                self.warnings.append("You do not meet the Strength requirement")
-            return ret
-
-        def reqdex():
-            ret = stat_value > self.stats["Dex"]
-            if ret:
-                self.warnings.append("You do not meet the Dexterity requirement")
-            return ret
-
-        def reqint():
-            ret = stat_value > self.stats["Int"]
-            if ret:
-                self.warnings.append("You do not meet the Intelligence requirement")
-            return ret
-
-        def reqomni():
-            ret = self.stats.get("Omni", bad_text) != bad_text and stat_value > self.stats["Omni"]
-            if ret:
-                self.warnings.append("You do not meet the Omniscience requirement")
-            return ret
-
-        def spec_manainc():
-            return self.stats["Mana"] != 0
-
-        def spec_energyshieldinc():
-            return self.stats.get("EnergyShield", 0) != 0
-
-        def spec_evasioninc():
-            return self.stats.get("Evasion", 0) != 0
-
-        def spec_armourinc():
-            return self.stats.get("Armour", 0) != 0
-
-        def elemaximumhittaken():
-            nonlocal _stat
-            # Todo: Revist for Ele Max hit (alt Tag ?)
-            ret = not (
-                self.stats.get("LightningMaximumHitTaken", bad_text)
-                == self.stats.get("FireMaximumHitTaken", bad_text)
-                == self.stats.get("ColdMaximumHitTaken", bad_text)
-            )
-            if not ret and stat_name == "LightningMaximumHitTaken":
-                _stat["label"] = _stat["alt_label"]
-            return ret
-
-        def spec_lifeinc():
-            return stat_value > 0 and self.stats.get("Life", 0) > 1
-
-        def lifeunreserved():
-            ret = stat_value < self.stats.get("Life", 0)
-            if ret:
-                self.warnings.append("Your unreserved Life is below 1")
-            return ret
-
-        def liferecoverable():
-            return stat_value < self.stats.get("LifeUnreserved", 0)
-
-        def liferecovery():
-            # ToDo: duplicate stats
-            return stat_value < self.stats.get("LifeUnreserved", 0)
-
-        def lifeunreservedpercent():
-            return stat_value < 100
-
-        def liferegenrecovery():
-            # ToDo: duplicate stats
-            # label = "Life Regen"
-            return (
-                self.stats.get("LifeRecovery", bad_text) != bad_text
-                and self.stats["LifeRecovery"] <= 0
-                and self.stats.get("LifeRegenRecovery", 0) != 0,
-            )
+    def cond_reqstr(self, stat_value, skill_flags) -> bool:
+        ret = stat_value > self.stats["Str"]
+        if ret:
+            self.warnings.append("You do not meet the Strength requirement")
+        return ret
+
+    def cond_reqdex(self, stat_value, skill_flags) -> bool:
+        ret = stat_value > self.stats["Dex"]
+        if ret:
+            self.warnings.append("You do not meet the Dexterity requirement")
+        return ret
+
+    def cond_reqint(self, stat_value, skill_flags) -> bool:
+        ret = stat_value > self.stats["Int"]
+        if ret:
+            self.warnings.append("You do not meet the Intelligence requirement")
+        return ret
+
+    def cond_reqomni(self, stat_value, skill_flags) -> bool:
+        ret = self.stats.get("Omni", bad_text) != bad_text and stat_value > self.stats["Omni"]
+        if ret:
+            self.warnings.append("You do not meet the Omniscience requirement")
+        return ret
+
+    def cond_spec_manainc(self, stat_value, skill_flags) -> bool:
+        return self.stats["Mana"] != 0
+
+    def cond_spec_energyshieldinc(self, stat_value, skill_flags) -> bool:
+        return self.stats.get("EnergyShield", 0) != 0
+
+    def cond_spec_evasioninc(self, stat_value, skill_flags) -> bool:
+        return self.stats.get("Evasion", 0) != 0
+
+    def cond_spec_armourinc(self, stat_value, skill_flags) -> bool:
+        return self.stats.get("Armour", 0) != 0
+
+    def cond_spec_lifeinc(self, stat_value, skill_flags) -> bool:
+        return stat_value > 0 and self.stats.get("Life", 0) > 1
+
+    def cond_lifeunreserved(self, stat_value, skill_flags) -> bool:
+        ret = stat_value < self.stats.get("Life", 0)
+        if ret:
+            self.warnings.append("Your unreserved Life is below 1")
+        return ret
+
+    def cond_liferecoverable(self, stat_value, skill_flags) -> bool:
+        return stat_value < self.stats.get("LifeUnreserved", 0)
+
+    def cond_liferecovery(self, stat_value, skill_flags) -> bool:
+        # ToDo: duplicate stats
+        return stat_value < self.stats.get("LifeUnreserved", 0)
+
+    def cond_lifeunreservedpercent(self, stat_value, skill_flags) -> bool:
+        return stat_value < 100
+
+    def cond_liferegenrecovery(self, stat_value, skill_flags) -> bool:
+        # ToDo: duplicate stats
+        # label = "Life Regen"
+        return (
+            self.stats.get("LifeRecovery", bad_text) != bad_text
+            and self.stats["LifeRecovery"] <= 0
+            and self.stats.get("LifeRegenRecovery", 0) != 0,
+        )
 
-            # # label = "Life Recovery"
-            # return self.stats["LifeRecovery"] > 0 and self.stats.get("LifeRegenRecovery", 0) != 0
-
-        def manaunreserved():
-            ret = stat_value < self.stats.get("Mana", 0)
-            if ret:
-                self.warnings.append("Your unreserved Mana is negative")
-            return ret
-
-        def manaunreservedpercent():
-            return stat_value < 100
-
-        def manaregenrecovery():
-            # ToDo: duplicate stats
-            pass
-
-        # Do Not add the (). ie: averagedamage()
-        stat_funcs = {
-            "AverageDamage": averagedamage,
-            "AverageBurstDamage": averageburstdamage,
-            "Speed": speed,
-            "HitSpeed": not_triggertime,
-            "HitTime": not_triggertime,
-            "TotemPlacementTime": not_triggertime,
-            "CritChance": critchance,
-            "CritMultiplier": critmultiplier,
-            "HitChance": hitchance,
-            "TotalDPS": totaldps,
-            "WithDotDPS": withdotdps,
-            "CorruptingBloodDPS": corruptingblooddps,
-            "WithBleedDPS": withbleeddps,
-            "MirageBurningGroundDPS": mirageburninggrounddps,
-            "WithIgniteDPS": withignitedps,
-            "MirageCausticGroundDPS": miragecausticgrounddps,
-            "WithPoisonDPS": withpoisondps,
-            "TotalDotDPS": totaldotdps,
-            "WithImpaleDPS": withimpaledps,
-            "CombinedDPS": combineddps,
-            "CombinedAvg": combinedavg,
-            "ReqStr": reqstr,
-            "ReqDex": reqdex,
-            "ReqInt": reqint,
-            "ReqOmni": reqomni,
-            "Spec:ManaInc": spec_manainc,
-            "Spec:EnergyShieldInc": spec_energyshieldinc,
-            "Spec:EvasionInc": spec_evasioninc,
-            "Spec:ArmourInc": spec_armourinc,
-            "LightningMaximumHitTaken": elemaximumhittaken,
-            "FireMaximumHitTaken": elemaximumhittaken,
-            "ColdMaximumHitTaken": elemaximumhittaken,
-            "Spec:LifeInc": spec_lifeinc,
-            "LifeUnreserved": lifeunreserved,
-            "LifeRecovery": liferecovery,
-            "LifeRecoverable": liferecoverable,
-            "LifeUnreservedPercent": lifeunreservedpercent,
-            "LifeRegenRecovery": liferegenrecovery,
-            "ManaUnreserved": manaunreserved,
-            "ManaUnreservedPercent": manaunreservedpercent,
-            "ManaRegenRecovery": manaregenrecovery,
-        }
-
-        return stat_funcs[stat_name](), _stat
-        #
-        # ToDo: stat = "MainHand", childStat = "Accuracy", label = "MH Accuracy", fmt = "d", condFunc = function(v,o) return o.PreciseTechnique end, warnFunc = function(v,o) return v < o.Life and "You do not have enough Accuracy for Precise Technique" end, warnColor = true
-        # ToDo: stat = "OffHand", childStat = "Accuracy", label = "OH Accuracy", fmt = "d", condFunc = function(v,o) return o.PreciseTechnique end, warnFunc = function(v,o) return v < o.Life and "You do not have enough Accuracy for Precise Technique" end, warnColor = true
+        # # label = "Life Recovery"
+        # return self.stats["LifeRecovery"] > 0 and self.stats.get("LifeRegenRecovery", 0) != 0
+
+    def cond_manaunreserved(self, stat_value, skill_flags) -> bool:
+        ret = stat_value < self.stats.get("Mana", 0)
+        if ret:
+            self.warnings.append("Your unreserved Mana is negative")
+        return ret
+
+    def cond_manaunreservedpercent(self, stat_value, skill_flags) -> bool:
+        return stat_value < 100
+
+    def cond_manaregenrecovery(self, stat_value, skill_flags) -> bool:
+        # ToDo: duplicate stats
+        pass
+
+    # A dictionary is a hash table, so this is faster than a match statement, which is one big if/then/elif.
+    #   https://stackoverflow.com/questions/68476576
+    # Do Not add the (). ie: cond_speed()
+    stat_funcs = {
+        "AverageDamage": cond_true,
+        "AverageBurstDamage": cond_averageburstdamage,
+        "Speed": cond_speed,
+        "HitSpeed": cond_not_triggertime,
+        "HitTime": cond_not_triggertime,
+        "TotemPlacementTime": cond_not_triggertime,
+        "CritChance": cond_critchance,
+        "CritMultiplier": cond_critmultiplier,
+        "HitChance": cond_hitchance,
+        "TotalDPS": cond_true,
+        "WithDotDPS": cond_withdotdps,
+        "CorruptingBloodDPS": cond_true,
+        "WithBleedDPS": cond_withbleeddps,
+        "MirageBurningGroundDPS": cond_mirageburninggrounddps,
+        "WithIgniteDPS": cond_withignitedps,
+        "MirageCausticGroundDPS": cond_miragecausticgrounddps,
+        "WithPoisonDPS": cond_withpoisondps,
+        "TotalDotDPS": cond_totaldotdps,
+        "WithImpaleDPS": cond_withimpaledps,
+        "CombinedDPS": cond_combineddps,
+        "CombinedAvg": cond_combinedavg,
+        "ReqStr": cond_reqstr,
+        "ReqDex": cond_reqdex,
+        "ReqInt": cond_reqint,
+        "ReqOmni": cond_reqomni,
+        "Spec:ManaInc": cond_spec_manainc,
+        "Spec:EnergyShieldInc": cond_spec_energyshieldinc,
+        "Spec:EvasionInc": cond_spec_evasioninc,
+        "Spec:ArmourInc": cond_spec_armourinc,
+        "LightningMaximumHitTaken": cond_elemaximumhittaken,
+        "FireMaximumHitTaken": cond_elemaximumhittaken,
+        "ColdMaximumHitTaken": cond_elemaximumhittaken,
+        "Spec:LifeInc": cond_spec_lifeinc,
+        "LifeUnreserved": cond_lifeunreserved,
+        "LifeRecovery": cond_liferecovery,
+        "LifeRecoverable": cond_liferecoverable,
+        "LifeUnreservedPercent": cond_lifeunreservedpercent,
+        "LifeRegenRecovery": cond_liferegenrecovery,
+        "ManaUnreserved": cond_manaunreserved,
+        "ManaUnreservedPercent": cond_manaunreservedpercent,
+        "ManaRegenRecovery": cond_manaregenrecovery,
+    }
+    #
+    # ToDo: stat = "MainHand", childStat = "Accuracy", label = "MH Accuracy", fmt = "d", condFunc = function(v,o) return o.PreciseTechnique end, warnFunc = function(v,o) return v < o.Life and "You do not have enough Accuracy for Precise Technique" end, warnColor = true
+    # ToDo: stat = "OffHand", childStat = "Accuracy", label = "OH Accuracy", fmt = "d", condFunc = function(v,o) return o.PreciseTechnique end, warnFunc = function(v,o) return v < o.Life and "You do not have enough Accuracy for Precise Technique" end, warnColor = true
@@ -1,21 +1,108 @@
 """
-Functions for reading and writing xml and json.
+Functions for reading and writing xml, json and pickle.
 
 This is a base PoB class. It doesn't import any other PoB classes.
-
-!!!! read_xml_as_dict(filename) is used by get_file_info. !!!!
 """
 
 from pathlib import Path, WindowsPath
 import json
 import os
+import pickle
+import re
+import xml.etree.ElementTree as ET
 
 from PoB.constants import ColourCodes
-from PoB.pob_xml import read_xml_as_dict
 from PoB.utils import _debug, print_call_stack
 
 
-def get_file_info(settings, filename, max_length, max_filename_width=40, html=True, menu=False):
+# How much of a json build to read at a time when looking for its Build section.
+header_chunk_size = 16384
+# The start of a json build, and its Build section. EG: {"PathOfBuilding": {"Build": {"level": ...
+json_build_root_regex = re.compile(r'\s*{\s*"PathOfBuilding"\s*:')
+json_build_section_regex = re.compile(r'"Build"\s*:\s*{')
+# get_file_info()'s header when it isn't known, so the file is read. A header of None is a file that isn't a build.
+header_unknown = object()
+
+
+def read_build_header(filename):
+    """
+    Read just the Build section of a build, which is near the top of the file, and stop there.
+    Much quicker than reading the whole file when all we want is the class and level (EG: for listing builds).
+
+    :param filename: str or Path: the xml or json build.
+    :return: dict: {"level": str, "className": str, "ascendClassName": str, "version": int (1 for xml, 2 for json)}.
+                   None if the file can't be read, or isn't a build.
+    """
+    _fn = Path(filename)
+    try:
+        if _fn.suffix == ".json":
+            build = read_json_build_section(_fn)
+            version = 2
+        else:
+            build = None
+            with _fn.open("rb") as xml_file:
+                for event, element in ET.iterparse(xml_file, events=("start",)):
+                    if element.tag == "Build":
+                        build = element.attrib
+                        break
+            version = 1
+    # parent of IOError, OSError *and* WindowsError where available
+    except (EnvironmentError, ET.ParseError, json.decoder.JSONDecodeError, UnicodeDecodeError):
+        print(f"Unable to open {_fn} (read_build_header)")
+        return None
+    if not build:
+        return None
+    return {
+        "level": str(build.get("level", "1")),
+        "className": build.get("className", "Scion"),
+        "ascendClassName": build.get("ascendClassName", "None"),
+        "version": version,
+    }
+
+
+def read_json_build_section(_fn):
+    """
+    Read a json build until its "Build" object is complete. write_json() sorts the keys, so "Build" is first.
+    Each chunk is searched from where the last search stopped, and a Build object that is still incomplete is only decoded
+      again when its text has doubled, so a large file is read in linear time.
+
+    :param _fn: Path: the json build.
+    :return: dict: the Build object, or None if there isn't one or the file isn't a build.
+    """
+    decoder = json.JSONDecoder()
+    text = ""
+    # Where to look for "Build" from, and then where its object starts
+    search_from = 0
+    build_start = -1
+    # How long the text must be before the Build object is decoded again
+    decode_at = 0
+    with _fn.open("r", encoding="utf-8") as json_file:
+        while True:
+            chunk = json_file.read(header_chunk_size)
+            if text == "" and not json_build_root_regex.match(chunk):
+                # Some other json
+                return None
+            text += chunk
+            if build_start < 0:
+                m = json_build_section_regex.search(text, search_from)
+                if m:
+                    build_start = m.end() - 1
+                else:
+                    # "Build" may be split between this chunk and the next
+                    search_from = max(0, len(text) - 64)
+            if build_start >= 0 and (len(text) >= decode_at or chunk == ""):
+                try:
+                    return decoder.raw_decode(text, build_start)[0]
+                except json.decoder.JSONDecodeError:
+                    if chunk == "":
+                        raise
+                    # Not all of it has been read yet
+                    decode_at = 2 * len(text) - build_start
+            elif chunk == "":
+                return None
+
+
+def get_file_info(settings, filename, max_length, max_filename_width=40, html=True, menu=False, header=header_unknown):
     """
     Open the xml/json and get the class information, level and version. Format a line for display on the listbox.
     Take into account the maximum width of the listbox and trim names as needed.
@@ -26,24 +113,16 @@ def get_file_info(settings, filename, max_length, max_filename_width=40, html=Tr
     :param max_filename_width: int: Maximum number of characters of the filename to be shown.
     :param html: bool: If True return the text as html formatted.
     :param menu: bool: Menu entry text is covered by QSS
+    :param header: dict: the file's read_build_header(), if already known (EG: from BuildIndex()). None if it isn't a build.
+        Read from the file if header_unknown.
     :return: str, str: "", "" if invalid xml, or colourized name and class name.
     """
+    if header is header_unknown:
+        header = read_build_header(filename)
     if type(filename) is Path or type(filename) is WindowsPath:
         filename = filename.name
-    if "json" in filename:
-        _file = read_json(filename)
-        pre = ""
-        version = 2
-    else:
-        _file = read_xml_as_dict(filename)
-        pre = "@"  # xml have @ as the prefix to a name
-        version = 1
-
-    if _file is None:
-        return "", ""
 
-    build = _file.get("PathOfBuilding", {}).get("Build", {})
-    if build != {}:
+    if header is not None:
         try:
             filename = Path(filename).relative_to(settings.build_path)
         except ValueError:
@@ -56,13 +135,12 @@ def get_file_info(settings, filename, max_length, max_filename_width=40, html=Tr
         # Create a spacer string of the correct length to right justify the class info.
         spacer = (min(max_length, max_filename_width) - len(name) + 4) * " "
 
-        # The information on the right. pre is @ for xml's ("@level") and "level" for json's
-        # version = build.get(f"{pre}version", "1")
-        level = build.get(f"{pre}level", "1")
-        class_name = build.get(f"{pre}className", "Scion")
-        ascend_class_name = build.get(f"{pre}ascendClassName", "None")
+        # The information on the right.
+        level = header["level"]
+        class_name = header["className"]
+        ascend_class_name = header["ascendClassName"]
         _class = ascend_class_name == "None" and class_name or ascend_class_name
-        info_text = f" Level {level} {_class} (v{version})"
+        info_text = f" Level {level} {_class} (v{header['version']})"
 
         colour = ColourCodes[class_name.upper()].value
         if html:
@@ -131,3 +209,37 @@ def write_json(filename, _dict, _indent=2):
             json.dump(_dict, json_file, indent=_indent, sort_keys=True)
     except EnvironmentError:  # parent of IOError, OSError *and* WindowsError where available
         print(f"Unable to write to {_fn}")
+
+
+def read_pickle(filename):
+    """
+    Reads a pickle file, such as a cache written by write_pickle()
+    :param filename: Name of pickle to be read
+    :returns: The object in the file, or None if the file is missing or unreadable
+    """
+    _fn = Path(filename)
+    if _fn.exists():
+        try:
+            with _fn.open("rb") as pickle_file:
+                return pickle.load(pickle_file)
+        # A cache written by an older version may refer to things that no longer exist, so be generous with what we catch
+        except (EnvironmentError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError):
+            print(f"Unable to open {_fn} (read_pickle)")
+    return None
+
+
+def write_pickle(filename, _object):
+    """
+    Write a pickle file. The file is written to a temporary name first, so a crash can't leave a half written file.
+    :param filename: Name of pickle to be written
+    :param _object: New contents of the file
+    :returns: N/A
+    """
+    _fn = Path(filename)
+    _tmp = _fn.with_name(f"{_fn.name}.tmp")
+    try:
+        with _tmp.open("wb") as pickle_file:
+            pickle.dump(_object, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(_tmp, _fn)
+    except EnvironmentError:  # parent of IOError, OSError *and* WindowsError where available
+        print(f"Unable to write to {_fn}")
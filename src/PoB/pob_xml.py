@@ -3,8 +3,6 @@ Functions for reading and writing xml only.
 This has been separated to make removal of the xml routines.
 
 This is a base PoB class. It doesn't import any other PoB classes.
-
-!!!! read_xml_as_dict(filename) is used by get_file_info in pob_file !!!!
 """
 
 from copy import deepcopy
@@ -93,7 +91,6 @@ def print_a_xml_element(the_element):
 def read_xml_as_dict(filename):
     """
     Reads a XML file
-    !!!! This stays in this module as it is used by get_file_info !!!!
     :param filename: Name of xml to be read
     :returns: A dictionary of the contents of the file
     """
@@ -452,13 +449,47 @@ def load_item_from_xml(items_free_text, _id=0, debug_lines=False):
     # load_item_from_xml
 
 
+def iter_xml_sections(filename):
+    """
+    Read a lua PoB xml one section (Build, Tree, Skills, Items, ...) at a time.
+    Each section is emptied once the caller has moved on, so only one is held in memory at a time.
+    :param filename: str: the xml.
+    :return: generator of ET.Element. Nothing if the file isn't a PoB xml.
+    """
+    with Path(filename).open("rb") as xml_file:
+        depth = 0
+        for event, element in ET.iterparse(xml_file, events=("start", "end")):
+            if event == "start":
+                if depth == 0 and element.tag != "PathOfBuilding":
+                    return
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 1:
+                    yield element
+                    element.clear()
+
+
+def xml_text(element, default=""):
+    """
+    Get the text of an element, without the leading and trailing whitespace lua PoB indents it with.
+    Text either side of child elements (EG: <ModRange> in an <Item>) is joined together.
+    :param element: ET.Element: or None.
+    :param default: str: if there is no element or no text.
+    :return: str:
+    """
+    if element is None:
+        return default
+    text = "".join([element.text or ""] + [child.tail or "" for child in element]).strip()
+    return text or default
+
+
 def load_from_xml(filename_or_xml):
     """
     Convert a lua PoB xml to a dict.
-    lua PoB won't put a single Gem, Item, Spec, etc in a list. It will just appear as a single dict()
-    So there are lots of checks for this and adding a single entry into a list().
+    Files are read a section at a time (see iter_xml_sections()), and each section is converted as soon as it is read.
     lua PoB is 1 based in it's counting, pyPob is 0 based
-    :param filename_or_xml: str|dict: either a filepath for loading an xml or an ET from the import dialog
+    :param filename_or_xml: str|ET.ElementTree: either a filepath for loading an xml or an ET from the import dialog
     :return: dict
     """
 
@@ -466,7 +497,6 @@ def load_from_xml(filename_or_xml):
         """
         Get a parameter's value, guarding against 'nil'. These have always been see in params inside a xml element
           and only numbers or booleans. - EG: <build "secondaryAscendClassId": "nil" /> .
-        So this only has to be used for param names begining with '@'.
         :param _the_value: str: The value that has been retrieved.
         :param _default: str: str version of default
         :return:
@@ -478,191 +508,156 @@ def load_from_xml(filename_or_xml):
 
     def get_input_values(_src, _dst):
         """
-        Get a list of {"@name": "key", "@string: "value"} and add it to the destination dictionary
+        Get the <Input name="key" string="value"/> elements of a section and add them to the destination dictionary
 
-        :param _src: list
+        :param _src: list of ET.Element
         :param _dst: dict
         :return:
         """
-        if _src and _dst is not None:
-            if type(_src) is dict:
-                _src = [_src]
-            for _dict in _src:
-                _name = _dict.pop("@name")
-                _value = ""
-                try:
-                    key = [key for key in _dict.keys()][0]
-                    match key:
-                        case "@string":
-                            _value = _dict[key]
-                            if _name == "customMods" and type(filename_or_xml) is not xml.etree.ElementTree.ElementTree:
-                                # EG:
-                                #   ['name="customMods" string="+1 to Maximum Endurance Charges\n+14% increased maximum Life\n']
-                                _value = read_v1_custom_mods(filename_or_xml)
-                        case "@boolean":
-                            _value = str_to_bool(_dict[key])
-                        case "@number":
-                            _value = int(_dict[key])
-                    _dst[_name] = _value
-                except KeyError:
-                    continue
-
-    if type(filename_or_xml) is xml.etree.ElementTree.ElementTree:
-        xml_PoB = xmltodict.parse(ET.tostring(filename_or_xml.getroot(), encoding="utf8").decode("utf8"))
-    else:
-        xml_PoB = read_xml_as_dict(filename_or_xml)
-    if xml_PoB is None:
-        return None
-    new_build = deepcopy(empty_build)
-    xml_PoB = xml_PoB["PathOfBuilding"]
-    json_PoB = new_build["PathOfBuilding"]
-
-    """Build"""
-    xml_build = xml_PoB["Build"]
-    json_build = {
-        "level": int(xml_build.get("@level", "1")),
-        "targetVersion": xml_build.get("@targetVersion", "3_0"),
-        "className": xml_build.get("@className", "Scion"),
-        "ascendClassName": xml_build.get("@ascendClassName", "Scion"),
-        "characterLevelAutoMode": str_to_bool(xml_build.get("@characterLevelAutoMode", "False")),
-        "mainSocketGroup": int(xml_build.get("@mainSocketGroup", "1")) - 1,
-        "viewMode": xml_build.get("@viewMode", default_view_mode),
-        "PlayerStat": {},
-        "MinionStat": {},
-    }
-    for stat_type in ("PlayerStat", "MinionStat"):
-        stats = xml_build.get(stat_type, [])
-        if type(stats) is dict:  # Should be a list but will be a dict if only one entry
-            stats = [stats]
-        for stat in stats:
-            name = stat.get("@stat", "")
-            if name:
-                try:
-                    value = stat.get("@value", "")
-                    if "." in value:
-                        json_build[stat_type][name] = float(stat.get("@value", "0.0"))
-                    else:
-                        json_build[stat_type][name] = int(stat.get("@value", "0"))
-                except ValueError:
-                    # ValueError: invalid literal for int() with base 10: 'table: 0x1dc9d650'
-                    pass
-    timeless_data = xml_build.get("TimelessData", {})
-    if timeless_data:
-        json_build["TimelessData"] = {
-            "devotionVariant1": int(timeless_data.get("@devotionVariant1", "1")),
-            "devotionVariant2": int(timeless_data.get("@devotionVariant2", "1")),
-            "searchListFallback": timeless_data.get("@searchListFallback", ""),
-            "searchList": timeless_data.get("@searchList", ""),
-            "socketFilterDistance": int(timeless_data.get("@socketFilterDistance", "0")),
-        }
-    json_PoB["Build"] = json_build
-
-    """Import"""
-    xml_import = xml_PoB["Import"]
-    if xml_import is not None:
-        json_PoB["Import"] = {
-            "exportParty": str_to_bool(xml_import.get("@lastAccountHash", "false")),
-            "lastAccountHash": xml_import.get("@lastAccountHash", ""),
-            "lastCharacterHash": xml_import.get("@lastCharacterHash", ""),
-            "lastRealm": xml_import.get("@lastRealm", ""),
-            "lastLeague": xml_import.get("@lastLeague", ""),
+        for xml_input in _src:
+            _name = xml_input.get("name", "")
+            # The type is the first attribute after the name. EG: string="value"
+            _type, _value = next(((key, value) for key, value in xml_input.attrib.items() if key != "name"), ("", ""))
+            if not _name or not _type:
+                continue
+            match _type:
+                case "string":
+                    if _name == "customMods" and from_file:
+                        # The newlines in customMods are lost reading the attribute, so read them from the file.
+                        # EG:
+                        #   ['name="customMods" string="+1 to Maximum Endurance Charges\n+14% increased maximum Life\n']
+                        _value = read_v1_custom_mods(filename_or_xml)
+                case "boolean":
+                    _value = str_to_bool(_value)
+                case "number":
+                    _value = float(_value) if "." in _value else int(_value)
+                case _:
+                    _value = ""
+            _dst[_name] = _value
+
+    def load_build(xml_build):
+        json_build = {
+            "level": int(xml_build.get("level", "1")),
+            "targetVersion": xml_build.get("targetVersion", "3_0"),
+            "className": xml_build.get("className", "Scion"),
+            "ascendClassName": xml_build.get("ascendClassName", "Scion"),
+            "characterLevelAutoMode": str_to_bool(xml_build.get("characterLevelAutoMode", "False")),
+            "mainSocketGroup": int(xml_build.get("mainSocketGroup", "1")) - 1,
+            "viewMode": xml_build.get("viewMode", default_view_mode),
+            "PlayerStat": {},
+            "MinionStat": {},
         }
+        for stat_type in ("PlayerStat", "MinionStat"):
+            for stat in xml_build.iterfind(stat_type):
+                name = stat.get("stat", "")
+                if name:
+                    try:
+                        value = stat.get("value", "")
+                        if "." in value:
+                            json_build[stat_type][name] = float(stat.get("value", "0.0"))
+                        else:
+                            json_build[stat_type][name] = int(stat.get("value", "0"))
+                    except ValueError:
+                        # ValueError: invalid literal for int() with base 10: 'table: 0x1dc9d650'
+                        pass
+        timeless_data = xml_build.find("TimelessData")
+        if timeless_data is not None and timeless_data.attrib:
+            json_build["TimelessData"] = {
+                "devotionVariant1": int(timeless_data.get("devotionVariant1", "1")),
+                "devotionVariant2": int(timeless_data.get("devotionVariant2", "1")),
+                "searchListFallback": timeless_data.get("searchListFallback", ""),
+                "searchList": timeless_data.get("searchList", ""),
+                "socketFilterDistance": int(timeless_data.get("socketFilterDistance", "0")),
+            }
+        json_PoB["Build"] = json_build
+
+    def load_import(xml_import):
+        if xml_import.attrib:
+            json_PoB["Import"] = {
+                "exportParty": str_to_bool(xml_import.get("exportParty", "false")),
+                "lastAccountHash": xml_import.get("lastAccountHash", ""),
+                "lastCharacterHash": xml_import.get("lastCharacterHash", ""),
+                "lastRealm": xml_import.get("lastRealm", ""),
+                "lastLeague": xml_import.get("lastLeague", ""),
+            }
 
-    """Calcs"""
-    xml_calcs = xml_PoB["Calcs"]
-    get_input_values(xml_calcs["Input"], json_PoB["Calcs"]["Input"])
-    for section in xml_calcs["Section"]:
-        json_PoB["Calcs"]["Sections"][section["@subsection"]] = {"collapsed": str_to_bool(section["@collapsed"]), "id": section["@id"]}
+    def load_calcs(xml_calcs):
+        get_input_values(xml_calcs.iterfind("Input"), json_PoB["Calcs"]["Input"])
+        for section in xml_calcs.iterfind("Section"):
+            json_PoB["Calcs"]["Sections"][section.get("subsection")] = {
+                "collapsed": str_to_bool(section.get("collapsed")),
+                "id": section.get("id"),
+            }
 
-    """Notes"""
-    json_PoB["Notes"] = xml_PoB["Notes"]
+    def load_notes(xml_notes):
+        json_PoB["Notes"] = xml_text(xml_notes)
 
-    """Config"""
-    xml_config = xml_PoB["Config"]
-    get_input_values(xml_config.get("Input", []), json_PoB["Config"]["Input"])
-    get_input_values(xml_config.get("Placeholder", []), json_PoB["Config"]["Placeholder"])
+    def load_config(xml_config):
+        get_input_values(xml_config.iterfind("Input"), json_PoB["Config"]["Input"])
+        get_input_values(xml_config.iterfind("Placeholder"), json_PoB["Config"]["Placeholder"])
 
-    """TreeView"""
-    xml_tree_view = xml_PoB["TreeView"]
-    json_PoB["TreeView"] = {
-        "searchStr": xml_tree_view.get("@searchStr", ""),
-        "showStatDifferences": str_to_bool(xml_tree_view.get("@showStatDifferences", "True")),
-    }
+    def load_tree_view(xml_tree_view):
+        json_PoB["TreeView"] = {
+            "searchStr": xml_tree_view.get("searchStr", ""),
+            "showStatDifferences": str_to_bool(xml_tree_view.get("showStatDifferences", "True")),
+        }
 
-    """Tree/Specs"""
-    xml_tree = xml_PoB["Tree"]
-    json_PoB["Tree"] = {
-        "activeSpec": int(xml_tree.get("@activeSpec", "1")) - 1,
-        "Specs": [],
-    }
-    if type(xml_tree["Spec"]) is dict:  # Should be a list but will be a dict if only one entry
-        xml_tree["Spec"] = [xml_tree["Spec"]]
-    for xml_spec in xml_tree["Spec"]:
-        _title = xml_spec.get("@title", "Default")
-        spec = {
-            "title": _title,
-            "treeVersion": xml_spec.get("@treeVersion", _VERSION_str),
-            "classId": int(xml_spec.get("@classId", "0")),
-            "ascendClassId": int(xml_spec.get("@ascendClassId", "0")),
-            "nodes": xml_spec.get("@nodes", starting_scion_node),
-            "masteryEffects": xml_spec.get("@masteryEffects", ""),
-            "URL": xml_spec.get("URL", "https://www.pathofexile.com/passive-skill-tree/AAAABgAAAAAA"),
-            "Sockets": "",
-            "Overrides": "",
+    def load_tree(xml_tree):
+        json_PoB["Tree"] = {
+            "activeSpec": int(xml_tree.get("activeSpec", "1")) - 1,
+            "Specs": [],
         }
-        if "^" in _title:
-            spec["colour"] = check_title_for_colour(_title)
-
-        if xml_spec["Sockets"]:
-            str_sockets = ""
-            sockets = xml_spec["Sockets"]["Socket"]
-            if type(sockets) is dict:  # Should be a list but will be a dict if only one entry
-                sockets = [sockets]
-            for socket in sockets:
-                str_sockets += f"{{{socket['@nodeId']},{socket['@itemId']}}}"
-            spec["Sockets"] = str_sockets.rstrip(",")
-        # Ignoring Overrides
-        json_PoB["Tree"]["Specs"].append(spec)
-
-    """Skills/Gems"""
-    xml_skills = xml_PoB["Skills"]
-    skills = {
-        "activeSkillSet": int(get_param_value(xml_skills.get("@activeSkillSet", "1"), "1")) - 1,
-        "sortGemsByDPSField": xml_skills.get("@sortGemsByDPSField", "CombinedDPS"),
-        "sortGemsByDPS": str_to_bool(get_param_value(xml_skills.get("@sortGemsByDPS", "True"), "True")),
-        "defaultGemQuality": int(get_param_value(xml_skills.get("@defaultGemQuality", "0"), "0")),
-        "defaultGemLevel": xml_skills.get("@defaultGemLevel", "normalMaximum"),
-        "showSupportGemTypes": xml_skills.get("@showSupportGemTypes", "ALL"),
-        "showAltQualityGems": str_to_bool(get_param_value(xml_skills.get("@showAltQualityGems", "True"), "True")),
-        "SkillSets": [],
-    }
-    if type(xml_skills["SkillSet"]) is dict:  # Should be a list but will be a dict if only one entry
-        xml_skills["SkillSet"] = [xml_skills["SkillSet"]]
-    for xml_skillset in xml_skills["SkillSet"]:
-        skillset = {
-            "id": int(get_param_value(xml_skillset.get("@id", "1"), "1")) - 1,
-            "title": remove_lua_colours(xml_skillset.get("@title", "Default")),
-            "SGroups": [],
+        for xml_spec in xml_tree.iterfind("Spec"):
+            _title = xml_spec.get("title", "Default")
+            spec = {
+                "title": _title,
+                "treeVersion": xml_spec.get("treeVersion", _VERSION_str),
+                "classId": int(xml_spec.get("classId", "0")),
+                "ascendClassId": int(xml_spec.get("ascendClassId", "0")),
+                "nodes": xml_spec.get("nodes", starting_scion_node),
+                "masteryEffects": xml_spec.get("masteryEffects", ""),
+                "URL": xml_text(xml_spec.find("URL"), "https://www.pathofexile.com/passive-skill-tree/AAAABgAAAAAA"),
+                "Sockets": "",
+                "Overrides": "",
+            }
+            if "^" in _title:
+                spec["colour"] = check_title_for_colour(_title)
+            sockets = xml_spec.iterfind("Sockets/Socket")
+            spec["Sockets"] = "".join(f"{{{socket.get('nodeId')},{socket.get('itemId')}}}" for socket in sockets)
+            # Ignoring Overrides
+            json_PoB["Tree"]["Specs"].append(spec)
+
+    def load_skills(xml_skills):
+        skills = {
+            "activeSkillSet": int(get_param_value(xml_skills.get("activeSkillSet", "1"), "1")) - 1,
+            "sortGemsByDPSField": xml_skills.get("sortGemsByDPSField", "CombinedDPS"),
+            "sortGemsByDPS": str_to_bool(get_param_value(xml_skills.get("sortGemsByDPS", "True"), "True")),
+            "defaultGemQuality": int(get_param_value(xml_skills.get("defaultGemQuality", "0"), "0")),
+            "defaultGemLevel": xml_skills.get("defaultGemLevel", "normalMaximum"),
+            "showSupportGemTypes": xml_skills.get("showSupportGemTypes", "ALL"),
+            "showAltQualityGems": str_to_bool(get_param_value(xml_skills.get("showAltQualityGems", "True"), "True")),
+            "SkillSets": [],
         }
-        if type(xml_skillset.get("Skill", bad_text)) is dict:  # Should be a list but will be a dict if only one entry
-            xml_skillset["Skill"] = [xml_skillset["Skill"]]
-        for xml_sgroup in xml_skillset.get("Skill", []):
-            xml_gem = xml_sgroup.get("Gem", bad_text)
-            sgroup = {
-                "enabled": str_to_bool(get_param_value(xml_sgroup.get("@enabled", "True"), "True")),
-                "label": remove_lua_colours(xml_sgroup.get("@label", "")),
-                "source": remove_lua_colours(xml_sgroup.get("@source", "")),
-                "mainActiveSkill": int(get_param_value(xml_sgroup.get("@mainActiveSkill", "1"), "1")) - 1,
-                "mainActiveSkillCalcs": int(get_param_value(xml_sgroup.get("@mainActiveSkillCalcs", "1"), "1")) - 1,
-                "includeInFullDPS": str_to_bool(get_param_value(xml_sgroup.get("@includeInFullDPS", "False"), "False")),
-                "slot": xml_sgroup.get("@slot", ""),
-                "Gems": [],
+        # Older xml's have no skill sets, just the socket groups, so treat them as one skill set.
+        for xml_skillset in xml_skills.findall("SkillSet") or [xml_skills]:
+            skillset = {
+                "id": int(get_param_value(xml_skillset.get("id", "1"), "1")) - 1,
+                "title": remove_lua_colours(xml_skillset.get("title", "Default")),
+                "SGroups": [],
             }
             # Some socket groups have no skills in them as content creators just use the label.
-            if xml_gem != bad_text:
-                if type(xml_gem) is dict:  # Should be a list but will be a dict if only one entry
-                    xml_gem = [xml_gem]
-                for xml_gem in xml_gem:
+            for xml_sgroup in xml_skillset.iterfind("Skill"):
+                sgroup = {
+                    "enabled": str_to_bool(get_param_value(xml_sgroup.get("enabled", "True"), "True")),
+                    "label": remove_lua_colours(xml_sgroup.get("label", "")),
+                    "source": remove_lua_colours(xml_sgroup.get("source", "")),
+                    "mainActiveSkill": int(get_param_value(xml_sgroup.get("mainActiveSkill", "1"), "1")) - 1,
+                    "mainActiveSkillCalcs": int(get_param_value(xml_sgroup.get("mainActiveSkillCalcs", "1"), "1")) - 1,
+                    "includeInFullDPS": str_to_bool(get_param_value(xml_sgroup.get("includeInFullDPS", "False"), "False")),
+                    "slot": xml_sgroup.get("slot", ""),
+                    "Gems": [],
+                }
+                for xml_gem in xml_sgroup.iterfind("Gem"):
                     """
                     new >=v3.23
                     gemId="Metadata/Items/Gems/SupportGemFeedingFrenzy" 	->base_gems skillId
@@ -675,92 +670,113 @@ def load_from_xml(filename_or_xml):
                     skillId="FeedingFrenzySupport"							->base_gems Dict Key
                     nameSpec="Feeding Frenzy"								->base_gems grantedEffect.name
                     """
-                    variantId = xml_gem.get("@variantId", bad_text)
+                    variantId, skillId = xml_gem.get("variantId", bad_text), xml_gem.get("skillId", "")
                     if variantId == bad_text:
                         # pre 3.23 xml
-                        xml_gem["@variantId"] = xml_gem.get("@skillId", "")
-                        xml_gem["@skillId"] = ""
+                        variantId, skillId = skillId, ""
 
                     gem = {
-                        "enabled": str_to_bool(get_param_value(xml_gem.get("@enabled", "True"), "True")),
-                        "nameSpec": xml_gem.get("@nameSpec", ""),
-                        "variantId": xml_gem.get("@variantId", ""),
-                        "skillId": xml_gem.get("@skillId", ""),
-                        "level": int(get_param_value(xml_gem.get("@level", "1"), "1")),
-                        "qualityId": xml_gem.get("@qualityId", ""),
-                        "quality": int(get_param_value(xml_gem.get("@quality", "0"), "0")),
-                        "count": int(get_param_value(xml_gem.get("@count", "1"), "1")),
-                        "enableGlobal1": str_to_bool(get_param_value(xml_gem.get("@enableGlobal1", "True"), "True")),
-                        "enableGlobal2": str_to_bool(get_param_value(xml_gem.get("@enableGlobal2", "True"), "True")),
-                        # "gemId": xml_gem.get("@gemId", ""),
+                        "enabled": str_to_bool(get_param_value(xml_gem.get("enabled", "True"), "True")),
+                        "nameSpec": xml_gem.get("nameSpec", ""),
+                        "variantId": variantId,
+                        "skillId": skillId,
+                        "level": int(get_param_value(xml_gem.get("level", "1"), "1")),
+                        "qualityId": xml_gem.get("qualityId", ""),
+                        "quality": int(get_param_value(xml_gem.get("quality", "0"), "0")),
+                        "count": int(get_param_value(xml_gem.get("count", "1"), "1")),
+                        "enableGlobal1": str_to_bool(get_param_value(xml_gem.get("enableGlobal1", "True"), "True")),
+                        "enableGlobal2": str_to_bool(get_param_value(xml_gem.get("enableGlobal2", "True"), "True")),
+                        # "gemId": xml_gem.get("gemId", ""),
                     }
-                    if xml_gem.get("@skillMinion", ""):
-                        gem["skillMinion"] = xml_gem.get("@skillMinion")
-                        gem["skillMinionSkillCalcs"] = int(xml_gem.get("@skillMinionSkill", "1"))
-                        gem["skillMinionSkill"] = int(xml_gem.get("@skillMinionSkill", "1"))
-                        gem["skillMinionCalcs"] = xml_gem.get("@skillMinionCalcs")
+                    if xml_gem.get("skillMinion", ""):
+                        gem["skillMinion"] = xml_gem.get("skillMinion")
+                        gem["skillMinionSkillCalcs"] = int(xml_gem.get("skillMinionSkill", "1"))
+                        gem["skillMinionSkill"] = int(xml_gem.get("skillMinionSkill", "1"))
+                        gem["skillMinionCalcs"] = xml_gem.get("skillMinionCalcs")
                     sgroup["Gems"].append(gem)
-            skillset["SGroups"].append(sgroup)
-        skills["SkillSets"].append(skillset)
-
-    json_PoB["Skills"] = skills
-
-    """Items"""
-    xml_items = xml_PoB["Items"]
-    # Items
-    if type(xml_items["Item"]) is dict:  # Should be a list but will be a dict if only one entry
-        xml_items["Item"] = [xml_items["Item"]]
-    for xml_item in xml_items["Item"]:
-        json_PoB["Items"]["Items"].append(load_item_from_xml(xml_item["#text"], int(xml_item.get("@id", "0"))))
-    # ItemSets
-    json_PoB["Items"]["ItemSets"].clear()  # get rid of the default itemset
-    if type(xml_items["ItemSet"]) is dict:  # Should be a list but will be a dict if only one entry
-        xml_items["ItemSet"] = [xml_items["ItemSet"]]
-    for xml_itemset in xml_items["ItemSet"]:
-        json_set = {
-            "title": remove_lua_colours(xml_itemset.get("@title", "Default")),
-            "id": int(get_param_value(xml_itemset.get("@id", "0"), "0")) - 1,
-            "useSecondWeaponSet": str_to_bool(xml_itemset.get("@useSecondWeaponSet", "False")),
-        }
-        # The xml has too much slot info, like "Belt Abyssal Socket 6". Use our dictionary to pick out wanted entries.
-        slots = {}
-        for xml_slot in xml_itemset["Slot"]:
-            try:
+                skillset["SGroups"].append(sgroup)
+            skills["SkillSets"].append(skillset)
+
+        json_PoB["Skills"] = skills
+
+    def load_items(xml_items):
+        # Items
+        for xml_item in xml_items.iterfind("Item"):
+            json_PoB["Items"]["Items"].append(load_item_from_xml(xml_text(xml_item), int(xml_item.get("id", "0"))))
+        # ItemSets
+        xml_itemsets = xml_items.findall("ItemSet")
+        if xml_itemsets:
+            json_PoB["Items"]["ItemSets"].clear()  # get rid of the default itemset
+        for xml_itemset in xml_itemsets:
+            json_set = {
+                "title": remove_lua_colours(xml_itemset.get("title", "Default")),
+                "id": int(get_param_value(xml_itemset.get("id", "0"), "0")) - 1,
+                "useSecondWeaponSet": str_to_bool(xml_itemset.get("useSecondWeaponSet", "False")),
+            }
+            # The xml has too much slot info, like "Belt Abyssal Socket 6". Use our dictionary to pick out wanted entries.
+            slots = {}
+            for xml_slot in xml_itemset.iterfind("Slot"):
                 # any errors here will just result in a slot not being set.
-                name = xml_slot.get("@name", "")
-                _id = get_param_value(xml_slot.get("@itemId", "0"), "0")
+                name = xml_slot.get("name", "")
+                _id = get_param_value(xml_slot.get("itemId", "0"), "0")
                 if name and _id != "0" and name in empty_item_slots_dict.keys():
-                    slots[name] = {"itemId": int(_id), "itemPbURL": xml_slot.get("@itemPbURL", "")}
-            except KeyError:
-                pass
-        json_set["Slots"] = slots
-        if xml_itemset.get("SocketIdURL", None) is not None:
-            if type(xml_itemset["SocketIdURL"]) is dict:  # Should be a list but will be a dict if only one entry
-                xml_itemset["SocketIdURL"] = [xml_itemset["SocketIdURL"]]
-            for s_id in xml_itemset.get("SocketIdURL", []):
-                name = s_id.get("@name", "")
+                    slots[name] = {"itemId": int(_id), "itemPbURL": xml_slot.get("itemPbURL", "")}
+            json_set["Slots"] = slots
+            for s_id in xml_itemset.iterfind("SocketIdURL"):
+                name = s_id.get("name", "")
                 if name:
                     json_set.setdefault("SocketIdURL", []).append(
-                        {"name": name, "nodeId": int(s_id.get("@nodeId", "")), "itemPbURL": s_id.get("@itemPbURL", "")}
+                        {"name": name, "nodeId": int(s_id.get("nodeId", "")), "itemPbURL": s_id.get("itemPbURL", "")}
                     )
-        json_PoB["Items"]["ItemSets"].append(json_set)
+            json_PoB["Items"]["ItemSets"].append(json_set)
 
         # Renumber Itemset cause we want to have a nice clean start (and we really don't rely on them).
-        active_item_set = int(get_param_value(xml_items.get("@activeItemSet", "1"), "1")) - 1
+        active_item_set = int(get_param_value(xml_items.get("activeItemSet", "1"), "1")) - 1
         for idx, item_set in enumerate(json_PoB["Items"]["ItemSets"]):
             if item_set["id"] == active_item_set:
                 active_item_set = idx
             item_set["id"] = idx
         json_PoB["Items"]["activeItemSet"] = active_item_set
 
-    # Renumber ItemSets
-
-    return new_build
+    new_build = deepcopy(empty_build)
+    json_PoB = new_build["PathOfBuilding"]
+    # Sections we don't use (EG: Party) are skipped.
+    section_loaders = {
+        "Build": load_build,
+        "Import": load_import,
+        "Calcs": load_calcs,
+        "Notes": load_notes,
+        "Config": load_config,
+        "TreeView": load_tree_view,
+        "Tree": load_tree,
+        "Skills": load_skills,
+        "Items": load_items,
+    }
+    from_file = type(filename_or_xml) is not ET.ElementTree
+    found_build = False
+    try:
+        if from_file:
+            sections = iter_xml_sections(filename_or_xml)
+        elif filename_or_xml.getroot().tag == "PathOfBuilding":
+            sections = iter(filename_or_xml.getroot())
+        else:
+            sections = iter(())
+        for section in sections:
+            found_build = True
+            loader = section_loaders.get(section.tag, None)
+            if loader is not None:
+                loader(section)
+    # parent of IOError, OSError *and* WindowsError where available
+    except (EnvironmentError, ET.ParseError):
+        print(f"Unable to open {filename_or_xml} (load_from_xml)")
+        return None
+    return found_build and new_build or None
+    # load_from_xml
 
 
 def save_item_to_xml(_item, text_only=False):
     """
-    Save internal structures back to a xml object. Not used.
+    Save internal structures back to a xml object. build_to_xml_text() uses the text.
 
     :param: bool: Only return the text, not the ET - for copying items
     :return: xml.etree.ElementTree or str:
@@ -802,226 +818,278 @@ def save_item_to_xml(_item, text_only=False):
     # save
 
 
-def save_to_xml(filename, build, do_calcs=False):
+def xml_escape(value, quote=True) -> str:
     """
-    Everything needed to convert internal dict to xml
-    :param filename:
-    :param build: Build() class
-    :param do_calcs: bool: If True, called from Do_Calcs(). Don't export some entries, like Notes, to xml
-    :return: N/A
+    Escape a value for writing into xml. Newlines are left alone as lua PoB's parser keeps them (EG: customMods).
+    :param value: anything: converted with str().
+    :param quote: bool: True for attribute values, which also need " escaped.
+    :return: str:
+    """
+    text = str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return quote and text.replace('"', "&quot;") or text
+
+
+def xml_tag(tag, attribs, empty=True) -> str:
+    """
+    Write a start tag.
+    :param tag: str: EG: "Gem"
+    :param attribs: dict: {name: value}. Values are escaped. Booleans are written as true/false.
+    :param empty: bool: True for an element with no children or text, EG: <Gem ... />.
+    :return: str:
+    """
+    text = " ".join(f'{name}="{type(value) is bool and bool_to_str(value) or xml_escape(value)}"' for name, value in attribs.items())
+    return f"<{tag} {text}{empty and ' /' or ''}>"
+
+
+def build_to_xml_text(build, do_calcs=False, custom_mods_separator="\n") -> str:
+    """
+    Write internal dict as lua PoB xml text, in one pass with no pretty printing.
+    This is what is sent to luaPoB for every calculation, so it is written directly as text rather than building an ElementTree.
+    :param build: dict: Build().json
+    :param do_calcs: bool: If True, for calculations. Don't export some entries, like Notes, that don't affect them.
+    :param custom_mods_separator: str: what goes between customMods lines. See save_to_xml().
+    :return: str:
     """
 
-    def get_value_s_type(_value):
+    def input_tag(tag, _name, _value):
         match _value:
             # bool() must come before int
             case bool():
                 _type = "boolean"
-                _v = f"{_value}"
             case int() | float():
                 _type = "number"
-                _v = f"{_value}"
             case _:
                 _type = "string"
-                _v = _value
-        return _v, _type
+        return xml_tag(tag, {"name": _name, _type: _value})
 
-    # print(f"save_to_xml: {filename}")
-    debug = False
-
-    # Flag to reread the written file and change ~^ back to newlines.
-    customMods = False
-    build_xml = ET.ElementTree(ET.fromstring("<PathOfBuilding></PathOfBuilding>"))
-    xml_root = build_xml.getroot()
-
-    json_config = build["PathOfBuilding"]["Config"]
+    json_PoB = build["PathOfBuilding"]
+    json_config = json_PoB["Config"]
+    # Each element is appended as it is written and joined once at the end
+    out = ["<PathOfBuilding>"]
 
     """Build"""
-    json_build = build["PathOfBuilding"]["Build"]
-    _build = (
-        f'<Build level="{str(json_build["level"])}" targetVersion="{json_build["targetVersion"]}" '
-        f'pantheonMajorGod="{json_config["Input"]["pantheonMajorGod"]}" bandit="{json_config["Input"]["bandit"]}" '
-        f'className="{json_build["className"]}" ascendClassName="{json_build["ascendClassName"]}" '
-        f'characterLevelAutoMode="{bool_to_str(json_build["characterLevelAutoMode"])}" '
-        f'mainSocketGroup="{str(json_build["mainSocketGroup"]+1)}" viewMode="{json_build["viewMode"]}" '
-        f'pantheonMinorGod="{json_config["Input"]["pantheonMinorGod"]}" >'
-        f"</Build>"
+    json_build = json_PoB["Build"]
+    out.append(
+        xml_tag(
+            "Build",
+            {
+                "level": json_build["level"],
+                "targetVersion": json_build["targetVersion"],
+                "pantheonMajorGod": json_config["Input"]["pantheonMajorGod"],
+                "bandit": json_config["Input"]["bandit"],
+                "className": json_build["className"],
+                "ascendClassName": json_build["ascendClassName"],
+                "characterLevelAutoMode": json_build["characterLevelAutoMode"],
+                "mainSocketGroup": json_build["mainSocketGroup"] + 1,
+                "viewMode": json_build["viewMode"],
+                "pantheonMinorGod": json_config["Input"]["pantheonMinorGod"],
+            },
+            False,
+        )
     )
-    xml_build = ET.fromstring(_build)
     if not do_calcs:
-        for stat, value in json_build["PlayerStat"].items():
-            xml_build.append(ET.fromstring(f'<PlayerStat stat="{stat}" value="{str(value)}"/>'))
-        for stat, value in json_build["MinionStat"].items():
-            xml_build.append(ET.fromstring(f'<MinionStat stat="{stat}" value="{str(value)}"/>'))
+        for stat_type in ("PlayerStat", "MinionStat"):
+            for stat, value in json_build[stat_type].items():
+                out.append(xml_tag(stat_type, {"stat": stat, "value": value}))
     tld = json_build["TimelessData"]
-    xml_build.append(
-        ET.fromstring(
-            f'<TimelessData devotionVariant2="{str(tld["devotionVariant2"])}" searchListFallback="{tld["searchListFallback"]}" '
-            f'searchList="{tld["searchList"]}" socketFilterDistance="{str(tld["socketFilterDistance"])}" '
-            f'devotionVariant1="{str(tld["devotionVariant1"])}" />'
+    out.append(
+        xml_tag(
+            "TimelessData",
+            {
+                "devotionVariant2": tld["devotionVariant2"],
+                "searchListFallback": tld["searchListFallback"],
+                "searchList": tld["searchList"],
+                "socketFilterDistance": tld["socketFilterDistance"],
+                "devotionVariant1": tld["devotionVariant1"],
+            },
         )
     )
-    xml_root.append(xml_build)
-    if debug:
-        print_a_xml_element(xml_build)
+    out.append("</Build>")
 
     """Import"""
     if not do_calcs:
-        json_import = build["PathOfBuilding"]["Import"]
-        xml_import = ET.fromstring(
-            f'<Import lastCharacterHash="{json_import.get("lastCharacterHash","")}" lastRealm="{json_import.get("lastRealm","")}"'
-            f' exportParty="{bool_to_str(json_import.get("exportParty","False"))}" lastAccountHash="{json_import.get("lastAccountHash","")}"/>'
+        json_import = json_PoB["Import"]
+        out.append(
+            xml_tag(
+                "Import",
+                {
+                    "lastCharacterHash": json_import.get("lastCharacterHash", ""),
+                    "lastRealm": json_import.get("lastRealm", ""),
+                    "exportParty": json_import.get("exportParty", False),
+                    "lastAccountHash": json_import.get("lastAccountHash", ""),
+                },
+            )
         )
-        xml_root.append(xml_import)
-        if debug:
-            print_a_xml_element(xml_import)
 
     """Tree"""
-    json_tree = build["PathOfBuilding"]["Tree"]
-    xml_tree = ET.fromstring(f'<Tree activeSpec="{str(json_tree["activeSpec"]+1)}"> </Tree>')
+    json_tree = json_PoB["Tree"]
+    out.append(xml_tag("Tree", {"activeSpec": json_tree["activeSpec"] + 1}, False))
     for spec in json_tree["Specs"]:
-        _spec = (
-            f'<Spec masteryEffects="{str(spec["masteryEffects"])}" title="{spec["title"].replace("&", "&amp;")}"'
-            f' ascendClassId="{str(spec["ascendClassId"])}" nodes="{str(spec["nodes"])}" secondaryAscendClassId="0" '
-            f'treeVersion="{spec["treeVersion"]}" classId="{str(spec["classId"])}" />'
+        out.append(
+            xml_tag(
+                "Spec",
+                {
+                    "masteryEffects": spec["masteryEffects"],
+                    "title": spec["title"],
+                    "ascendClassId": spec["ascendClassId"],
+                    "nodes": spec["nodes"],
+                    "secondaryAscendClassId": 0,
+                    "treeVersion": spec["treeVersion"],
+                    "classId": spec["classId"],
+                },
+                False,
+            )
         )
-        xml_spec = ET.fromstring(_spec)
-        xml_spec.append(ET.fromstring(f'<URL>{spec["URL"]}</URL>'))
-        xml_sockets = ET.fromstring(f"<Sockets/>")
-        xml_overides = ET.fromstring(f"<Overrides/>")
-        sockets = re.findall(r"{(\d+),(\d+)}", spec["Sockets"])
-        for socket in sockets:
-            xml_sockets.append(ET.fromstring(f'<Socket nodeId="{str(socket[0])}" itemId="{str(socket[1])}"/>'))
-        # for nodeId, itemId in spec["Overrides"].items():
-        #     xml_overides.append(ET.fromstring(f'<Override nodeId="{str(nodeId)}" itemId="{str(itemId)}"/>'))
-        xml_spec.append(xml_sockets)
-        xml_spec.append(xml_overides)
-        xml_tree.append(xml_spec)
-    xml_root.append(xml_tree)
-    if debug:
-        print_a_xml_element(xml_tree)
+        out.append(f"<URL>{xml_escape(spec['URL'], False)}</URL><Sockets>")
+        for node_id, item_id in re.findall(r"{(\d+),(\d+)}", spec["Sockets"]):
+            out.append(xml_tag("Socket", {"nodeId": node_id, "itemId": item_id}))
+        # Overrides are not kept
+        out.append("</Sockets><Overrides /></Spec>")
+    out.append("</Tree>")
 
     """Notes"""
     # 20240825: I'm disabling this as I'm corrupting Notes field with HTML
     # if not do_calcs:
-    #     xml_root.append(ET.fromstring(f'<Notes>{build["PathOfBuilding"]["Notes"]}</Notes>'))
+    #     out.append(f'<Notes>{xml_escape(json_PoB["Notes"], False)}</Notes>')
 
     """Skills"""
-    json_skills = build["PathOfBuilding"]["Skills"]
-    skills = (
-        f'<Skills sortGemsByDPSField="{json_skills["sortGemsByDPSField"]}" activeSkillSet="{str(json_skills["activeSkillSet"])}" '
-        f'sortGemsByDPS="{bool_to_str(json_skills["sortGemsByDPS"])}" defaultGemQuality="{str(json_skills["defaultGemQuality"])}" '
-        f'defaultGemLevel="{json_skills["defaultGemLevel"]}" showSupportGemTypes="{json_skills["showSupportGemTypes"]}" '
-        f'showAltQualityGems="{bool_to_str(json_skills["showAltQualityGems"])}" />'
+    json_skills = json_PoB["Skills"]
+    out.append(
+        xml_tag(
+            "Skills",
+            {
+                "sortGemsByDPSField": json_skills["sortGemsByDPSField"],
+                "activeSkillSet": json_skills["activeSkillSet"],
+                "sortGemsByDPS": json_skills["sortGemsByDPS"],
+                "defaultGemQuality": json_skills["defaultGemQuality"],
+                "defaultGemLevel": json_skills["defaultGemLevel"],
+                "showSupportGemTypes": json_skills["showSupportGemTypes"],
+                "showAltQualityGems": json_skills["showAltQualityGems"],
+            },
+            False,
+        )
     )
-    xml_skills = ET.fromstring(skills)
     for _set in json_skills["SkillSets"]:
-        xml_set = ET.fromstring(f'<SkillSet id="{str(_set["id"])}" title="{str(_set["title"])}"/>')
+        out.append(xml_tag("SkillSet", {"id": _set["id"], "title": _set["title"]}, False))
         for _sg in _set["SGroups"]:
-            source_text = ""
+            sg = {
+                "mainActiveSkillCalcs": _sg["mainActiveSkillCalcs"] + 1,
+                "includeInFullDPS": _sg["includeInFullDPS"],
+                "label": _sg["label"],
+                "enabled": _sg["enabled"],
+                "slot": _sg["slot"],
+                "mainActiveSkill": _sg["mainActiveSkill"] + 1,
+            }
             if _sg.get("source", ""):
                 # we cannot have a 'source=""' in socket group. luaPoB will reject the whole socket group.
-                source_text = f'source="{_sg.get("source","")}" '
-            text_sg = (
-                f'<Skill mainActiveSkillCalcs="{str(_sg["mainActiveSkillCalcs"]+1)}" '
-                f'includeInFullDPS="{bool_to_str(_sg["includeInFullDPS"])}" '
-                f'label="{_sg["label"].replace("&", "&amp;")}" {source_text} '
-                f'enabled="{bool_to_str(_sg["enabled"])}" slot="{_sg["slot"]}" '
-                f'mainActiveSkill="{str(_sg["mainActiveSkill"]+1)}" />'
-            )
-            xml_sg = ET.fromstring(text_sg)
+                sg["source"] = _sg["source"]
+            out.append(xml_tag("Skill", sg, False))
             for _gem in _sg["Gems"]:
+                gem = {
+                    "enableGlobal2": _gem["enableGlobal2"],
+                    "level": _gem["level"],
+                    "gemId": "",
+                    "variantId": _gem["variantId"],
+                    "skillId": _gem["skillId"],
+                    "quality": _gem["quality"],
+                    "enableGlobal1": _gem["enableGlobal1"],
+                    "enabled": _gem["enabled"],
+                    "count": _gem["count"],
+                    "nameSpec": _gem["nameSpec"],
+                }
                 if _gem.get("skillMinion", ""):
-                    text_gem = (
-                        f'<Gem enableGlobal2="{bool_to_str(_gem["enableGlobal2"])}" '
-                        f'skillMinionSkillCalcs="{str(_gem["skillMinionSkillCalcs"])}" '
-                        f'level="{str(_gem["level"])}" skillId="{_gem["skillId"]}" skillMinionSkill="{str(_gem["level"])}" '
-                        f'quality="{str(_gem["quality"])}" enableGlobal1="{bool_to_str(_gem["enableGlobal1"])}" '
-                        f'enabled="{bool_to_str(_gem["enabled"])}" count="{str(_gem["count"])}" nameSpec="{_gem["nameSpec"]}" '
-                        f'skillMinion="{_gem["skillMinion"]}" />'
-                    )
-                else:
-                    text_gem = (
-                        f'<Gem enableGlobal2="{bool_to_str(_gem["enableGlobal2"])}" level="{str(_gem["level"])}" '
-                        f'gemId="" variantId="{_gem["variantId"]}" skillId="{_gem["skillId"]}" quality="{str(_gem["quality"])}" '
-                        f' enableGlobal1="{bool_to_str(_gem["enableGlobal1"])}" enabled="{bool_to_str(_gem["enabled"])}" '
-                        f'count="{str(_gem["count"])}" nameSpec="{_gem["nameSpec"]}"/>'
-                    )
-                xml_sg.append(ET.fromstring(text_gem))
-            xml_set.append(xml_sg)
-        xml_skills.append(xml_set)
-    xml_root.append(xml_skills)
-    if debug:
-        print_a_xml_element(xml_skills)
+                    del gem["gemId"], gem["variantId"]
+                    gem["skillMinion"] = _gem["skillMinion"]
+                    gem["skillMinionSkill"] = _gem["skillMinionSkill"]
+                    gem["skillMinionSkillCalcs"] = _gem["skillMinionSkillCalcs"]
+                out.append(xml_tag("Gem", gem))
+            out.append("</Skill>")
+        out.append("</SkillSet>")
+    out.append("</Skills>")
 
     """Calcs"""
-    json_calcs = build["PathOfBuilding"]["Calcs"]
-    xml_calcs = ET.fromstring(f"<Calcs/>")
+    json_calcs = json_PoB["Calcs"]
+    out.append("<Calcs>")
     for _name, _value in json_calcs["Input"].items():
-        _value, value_type = get_value_s_type(_value)
-        xml_calcs.append(ET.fromstring(f'<Input name="{_name}" {value_type}="{_value}"/>'))
+        out.append(input_tag("Input", _name, _value))
     if not do_calcs:
         for _name, _value in json_calcs["Sections"].items():
-            xml_calcs.append(
-                ET.fromstring(f'<Section subsection="{_name}" collapsed="{bool_to_str(_value["collapsed"])}" id="{_value["id"]}"/>')
-            )
-    xml_root.append(xml_calcs)
-    if debug:
-        print_a_xml_element(xml_calcs)
+            out.append(xml_tag("Section", {"subsection": _name, "collapsed": _value["collapsed"], "id": _value["id"]}))
+    out.append("</Calcs>")
 
     """TreeView"""
     if not do_calcs:
-        json_tv = build["PathOfBuilding"]["TreeView"]
-        tv = (
-            f'<TreeView searchStr="{json_tv["searchStr"]}" zoomY="0" zoomLevel="3" '
-            f'showStatDifferences="{bool_to_str(json_tv["showStatDifferences"])}" zoomX="0" />'
+        json_tv = json_PoB["TreeView"]
+        out.append(
+            xml_tag(
+                "TreeView",
+                {
+                    "searchStr": json_tv["searchStr"],
+                    "zoomY": 0,
+                    "zoomLevel": 3,
+                    "showStatDifferences": json_tv["showStatDifferences"],
+                    "zoomX": 0,
+                },
+            )
         )
-        xml_root.append(ET.fromstring(tv))
-        if debug:
-            print_a_xml_element(ET.fromstring(tv))
 
     """Items"""
-    json_items = build["PathOfBuilding"]["Items"]
-    items = f'<Items activeItemSet="{str(json_items["activeItemSet"]+1)}" />'
-    xml_items = ET.fromstring(items)
+    json_items = json_PoB["Items"]
+    out.append(xml_tag("Items", {"activeItemSet": json_items["activeItemSet"] + 1}, False))
     for _item in json_items["Items"]:
-        xml_items.append(save_item_to_xml(_item))
+        item = {"id": _item["id"]}
+        if int(_item.get("Selected Variant", -1)) >= 0:
+            item["variant"] = _item["Selected Variant"] + 1
+        out.append(f"{xml_tag('Item', item, False)}{xml_escape(save_item_to_xml(_item, True), False)}</Item>")
     for _set in json_items["ItemSets"]:
-        xml_itemset = ET.fromstring(f'<ItemSet useSecondWeaponSet="{bool_to_str(_set["useSecondWeaponSet"])}" id="{str(_set["id"]+1)}" />')
-        xml_items.append(xml_itemset)
+        out.append(xml_tag("ItemSet", {"useSecondWeaponSet": _set["useSecondWeaponSet"], "id": _set["id"] + 1}, False))
         for slot, value in _set["Slots"].items():
-            xml_itemset.append(ET.fromstring(f'<Slot itemPbURL="{value["itemPbURL"]}" name="{slot}" itemId="{str(value["itemId"])}"/>'))
-        if _set.get("SocketIdURL", []):
-            for slot in _set["SocketIdURL"]:
-                xml_itemset.append(
-                    ET.fromstring(f'<SocketIdURL nodeId="{str(slot["nodeId"])}" name="{slot["name"]}" itemPbURL="{slot["itemPbURL"]}" />')
-                )
-    xml_root.append(xml_items)
-    if debug:
-        print_a_xml_element(xml_items)
+            out.append(xml_tag("Slot", {"itemPbURL": value["itemPbURL"], "name": slot, "itemId": value["itemId"]}))
+        for slot in _set.get("SocketIdURL", []):
+            out.append(xml_tag("SocketIdURL", {"nodeId": slot["nodeId"], "name": slot["name"], "itemPbURL": slot["itemPbURL"]}))
+        out.append("</ItemSet>")
+    out.append("</Items>")
 
     """Config"""
-    json_config = build["PathOfBuilding"]["Config"]
-    xml_config = ET.fromstring(f"<Config/>")
+    out.append("<Config>")
     for _name, _value in json_config["Input"].items():
         if _name == "customMods":
-            xml_config.append(ET.fromstring(f'<Input name="customMods" string="{"~^".join(_value)}"/>'))
-            customMods = True
+            out.append(xml_tag("Input", {"name": "customMods", "string": custom_mods_separator.join(_value)}))
         else:
-            _value, value_type = get_value_s_type(_value)
-            xml_config.append(ET.fromstring(f'<Input name="{_name}" {value_type}="{_value}"/>'))
+            out.append(input_tag("Input", _name, _value))
     for _name, _value in json_config["Placeholder"].items():
-        _value, value_type = get_value_s_type(_value)
-        xml_config.append(ET.fromstring(f'<Placeholder name="{_name}" {value_type}="{_value}"/>'))
-    xml_root.append(xml_config)
-    if debug:
-        print_a_xml_element(xml_config)
+        out.append(input_tag("Placeholder", _name, _value))
+    out.append("</Config>")
+
+    out.append("</PathOfBuilding>")
+    return "".join(out)
+    # build_to_xml_text
 
-    # print_a_xml_element(xml_root)
 
+def save_to_xml(filename, build, do_calcs=False):
+    """
+    Everything needed to convert internal dict to xml
+    :param filename:
+    :param build: Build() class
+    :param do_calcs: bool: If True, called from Do_Calcs(). Don't export some entries, like Notes, to xml
+    :return: N/A
+    """
+    # customMods are newline separated, but ElementTree would write the newlines as &#10;, so use ~^ and fix the file afterwards.
+    xml_root = ET.fromstring(build_to_xml_text(build, do_calcs, "~^"))
     if filename:
         write_xml(filename, xml_root)
         # rewrite ~^ to newlines
-        if customMods:
+        if "customMods" in build["PathOfBuilding"]["Config"]["Input"]:
             write_v1_custom_mods(filename)
     else:
         return xml_root
+
+
+def save_to_xml_string(build, do_calcs=False):
+    """
+    Convert internal dict to a xml string, without touching the disk. Used to hand builds to the calc worker.
+    :param build: Build() class
+    :param do_calcs: bool: If True, called from Do_Calcs(). Don't export some entries, like Notes, to xml
+    :return: str: the xml, with customMods newline separated.
+    """
+    return build_to_xml_text(build, do_calcs)
@@ -0,0 +1,118 @@
+"""
+SearchIndex Class
+
+A word index for searching lists (EG: the build's items and the unique/rare import list) as the user types.
+
+Each entry's text is split into words once, when the entry is added, and each word remembers which entries have it.
+Searching for "fire res" finds the entries with a word starting with "fire" AND a word starting with "res",
+  so only the (few) distinct words are looked at, not the text of every entry.
+Text is held in named fields (EG: "name", "mods") so a search can be limited to some of them.
+
+This is a base PoB class. It doesn't import any other PoB classes.
+"""
+
+from bisect import bisect_left
+import re
+
+word_regex = re.compile(r"\w+")
+
+
+def words(text) -> list:
+    """
+    Split text into lowercase words. Used for both entries and searches, so they split the same way.
+    :param text: str: EG: "+(12-16)% to Fire Resistance"
+    :return: list: EG: ["12", "16", "to", "fire", "resistance"]
+    """
+    return word_regex.findall(text.lower())
+
+
+class SearchIndex:
+    def __init__(self) -> None:
+        # The words of each entry, so it can be removed or replaced. {entry_id: {field: frozenset(words)}}
+        self.entries = {}
+        # {field: {word: set(entry_id)}}
+        self.index = {}
+        # Each field's words in order, for finding the words that start with a search term. Remade after words are added or removed.
+        self.sorted_words = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.index.clear()
+        self.sorted_words.clear()
+
+    def add(self, entry_id, fields: dict):
+        """
+        Add, or replace, an entry. Nothing is done if its words haven't changed.
+        :param entry_id: anything hashable: EG: an item's id, or the item itself.
+        :param fields: dict: {field: text}. EG: {"name": "Tabula Rasa, Simple Robe", "mods": "..."}
+        :return: N/A
+        """
+        entry = dict((field, frozenset(words(text))) for field, text in fields.items())
+        if self.entries.get(entry_id, None) == entry:
+            return
+        self.remove(entry_id)
+        self.entries[entry_id] = entry
+        for field, _words in entry.items():
+            index = self.index.setdefault(field, {})
+            for word in _words:
+                if word not in index:
+                    index[word] = set()
+                    self.sorted_words.pop(field, None)
+                index[word].add(entry_id)
+
+    def remove(self, entry_id):
+        """
+        Remove an entry, if it is there.
+        :param entry_id: anything hashable: the id it was added with.
+        :return: N/A
+        """
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for field, _words in entry.items():
+            index = self.index[field]
+            for word in _words:
+                index[word].discard(entry_id)
+                if not index[word]:
+                    del index[word]
+                    self.sorted_words.pop(field, None)
+
+    def starting_with(self, field, prefix) -> set:
+        """
+        :param field: str: the field to look in.
+        :param prefix: str: lowercase start of a word.
+        :return: set: the entry_ids with a word in this field starting with prefix.
+        """
+        index = self.index.get(field, {})
+        _sorted = self.sorted_words.get(field, None)
+        if _sorted is None:
+            _sorted = sorted(index)
+            self.sorted_words[field] = _sorted
+        result = set()
+        i = bisect_left(_sorted, prefix)
+        while i < len(_sorted) and _sorted[i].startswith(prefix):
+            result |= index[_sorted[i]]
+            i += 1
+        return result
+
+    def search(self, text, fields=None) -> set:
+        """
+        Find the entries that match every word of text, each as the start of a word in any of the fields.
+        :param text: str: what the user typed. EG: "fire res"
+        :param fields: list: the fields to look in. None for all.
+        :return: set: matching entry_ids. All of them if text has no words.
+        """
+        fields = fields or list(self.index)
+        result = None
+        # Longer terms usually match fewer entries, so start with them and give up as soon as nothing is left
+        for term in sorted(set(words(text)), key=len, reverse=True):
+            matches = set()
+            for field in fields:
+                matches |= self.starting_with(field, term)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return set(self.entries) if result is None else result
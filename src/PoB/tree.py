@@ -10,9 +10,12 @@ This holds, in memory, a copy of the tree data and doesn't know about any active
 """
 
 from copy import deepcopy
+from functools import partial
+import hashlib
+import json
 import re
 import math
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from pathlib import Path
 import pprint
 
@@ -32,11 +35,17 @@ from PoB.constants import (
     global_scale_factor,
     tree_versions,
 )
-from PoB.pob_file import read_json
+from PoB.pob_file import read_json, read_pickle, write_pickle
 from PoB.node import Node
+from PoB.search_index import SearchIndex
 from PoB.utils import _debug
 from widgets.tree_graphics_item import TreeGraphicsItem
 
+# Bump this when what build_tree_data() puts in tree_cache.pkl changes, so old caches are rebuilt.
+tree_cache_format = 1
+# Size, in scene units, of a cell of Tree().node_grid. Bigger than the radius of any node a user can click on.
+node_grid_size = 100
+
 nodeOverlay = {
     "Normal": {
         "artWidth": "40",
@@ -117,8 +126,34 @@ def calc_orbit_angles(nodes_in_orbit):
 # fmt: on
 
 
+class LazySprite(dict):
+    """
+    One image in Tree().spriteMap: {"handle", "name", "width", "height", "ox", "oy"}.
+    "handle" (the QPixmap) is made by loader() the first time it is asked for. Everything else is known up front.
+    """
+
+    def __init__(self, loader, **kwargs):
+        super().__init__(handle=None, **kwargs)
+        self.loader = loader
+
+    def __getitem__(self, key):
+        if key == "handle" and dict.__getitem__(self, "handle") is None:
+            self["handle"] = self.loader()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
 class Tree:
-    def __init__(self, _settings: Settings, _version: str = _VERSION_str) -> None:
+    def __init__(self, _settings: Settings, _version: str = _VERSION_str, _graphics: bool = True) -> None:
+        """
+        Tree
+        :param _settings: A pointer to the settings
+        :param _version: str: the tree version. EG: "3_25"
+        :param _graphics: bool: False to leave out the Qt graphics items, so the tree can be loaded in a thread.
+          add_graphics() must then be called from the main thread. See TreeLoader.
+        """
         # declare variables that are set in functions
         self.settings = _settings
         self.version = _version
@@ -168,7 +203,22 @@ class Tree:
         self.mastery_effects_nodes = {}
         # 3.23 alternate ascendancy
         self.alternate_ascendancies = {}
-        self.load()
+        # line segments for add_graphics(), as (x1, y1, x2, y2)
+        self.line_segments = []
+        # Spatial index of the nodes that are shown, for finding the node under the mouse. See node_at().
+        #   {(column, row): [Node]} where a cell is node_grid_size square
+        self.node_grid = {}
+        # Pre-rendered images of the inactive tree for when TreeView is zoomed out. Made by TreeView when first needed.
+        self.lod_tiles = []
+        # Which nodes can be walked between, for path_to() and orphans(). {node_id: (node_id, ...)}
+        self.adjacency = {}
+        # Word index of the shown nodes' text, for the search box. Made on the first search. See search().
+        self.search_index = None
+        # {node_id: text}. The same text, for regular expression searches.
+        self.search_texts = {}
+        self.loaded = self.load()
+        if _graphics:
+            self.add_graphics()
 
     def __repr__(self) -> str:
         ret_str = f"[TREE]: version '{self.version}'\n"
@@ -191,69 +241,66 @@ class Tree:
         self._version = new_vers
         self.tree_version_path = Path(self.settings._data_dir, re.sub(r"\.", "_", str(new_vers)))
         self.json_file_path = Path(self.tree_version_path, "data.json")
+        self.cache_file_path = Path(self.tree_version_path, "tree_cache.pkl")
         self.legion_path = Path(self.settings._data_dir, "legion")
 
     def load(self):
         """
-        Load the tree json of this Tree()'s version and process it
+        Load the tree json of this Tree()'s version and process it.
+        The version independent work (parsing the json, node positions, connecting lines) is kept in tree_cache.pkl,
+          so only the first load of a version, or a changed data.json, pays for it. See build_tree_data().
+        Nothing here touches Qt, so this is safe to run in a thread. The graphics items are made by add_graphics().
 
-        :return:
+        :return: bool: True if the tree loaded
         """
         print(f"Loading Tree: {self.version=}, {tree_versions[self.version]=}")
+        tree_data = None
         try:
-            json_dict = OrderedDict(read_json(self.json_file_path))
-        except TypeError:
-            json_dict = None
-        if json_dict is None:
-            tr = self.settings._app.tr
-            critical_dialog(
-                self.settings._win,
-                f"{tr('Load Tree')}: v{self.version}",
-                f"{tr('An error occurred to trying load')}:\n{self.json_file_path}",
-                tr("Close"),
-            )
-            return
-
-        self.min_x = json_dict["min_x"] / global_scale_factor
-        self.min_y = json_dict["min_y"] / global_scale_factor
-        self.max_x = json_dict["max_x"] / global_scale_factor
-        self.max_y = json_dict["max_y"] / global_scale_factor
-        self.total_points = json_dict["points"]["totalPoints"]
-        self.ascendancy_points = json_dict["points"]["ascendancyPoints"]
-        # and now split the file into dicts
+            json_bytes = self.json_file_path.read_bytes()
+        except EnvironmentError:
+            json_bytes = None
+        if json_bytes is not None:
+            source_hash = hashlib.sha1(json_bytes).hexdigest()
+            tree_data = read_pickle(self.cache_file_path)
+            if (
+                type(tree_data) is not dict
+                or tree_data.get("format", 0) != tree_cache_format
+                or tree_data.get("source_hash", "") != source_hash
+                or tree_data.get("scale", 0) != global_scale_factor
+            ):
+                _debug(f"Tree cache for {self.version} is missing or out of date")
+                tree_data = None
+                try:
+                    json_dict = OrderedDict(json.loads(json_bytes))
+                except (json.decoder.JSONDecodeError, UnicodeDecodeError, TypeError):
+                    print(f"Unable to open {self.json_file_path} (Tree.load)")
+                    json_dict = None
+                if json_dict is not None:
+                    tree_data = self.build_tree_data(json_dict, source_hash)
+                    write_pickle(self.cache_file_path, tree_data)
+        if tree_data is None:
+            return False
+
+        self.min_x = tree_data["min_x"]
+        self.min_y = tree_data["min_y"]
+        self.max_x = tree_data["max_x"]
+        self.max_y = tree_data["max_y"]
+        self.total_points = tree_data["total_points"]
+        self.ascendancy_points = tree_data["ascendancy_points"]
+        skill_sprites = tree_data["sprites"]
         if float(tree_versions[self.version]) < 3.18:
-            self.assets = json_dict["assets"]
-            # this information is moved into self.spriteMap
-            skill_sprites = json_dict["skillSprites"]
+            self.assets = tree_data["assets"]
         else:
-            skill_sprites = json_dict["sprites"]
             self.assets = self.spriteMap
-        self.classes = json_dict["classes"]
-        self.constants = json_dict["constants"]
+        self.classes = tree_data["classes"]
+        self.constants = tree_data["constants"]
         # allow for alternate ascendancies in the future
-        self.alternate_ascendancies = json_dict.get("alternate_ascendancies", {})
-
-        # add group indexes as int's not string
-        groups = json_dict["groups"]
-        for group_id in groups:
-            self.groups[int(group_id)] = groups[group_id]
-
-        # add node indexes as int's not string
-        nodes = json_dict["nodes"]
-        del nodes["root"]  # make the root node go away
-        for node_id in nodes:
-            self.nodes[int(node_id)] = nodes[node_id]
-
-        # Get last entry (highest zoom factor)
-        zoom_text = f'{json_dict["imageZoomLevels"][-1]}'
-
+        self.alternate_ascendancies = tree_data["alternate_ascendancies"]
+        self.groups = tree_data["groups"]
+        zoom_text = tree_data["zoom_text"]
         self.skillsPerOrbit = self.constants["skillsPerOrbit"]
-        self.orbitRadii = self.constants["orbitRadii"]
-        self.orbitRadii = [i / global_scale_factor for i in self.constants["orbitRadii"]]
-
-        self.orbit_anglesByOrbit = {}
-        for orbit, skillsInOrbit in enumerate(self.skillsPerOrbit):
-            self.orbit_anglesByOrbit[orbit] = calc_orbit_angles(skillsInOrbit)
+        self.orbitRadii = tree_data["orbit_radii"]
+        self.orbit_anglesByOrbit = tree_data["orbit_angles"]
 
         """ Build maps of class name -> class table """
         ascend_name_map = {}
@@ -292,22 +339,12 @@ class Tree:
         # if self._version < 3.18:
         #   self.process_assets(self.assets)
         #
-        """ Migrate groups to old format. ToDo: To be evaluated if this is needed
-            also scale x,y"""
-        for g in self.groups:
-            group = self.groups[g]
-            group["n"] = group["nodes"]
-            group["x"] = group["x"] / global_scale_factor
-            group["y"] = group["y"] / global_scale_factor
-            group["oo"] = {}
-            for orbit in group["orbits"]:
-                group["oo"][orbit] = True
 
         # """ Create a dictionary list of nodes of class Node()
-        #     self.nodes = dictionary from the json"""
-        for node_id in self.nodes:
-            # Overwrite the json node definition with our class definition
-            node = Node(self.nodes[node_id], self.settings)
+        #     tree_data["nodes"] = dictionary from the json"""
+        positions = tree_data["positions"]
+        for node_id, json_node in tree_data["nodes"].items():
+            node = Node(json_node, self.settings)
             self.nodes[node_id] = node
 
             # Find the node's type
@@ -325,39 +362,14 @@ class Tree:
                 self.clusterNodeMap[node.dn] = node
 
             # Finally the node will get an x,y value. Now we can show it.
+            if node_id in positions:
+                node.x, node.y, node.angle = positions[node_id]
             self.process_node(node)
+            if node.group:
+                self.node_grid.setdefault((int(node.x // node_grid_size), int(node.y // node_grid_size)), []).append(node)
 
-        # Add background lines
-        lines_db = {}
-        for node_id in self.nodes:
-            node = self.nodes[node_id]
-            if node.type not in ("ClassStart", "Mastery"):
-                in_out_nodes = []
-                # for other_node_id in node.nodes_out + node.nodes_in:
-                for other_node_id in node.nodes_out.union(node.nodes_in):
-                    other_node = self.nodes.get(other_node_id, None)
-                    if (
-                        other_node is not None
-                        and other_node.type not in ("ClassStart", "Mastery")
-                        # This stops lines crossing out of the Ascendancy circles
-                        and node.ascendancyName == other_node.ascendancyName
-                    ):
-                        in_out_nodes.append(other_node)
-
-                for other_node in in_out_nodes:
-                    # check if we have this line already
-                    ids = sorted([node.id, other_node.id])
-                    index = f"{ids[0]}_{ids[1]}"
-                    if not lines_db.get(index, False):
-                        lines_db[index] = True
-                        self.add_line(node.x, node.y, other_node.x, other_node.y)
-
-        # Add the group backgrounds
-        # DO NOT join this 'for g' loop with the one above. It makes the backgrounds disappear.
-        for g in self.groups:
-            group = self.groups[g]
-            if not group.get("isProxy", False):
-                self.render_group_background(group, g)
+        self.line_segments = tree_data["lines"]
+        self.build_adjacency()
 
         # ToDo: Temporary code for data checking purposes
         # ToDo: Leave in place until all coding, including calcs are complete
@@ -376,12 +388,307 @@ class Tree:
         #         fout,
         #     )
 
+        return True
         # load
 
+    def add_graphics(self):
+        """
+        Make the graphics items for the nodes, lines and group backgrounds. This must be run in the main thread.
+
+        :return: N/A
+        """
+        if not self.loaded:
+            tr = self.settings._app.tr
+            critical_dialog(
+                self.settings._win,
+                f"{tr('Load Tree')}: v{self.version}",
+                f"{tr('An error occurred to trying load')}:\n{self.json_file_path}",
+                tr("Close"),
+            )
+            return
+
+        for node in self.nodes.values():
+            self.add_node_images(node)
+
+        # Add background lines
+        for x1, y1, x2, y2 in self.line_segments:
+            self.add_line(x1, y1, x2, y2)
+
+        # Add the group backgrounds
+        # DO NOT join this 'for g' loop with the one above. It makes the backgrounds disappear.
+        for g in self.groups:
+            group = self.groups[g]
+            if not group.get("isProxy", False):
+                self.render_group_background(group, g)
+        # add_graphics
+
+    def build_tree_data(self, json_dict, source_hash):
+        """
+        Do the work of turning the tree json into what load() needs, without touching Qt, so it can be cached.
+        Node positions and the connecting lines are worked out here, from the json's node dictionaries.
+
+        :param json_dict: dict: the contents of data.json
+        :param source_hash: str: sha1 of data.json, so a changed data.json is noticed
+        :return: dict
+        """
+        tree_data = {
+            "format": tree_cache_format,
+            "source_hash": source_hash,
+            "scale": global_scale_factor,
+            "min_x": json_dict["min_x"] / global_scale_factor,
+            "min_y": json_dict["min_y"] / global_scale_factor,
+            "max_x": json_dict["max_x"] / global_scale_factor,
+            "max_y": json_dict["max_y"] / global_scale_factor,
+            "total_points": json_dict["points"]["totalPoints"],
+            "ascendancy_points": json_dict["points"]["ascendancyPoints"],
+            "classes": json_dict["classes"],
+            "constants": json_dict["constants"],
+            "alternate_ascendancies": json_dict.get("alternate_ascendancies", {}),
+            # Get last entry (highest zoom factor)
+            "zoom_text": f'{json_dict["imageZoomLevels"][-1]}',
+        }
+        # and now split the file into dicts
+        if float(tree_versions[self.version]) < 3.18:
+            tree_data["assets"] = json_dict["assets"]
+            # this information is moved into self.spriteMap
+            tree_data["sprites"] = json_dict["skillSprites"]
+        else:
+            tree_data["assets"] = {}
+            tree_data["sprites"] = json_dict["sprites"]
+
+        orbit_radii = [i / global_scale_factor for i in json_dict["constants"]["orbitRadii"]]
+        orbit_angles = {}
+        for orbit, skillsInOrbit in enumerate(json_dict["constants"]["skillsPerOrbit"]):
+            orbit_angles[orbit] = calc_orbit_angles(skillsInOrbit)
+        tree_data["orbit_radii"] = orbit_radii
+        tree_data["orbit_angles"] = orbit_angles
+
+        """ add group indexes as int's not string.
+            Migrate groups to old format. ToDo: To be evaluated if this is needed
+            also scale x,y"""
+        groups = {}
+        for group_id, group in json_dict["groups"].items():
+            group["n"] = group["nodes"]
+            group["x"] = group["x"] / global_scale_factor
+            group["y"] = group["y"] / global_scale_factor
+            group["oo"] = {}
+            for orbit in group["orbits"]:
+                group["oo"][orbit] = True
+            groups[int(group_id)] = group
+        tree_data["groups"] = groups
+
+        # add node indexes as int's not string
+        nodes = json_dict["nodes"]
+        del nodes["root"]  # make the root node go away
+        nodes = dict((int(node_id), json_node) for node_id, json_node in nodes.items())
+        tree_data["nodes"] = nodes
+
+        # Derive the true position of each node. {node_id: (x, y, angle)}
+        positions = {}
+        for node_id, json_node in nodes.items():
+            group = groups.get(json_node.get("group", -1), None)
+            if not group:
+                continue
+            o = json_node.get("orbit", 0)
+            angle = orbit_angles[o][json_node.get("orbitIndex", 0)]
+            orbit_radius = orbit_radii[o]
+            """ Move all nodes to the correct location"""
+            # _a_name == "" means this a non ascendancy node
+            _a_name = json_node.get("ascendancyName", "")
+            # Ascendant position in the json is good ...
+            if _a_name == "" or _a_name == "Ascendant":
+                x, y = group["x"], group["y"]
+            elif _a_name not in ascendancy_positions.keys():
+                x, y = None, None
+            else:
+                # ... all other ascendancies else needs hard coding
+                # Chieftain has two groups (3 and 7) with different start positions
+                if _a_name == "Chieftain" and json_node.get("group", -1) == 3:
+                    _a_name = "Chieftain_g3"
+                x, y = ascendancy_positions[_a_name]["x"], ascendancy_positions[_a_name]["y"]
+            if x is None:
+                positions[node_id] = (0, 0, angle)
+            else:
+                positions[node_id] = (x + math.sin(angle) * orbit_radius, y - math.cos(angle) * orbit_radius, angle)
+        tree_data["positions"] = positions
+
+        # Background lines. ClassStart and Mastery nodes have no lines (see set_node_type() for how they are decided)
+        def has_lines(_json_node):
+            if _json_node.get("classStartIndex", -1) >= 0:
+                return False
+            return _json_node.get("isAscendancyStart", False) or not _json_node.get("isMastery", False)
+
+        lines = []
+        seen = set()
+        for node_id, json_node in nodes.items():
+            if not has_lines(json_node):
+                continue
+            x1, y1, _angle = positions.get(node_id, (0, 0, 0))
+            a_name = json_node.get("ascendancyName", "")
+            for other_node_id in set(int(_id) for _id in json_node.get("out", []) + json_node.get("in", [])):
+                other_node = nodes.get(other_node_id, None)
+                # check if we have this line already
+                ids = node_id < other_node_id and (node_id, other_node_id) or (other_node_id, node_id)
+                if (
+                    other_node is not None
+                    and has_lines(other_node)
+                    # This stops lines crossing out of the Ascendancy circles
+                    and a_name == other_node.get("ascendancyName", "")
+                    and ids not in seen
+                ):
+                    seen.add(ids)
+                    x2, y2, _angle = positions.get(other_node_id, (0, 0, 0))
+                    lines.append((x1, y1, x2, y2))
+        tree_data["lines"] = lines
+        return tree_data
+
+    def build_adjacency(self):
+        """
+        Fill self.adjacency from the nodes' in and out lists. Only nodes that are shown are included.
+        Links that cross into or out of an ascendancy are left out, as are links from a class start to another class start.
+        Masteries are also linked to the notables in their group, as allocating one of those is what lets a mastery be chosen.
+
+        :return: N/A
+        """
+        links = {}
+        for node_id, node in self.nodes.items():
+            if not node.group:
+                continue
+            linked = node.nodes_out.union(node.nodes_in)
+            if node.type == "Mastery":
+                linked.update(
+                    int(_id) for _id in node.group.get("n", []) if int(_id) in self.nodes and self.nodes[int(_id)].type == "Notable"
+                )
+            for other_id in linked:
+                other_node = self.nodes.get(other_id, None)
+                if other_node is None or not other_node.group or other_node.ascendancyName != node.ascendancyName:
+                    continue
+                if node.type == "ClassStart" and other_node.type == "ClassStart":
+                    continue
+                links.setdefault(node_id, set()).add(other_id)
+                links.setdefault(other_id, set()).add(node_id)
+        self.adjacency = dict((node_id, tuple(sorted(linked))) for node_id, linked in links.items())
+
+    def path_to(self, node_id, allocated):
+        """
+        Find the shortest way to allocate a node. A breadth first search out from the node, stopping at the first allocated node.
+        Paths can't go through masteries, class starts or ascendancy starts. A mastery can only be reached from an allocated notable.
+
+        :param node_id: int: the node to be allocated.
+        :param allocated: set: the allocated node ids.
+        :return: list: node ids from an allocated node to node_id. The first is already allocated. Empty if there is no way.
+        """
+        if node_id in allocated or node_id not in self.adjacency:
+            return []
+
+        def can_pass(_node):
+            return _node.type not in ("ClassStart", "Mastery") and not _node.isAscendancyStart
+
+        # {node_id: the node it was reached from, back towards node_id}
+        previous = {node_id: None}
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            for other_id in self.adjacency[current]:
+                if other_id in previous:
+                    continue
+                other_node = self.nodes[other_id]
+                if other_id in allocated and other_node.type != "Mastery":
+                    path = [other_id]
+                    while current is not None:
+                        path.append(current)
+                        current = previous[current]
+                    return path
+                # Nothing goes through a mastery, including the one being allocated
+                if can_pass(other_node) and self.nodes[current].type != "Mastery":
+                    previous[other_id] = current
+                    queue.append(other_id)
+        return []
+
+    def orphans(self, allocated):
+        """
+        Find the allocated nodes that are no longer connected to the class start or ascendancy start.
+
+        :param allocated: set: the allocated node ids, without the node(s) being removed.
+        :return: list: node ids that would be left unconnected.
+        """
+        roots = [
+            node_id
+            for node_id in allocated
+            if node_id in self.nodes and (self.nodes[node_id].type == "ClassStart" or self.nodes[node_id].isAscendancyStart)
+        ]
+        # With nothing to start from, everything would be an orphan. Leave the spec alone.
+        if not roots:
+            return []
+        reached = set(roots)
+        queue = deque(roots)
+        while queue:
+            current = queue.popleft()
+            # Masteries hang off their notables. Nothing is connected through them.
+            if self.nodes[current].type == "Mastery":
+                continue
+            for other_id in self.adjacency.get(current, ()):
+                if other_id in allocated and other_id not in reached:
+                    reached.add(other_id)
+                    queue.append(other_id)
+        # Nodes we can't see (EG: cluster jewel nodes) are never orphans
+        return [node_id for node_id in allocated if node_id not in reached and node_id in self.adjacency]
+
+    def node_at(self, x, y):
+        """
+        Find the node at a point in the scene. Cheaper than asking the scene, which checks every item's shape.
+
+        :param x: float: scene position.
+        :param y: float: scene position.
+        :return: Node: the node whose centre is nearest to x, y, if x, y is inside its image. Else None.
+        """
+        column, row = int(x // node_grid_size), int(y // node_grid_size)
+        found, found_distance = None, 0
+        for _column in (column - 1, column, column + 1):
+            for _row in (row - 1, row, row + 1):
+                for node in self.node_grid.get((_column, _row), []):
+                    image = node.inactive_overlay_image is None and node.inactive_image or node.inactive_overlay_image
+                    if image is None:
+                        continue
+                    distance = (node.x - x) ** 2 + (node.y - y) ** 2
+                    if distance <= (max(image.width, image.height) / 2) ** 2 and (found is None or distance < found_distance):
+                        found, found_distance = node, distance
+        return found
+
+    def search(self, text) -> list:
+        """
+        Find the shown nodes whose name, stats, reminder text or mastery effects match a search.
+        Words are case insensitive and each must match the start of a word, in any order. EG: "life regen"
+        Text starting with / is a case insensitive regular expression. EG: "/(fire|cold) damage"
+
+        :param text: str: what the user typed.
+        :return: list of Node:
+        """
+        if text.strip() == "":
+            return []
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            for node in [node for nodes in self.node_grid.values() for node in nodes]:
+                lines = [node.name, *node.stats, *(type(node.reminderText) is str and [node.reminderText] or node.reminderText)]
+                for effect in node.masteryEffects.values():
+                    lines.extend(effect["stats"])
+                    lines.extend(type(effect["reminder"]) is str and [effect["reminder"]] or effect["reminder"])
+                self.search_texts[node.id] = "\n".join(lines)
+                self.search_index.add(node.id, {"text": self.search_texts[node.id]})
+
+        if text.startswith("/"):
+            try:
+                regex = re.compile(text[1:], re.IGNORECASE)
+            except re.error:
+                # Most likely still being typed
+                return []
+            return [self.nodes[node_id] for node_id, node_text in self.search_texts.items() if regex.search(node_text)]
+        return [self.nodes[node_id] for node_id in self.search_index.search(text)]
+
     def add_picture(self, name, x, y, ox, oy, _layer=Layers.inactive, node=None):
         """
         Add a picture.
-        :param name: string or pixmap to be added
+        :param name: string, pixmap or LazySprite to be added
         :param x: it's position in the scene
         :param y: it's position in the scene
         :param ox: offset to it's position in the scene
@@ -418,23 +725,10 @@ class Tree:
 
     def process_node(self, node: Node):
         """
-        Process tree nodes and get images. Inactive images only. TreeView() holds the active images.
+        Process tree nodes and choose their sprites. No images are made here, see add_node_images().
         :param node:
         :return:
         """
-
-        def add_sprite(_sprite, _node, _layer=Layers.inactive):
-            """
-            Add a sprite to our graphics list.
-            :param _sprite: the inactive sprite or overlay to be added.
-            :param _layer: the layer this sprite is to be added in.
-            :param _node: the node.
-            :return: a reference to the tree graphic image added.
-            """
-            sprite = self.add_picture(_sprite["handle"], _node.x, _node.y, _sprite["ox"], _sprite["oy"], _layer, _node)
-            sprite.data = _sprite["name"]
-            return sprite
-
         node.inactive_sprite = None
         # Assign node artwork assets
         if node.type == "Mastery":
@@ -478,34 +772,35 @@ class Tree:
             node.sprites = self.spriteMap["Art/2DArt/SkillIcons/passives/MasteryBlank.png"]["normalInactive"]
             node.inactive_sprite = node.sprites
 
-        # Derive the true position of the node
-        if node.group:
-            """orbit_radius, x and y have already been scaled"""
-            node.angle = self.orbit_anglesByOrbit[node.o][node.oidx]
-            orbit_radius = self.orbitRadii[node.o]
+        # process_node
 
-            """ Move all nodes to the correct location"""
-            # _a_name == "" means this a non ascendancy node
-            _a_name = node.ascendancyName
-            # Ascendant position in the json is good ...
-            if _a_name == "" or _a_name == "Ascendant":
-                node.x = node.group["x"] + math.sin(node.angle) * orbit_radius
-                node.y = node.group["y"] - math.cos(node.angle) * orbit_radius
-            elif _a_name not in ascendancy_positions.keys():
-                pass
-            else:
-                # ... all other ascendancies else needs hard coding
-                # Chieftain has two groups (3 and 7) with different start positions
-                if _a_name == "Chieftain" and node.g == 3:
-                    _a_name = "Chieftain_g3"
-                node.x = ascendancy_positions[_a_name]["x"] + math.sin(node.angle) * orbit_radius
-                node.y = ascendancy_positions[_a_name]["y"] - math.cos(node.angle) * orbit_radius
+    def add_node_images(self, node: Node):
+        """
+        Make a node's images. Inactive images only. TreeView() holds the active images.
+        The node's position has already been set by load(). Only nodes in a group are shown.
+        :param node:
+        :return:
+        """
 
-            if node.inactive_sprite and node.inactive_sprite.get("handle", None) is not None:
+        def add_sprite(_sprite, _node, _layer=Layers.inactive):
+            """
+            Add a sprite to our graphics list.
+            :param _sprite: the inactive sprite or overlay to be added.
+            :param _layer: the layer this sprite is to be added in.
+            :param _node: the node.
+            :return: a reference to the tree graphic image added.
+            """
+            # The LazySprite itself, so the image is only cut from its sprite sheet when the item is first painted
+            sprite = self.add_picture(_sprite, _node.x, _node.y, _sprite["ox"], _sprite["oy"], _layer, _node)
+            sprite.data = _sprite["name"]
+            return sprite
+
+        if node.group:
+            if node.inactive_sprite:
                 node.inactive_image = add_sprite(node.inactive_sprite, node)
-            if node.active_sprite and node.active_sprite.get("handle", None) is not None:
+            if node.active_sprite:
                 node.active_image = add_sprite(node.active_sprite, node, Layers.active)
-            if node.activeEffectImage and node.activeEffectImage.get("handle", None) is not None:
+            if node.activeEffectImage:
                 node.activeEffectImage = add_sprite(node.activeEffectImage, node, Layers.active_effect)
 
             # "ClassStart" might belong in treeView still depending on the size of the active asset
@@ -553,7 +848,7 @@ class Tree:
                     node.activeOverlay = self.spriteMap[active_overlay_name][overlay_type]
                     node.active_overlay_image = add_sprite(node.activeOverlay, node, Layers.active)
                     node.active_overlay_image.node_isoverlay = True
-        # process_node
+        # add_node_images
 
     def set_node_type(self, node: Node, ascend_name_map, class_notables):
         """
@@ -616,35 +911,16 @@ class Tree:
 
     def process_sprite_map(self, sprite_list, sprite_map, sprite_path, index):
         """
-        Process a sprite map list for loading the image (downloading it too later)
-          and updating self.spriteMap (should these be a list of graphic items (using setOffset) ?
+        Process a sprite map list and update self.spriteMap with a LazySprite for each entry.
+          Nothing is read from disk here. A sprite sheet is loaded, and the sprite cut from it, the first time the sprite's
+          image is asked for. Mirrored images are saved in sprite_cache, so they are only painted once per tree version.
 
         :param sprite_list: Incoming Dictionary from a json file
-        :param sprite_map: Dictionary to stop duplicate loading of a GraphicItem, to be shared between instantiations
+        :param sprite_map: Dictionary to stop duplicate loading of a sprite sheet, to be shared between instantiations
         :param sprite_path: The path where the images are stored
         :param index: str: The string repesenting the highest zoom level
         :return: N/A
         """
-
-        def mirror_image(_image):
-            """
-            Mirror an image. Specifically GroupBackgroundLargeHalfAlt.
-
-            :param: _source: the image to be mirrored
-            :return: the mirrored image
-            """
-            _source = _image.toImage()
-            _result = QPixmap(_source.width(), _source.height() * 2)
-            _result.fill(Qt.transparent)
-            painter = QPainter()
-            painter.begin(_result)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.drawImage(0, 0, _source)
-            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
-            painter.drawImage(0, _source.height(), _source.mirrored())
-            painter.end()
-            return _result
-
         # _type will be like normalActive, normalInactive, background
         for _type in sprite_list:
             # We don't use a background tile
@@ -654,13 +930,9 @@ class Tree:
             if _data is None:
                 continue
             # overwrite skill_sprites' filename attribute to a valid runtime filename
-            filename = Path(re.sub(r"(\?.*)$", "", _data["filename"])).name
+            filename = Path(re.sub(r"(\?.*)$", "", str(_data["filename"]))).name
             filename = Path(sprite_path, filename)
             _data["filename"] = filename
-            pixmap = sprite_map.get(filename, None)
-            if pixmap is None:
-                pixmap = QPixmap(filename)
-                sprite_map[filename] = pixmap
             # name could be "Art/2DArt/SkillIcons/passives/2handeddamage.png", "ClassesAscendant"
             for name in _data["coords"]:
                 if self.spriteMap.get(name, None) is None:
@@ -671,19 +943,15 @@ class Tree:
                 y = int(coord["y"])
                 w = int(coord["w"])
                 h = int(coord["h"])
-                # Get a copy of the original image, cropped to coords()
-                image = pixmap.copy(x, y, w, h)
-                if name == "GroupBackgroundLargeHalfAlt" or name == "PSGroupBackground3":
-                    image = mirror_image(image)
-                    h *= 2
-                self.spriteMap[name][_type] = {
-                    "handle": image,
-                    "name": name,
-                    "width": w,
-                    "height": h,
-                    "ox": -w / 2,
-                    "oy": -h / 2,
-                }
+                mirrored = name == "GroupBackgroundLargeHalfAlt" or name == "PSGroupBackground3"
+                self.spriteMap[name][_type] = LazySprite(
+                    partial(self.cut_sprite, sprite_map, filename, x, y, w, h, mirrored and f"{name}_{_type}" or ""),
+                    name=name,
+                    width=w,
+                    height=mirrored and h * 2 or h,
+                    ox=-w / 2,
+                    oy=-(mirrored and h * 2 or h) / 2,
+                )
 
         # Basic jewels for all sockets
         self.jewel_sprites["Viridian Jewel"] = self.spriteMap["JewelSocketActiveGreen"]["jewel"]
@@ -707,6 +975,59 @@ class Tree:
         #     pprint(self.spriteMap, f_out)
         # process_sprite_map
 
+    def cut_sprite(self, sprite_map, filename, x, y, w, h, mirror_name=""):
+        """
+        Cut one sprite from its sprite sheet. Used by LazySprite, so only sprites that are shown are ever cut.
+
+        :param sprite_map: Dictionary of sprite sheets already loaded, to be shared between instantiations
+        :param filename: Path: the sprite sheet
+        :param x, y, w, h: int: the sprite's position in the sprite sheet
+        :param mirror_name: str: if set, the sprite is the top half of an image. The mirrored image is kept in sprite_cache
+          under this name, so it only needs painting once.
+        :return: QPixmap
+        """
+
+        def mirror_image(_image):
+            """
+            Mirror an image. Specifically GroupBackgroundLargeHalfAlt.
+
+            :param: _source: the image to be mirrored
+            :return: the mirrored image
+            """
+            _source = _image.toImage()
+            _result = QPixmap(_source.width(), _source.height() * 2)
+            _result.fill(Qt.transparent)
+            painter = QPainter()
+            painter.begin(_result)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.drawImage(0, 0, _source)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+            painter.drawImage(0, _source.height(), _source.mirrored())
+            painter.end()
+            return _result
+
+        if mirror_name:
+            # The sheet and position are in the name, so a new sprite sheet doesn't pick up an old image
+            cache_file = Path(self.tree_version_path, "sprite_cache", f"{mirror_name}_{filename.stem}_{x}_{y}_{w}_{h}.png")
+            if cache_file.exists():
+                image = QPixmap(cache_file)
+                if not image.isNull():
+                    return image
+        pixmap = sprite_map.get(filename, None)
+        if pixmap is None:
+            pixmap = QPixmap(filename)
+            sprite_map[filename] = pixmap
+        # Get a copy of the original image, cropped to coords()
+        image = pixmap.copy(x, y, w, h)
+        if mirror_name:
+            image = mirror_image(image)
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                image.save(str(cache_file), "PNG")
+            except EnvironmentError:
+                print(f"Unable to write to {cache_file}")
+        return image
+
     def process_assets(self, sprite_list):
         """
         remap assets' contents into internal resource ids.
@@ -0,0 +1,121 @@
+"""
+TreeLoader Class
+
+Loads Tree()s in a background thread, so opening a build with specs from older tree versions doesn't freeze the window.
+
+The thread does the json (or tree cache) reading, node construction and geometry. See Tree(_graphics=False).
+Qt graphics items can only be made in the main thread, so Tree().add_graphics() is run there once the thread is done.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+from PySide6.QtCore import QEventLoop, QTimer, Qt
+from PySide6.QtWidgets import QApplication
+
+from PoB.settings import Settings
+from PoB.tree import Tree
+from PoB.utils import _debug
+
+
+class TreeLoader:
+    def __init__(self, _settings: Settings) -> None:
+        """
+        TreeLoader
+        :param _settings: A pointer to the settings
+        """
+        self.settings = _settings
+        # One thread. Python threads share one interpreter, so more would only slow each tree down.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TreeLoader")
+        # Trees being loaded. {version: Future}
+        self.futures = {}
+        # Functions waiting on a tree. {version: [function(tree: Tree)]}
+        self.waiting = {}
+        # Checks for finished trees. Only runs while something is loading.
+        self.timer = QTimer()
+        self.timer.setInterval(50)
+        self.timer.timeout.connect(self.check_futures)
+
+    def loading(self, version: str) -> bool:
+        return version in self.futures
+
+    def preload(self, version: str):
+        """
+        Start loading a tree in the background, if it isn't already.
+        :param version: str: the tree version. EG: "3_22"
+        :return: N/A
+        """
+        if version in self.futures:
+            return
+        _debug(f"TreeLoader: preloading {version}")
+        self.futures[version] = self.executor.submit(Tree, self.settings, version, False)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def load(self, version: str, on_loaded):
+        """
+        Load a tree in the background and pass it on when it is ready.
+        :param version: str: the tree version. EG: "3_22"
+        :param on_loaded: function(tree: Tree). Called from the main thread.
+        :return: N/A
+        """
+        self.waiting.setdefault(version, []).append(on_loaded)
+        self.preload(version)
+
+    def wait(self, version: str) -> Tree:
+        """
+        Load a tree and wait for it. The window is still painted while we wait, but ignores the mouse and keyboard.
+        :param version: str: the tree version. EG: "3_22"
+        :return: Tree:
+        """
+        trees = []
+        self.load(version, trees.append)
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        self.settings._win.update_status_bar(f"Loading tree {version.replace('_', '.')}")
+        # self.timer may finish the tree while events are being processed, so check trees, not the future
+        while not trees:
+            future = self.futures[version]
+            if future.done():
+                self.finish(version)
+            else:
+                QApplication.processEvents(QEventLoop.ExcludeUserInputEvents, 50)
+                wait_futures([future], 0.05)
+        QApplication.restoreOverrideCursor()
+        return trees[0]
+
+    def finish(self, version: str) -> Tree:
+        """
+        Add the graphics items to a tree the thread has finished, and pass it on to anyone waiting on it.
+        :param version: str: the tree version. EG: "3_22"
+        :return: Tree:
+        """
+        future = self.futures.pop(version)
+        try:
+            tree = future.result()
+        except Exception as e:
+            # The thread has no way to tell the user, so make a tree here. It will show the error dialog.
+            print(f"TreeLoader: Unable to load tree {version}: {e}")
+            tree = Tree(self.settings, version, False)
+        tree.add_graphics()
+        for on_loaded in self.waiting.pop(version, []):
+            on_loaded(tree)
+        return tree
+
+    def check_futures(self):
+        """
+        Called by self.timer. Finish any trees the thread is done with.
+        :return: N/A
+        """
+        for version in [version for version in self.futures if self.futures[version].done()]:
+            self.finish(version)
+        if not self.futures:
+            self.timer.stop()
+
+    def stop(self):
+        """
+        Stop the thread. A tree part way through loading is allowed to finish, but isn't used.
+        :return: N/A
+        """
+        self.timer.stop()
+        self.waiting.clear()
+        self.futures.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
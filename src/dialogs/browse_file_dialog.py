@@ -14,6 +14,7 @@ from PySide6.QtWidgets import QDialog, QListWidgetItem, QFileDialog
 from PySide6.QtCore import Qt, Slot
 
 from PoB.build import Build
+from PoB.build_index import BuildIndex
 from dialogs.popup_dialogs import yes_no_dialog
 from PoB.settings import Settings
 from PoB.pob_file import get_file_info
@@ -42,6 +43,11 @@ class BrowseFileDlg(Ui_BrowseFile, QDialog):
         self.triggers_connected = False
         self.save = task == "Save"
         self.open = task == "Open"
+        self.build_index = _win is not None and _win.build_index or BuildIndex(_settings)
+        # Files shown by name only, until the build index has read them. {full path: QListWidgetItem}
+        self.unread_files = {}
+        # max_length used by fill_list_box(), for formatting the unread files.
+        self.max_length = 0
 
         # UI Commands below this one
         self.setupUi(self)
@@ -79,6 +85,12 @@ class BrowseFileDlg(Ui_BrowseFile, QDialog):
         self.change_dir(self.lineEdit_CurrDir.text())
         QDialog.resizeEvent(self, event)
 
+    # Overridden function
+    def done(self, result):
+        """Stop filling in a list that is going away. The build index still remembers what has been read."""
+        self.build_index.cancel()
+        QDialog.done(self, result)
+
     @property
     def save_as_text(self):
         """Save As label text. Needed so we can have a setter"""
@@ -113,11 +125,13 @@ class BrowseFileDlg(Ui_BrowseFile, QDialog):
         """
         Search the current directory and find files and subdirectories.
         Add each to the list box.
-        For files, call get_file_info first.
+        For files, call get_file_info first. Files the build index doesn't know are shown by name,
+        and filled in by file_header_read() as the index reads them.
 
         :param this_dir:
         :return: N/A
         """
+        self.unread_files.clear()
         self.list_Files.clear()
         self.lineEdit_CurrDir.setText(this_dir)
         dirs = [name for name in os.listdir(this_dir) if os.path.isdir(os.path.join(this_dir, name))]
@@ -134,11 +148,39 @@ class BrowseFileDlg(Ui_BrowseFile, QDialog):
             # Don't use listBox's sort method as it puts the directories at the bottom
             files_grabbed.sort(key=str.casefold)
             # find longest name
-            max_length = max([len(s) for s in files_grabbed])
+            self.max_length = max([len(s) for s in files_grabbed])
             for filename in files_grabbed:
-                text, class_name = get_file_info(self.settings, filename, max_length, self.max_filename_width)
-                if text != "":
-                    self.add_path_to_listbox(filename, text, class_name, False)
+                found, header = self.build_index.cached(filename)
+                if found:
+                    text, class_name = get_file_info(self.settings, filename, self.max_length, self.max_filename_width, header=header)
+                    if text != "":
+                        self.add_path_to_listbox(filename, text, class_name, False)
+                else:
+                    text = f'<pre style="color:{self.settings.qss_default_text};">{os.path.splitext(filename)[0]}</pre>'
+                    self.unread_files[os.path.abspath(filename)] = self.add_path_to_listbox(filename, text, "", False)
+        self.build_index.scan(list(self.unread_files), self.file_header_read)
+
+    def file_header_read(self, full_path, header):
+        """
+        Called by the build index as it reads the files that fill_list_box() couldn't fill in.
+        Files that aren't builds are removed, as fill_list_box() would have done.
+
+        :param full_path: str: the file.
+        :param header: dict: see read_build_header(). None if it isn't a build.
+        :return: N/A
+        """
+        lwi = self.unread_files.pop(full_path, None)
+        if lwi is None:
+            return
+        info = lwi.data(Qt.UserRole)
+        text, class_name = get_file_info(self.settings, info["filename"], self.max_length, self.max_filename_width, header=header)
+        if text == "":
+            self.list_Files.takeItem(self.list_Files.row(lwi))
+            return
+        lwi.setText(text)
+        lwi.setToolTip(f"<nobr>{html_colour_text(class_name, info['filename'])}</nobr>")
+        info["class_name"] = class_name
+        lwi.setData(Qt.UserRole, info)
 
     def add_path_to_listbox(self, filename, _text, class_name, is_dir):
         """
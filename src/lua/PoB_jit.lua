@@ -212,8 +212,203 @@ function loadText(fileName)
     return fileText
 end
 
-path="Builds/stats.xml"
-local buildXml = loadText(path)
+-- Copy a calc output table into plain data that can be json encoded.
+-- Functions, userdata and deeply nested tables are dropped.
+function outputToTable(tbl, depth)
+	local out = { }
+	for name, value in pairs(tbl) do
+		local valueType = type(value)
+		if valueType == "number" or valueType == "boolean" or valueType == "string" then
+			out[tostring(name)] = value
+		elseif valueType == "table" and depth > 0 then
+			out[tostring(name)] = outputToTable(value, depth - 1)
+		end
+	end
+	return out
+end
+
+-- Copy only the groups of a calc output that were asked for.
+--   "Player" is the top level numbers and booleans. Any other group is a table of the output, EG: "MainHand", "OffHand", "Minion".
+-- groups is a comma separated list. All groups are copied if it is empty.
+function outputGroups(output, groups)
+	if not groups or groups == "" then
+		return outputToTable(output, 2)
+	end
+	local out = { }
+	for group in groups:gmatch("[^,]+") do
+		if group == "Player" then
+			for name, value in pairs(output) do
+				local valueType = type(value)
+				if valueType == "number" or valueType == "boolean" or valueType == "string" then
+					out[tostring(name)] = value
+				end
+			end
+		elseif type(output[group]) == "table" then
+			out[group] = outputToTable(output[group], 1)
+		end
+	end
+	return out
+end
+
+-- Apply one change to the loaded build, without reloading it.
+--   { kind = "node", id = nodeId, alloc = bool, effect = masteryEffectId }
+--   { kind = "item", slot = slotName, itemId = itemId }  itemId 0 empties the slot
+--   { kind = "config", name = inputName, value = value }  a nil value removes the input
+function applyDelta(delta)
+	if delta.kind == "node" then
+		local spec = build.spec
+		local node = spec.nodes[delta.id]
+		if not node then
+			error("Unknown node "..tostring(delta.id))
+		end
+		if delta.alloc then
+			node.alloc = true
+			spec.allocNodes[node.id] = node
+			if delta.effect then
+				spec.masterySelections[node.id] = delta.effect
+			end
+		else
+			node.alloc = false
+			spec.allocNodes[node.id] = nil
+			spec.masterySelections[node.id] = nil
+		end
+		spec:BuildAllDependsAndPaths()
+	elseif delta.kind == "item" then
+		local slot = build.itemsTab.slots[delta.slot]
+		if not slot then
+			error("Unknown slot "..tostring(delta.slot))
+		end
+		slot:SetSelItemId(delta.itemId or 0)
+		build.itemsTab:PopulateSlots()
+	elseif delta.kind == "config" then
+		build.configTab.input[delta.name] = delta.value
+		build.configTab:BuildModList()
+	else
+		error("Unknown delta "..tostring(delta.kind))
+	end
+end
+
+-- Work out what a list of what-ifs would change, without altering the loaded build.
+-- Each result is passed to sendPart as soon as it's known, so the caller can show progress.
+--   { kind = "power", stats = { statName, ... }, nodes = { nodeId, ... } }
+--   { kind = "items", stats = { statName, ... }, items = { { key = key, slot = slotName, raw = itemText }, ... } }
+-- A result is { key = nodeId or key, values = { statName = difference } }.
+--   Nodes also get path = { statName = difference } and pathLength, for allocating every node needed to reach them.
+function runJob(job, sendPart)
+	local calcFunc, baseOutput = build.calcsTab:GetMiscCalculator()
+	local useFullDPS = false
+	for _, stat in ipairs(job.stats) do
+		useFullDPS = useFullDPS or stat:match("^Full") ~= nil
+	end
+	local function difference(output)
+		local values = { }
+		for _, stat in ipairs(job.stats) do
+			local newValue, oldValue = output[stat], baseOutput[stat]
+			values[stat] = (type(newValue) == "number" and newValue or 0) - (type(oldValue) == "number" and oldValue or 0)
+		end
+		return values
+	end
+	if job.kind == "power" then
+		for _, nodeId in ipairs(job.nodes) do
+			local node = build.spec.nodes[nodeId]
+			if node and not node.alloc then
+				local part = { key = nodeId, values = difference(calcFunc({ addNodes = { [node] = true } }, useFullDPS)) }
+				if node.path and #node.path > 1 then
+					local pathNodes = { }
+					for _, pathNode in ipairs(node.path) do
+						pathNodes[pathNode] = true
+					end
+					part.path = difference(calcFunc({ addNodes = pathNodes }, useFullDPS))
+					part.pathLength = #node.path
+				end
+				sendPart(part)
+			end
+		end
+	elseif job.kind == "items" then
+		for _, entry in ipairs(job.items) do
+			local ok, err = pcall(function()
+				local item = new("Item", entry.raw)
+				if not item.base then
+					error("Unknown item base")
+				end
+				item:NormaliseQuality()
+				item:BuildModList()
+				sendPart({ key = entry.key, values = difference(calcFunc({ repSlotName = entry.slot, repItem = item }, useFullDPS)) })
+			end)
+			if not ok then
+				sendPart({ key = entry.key, error = tostring(err) })
+			end
+		end
+	else
+		error("Unknown job "..tostring(job.kind))
+	end
+end
+
+-- Worker mode: stay resident and calculate every build sent on stdin.
+-- Request:  "CALC <id> <size> [groups]\n" followed by <size> bytes of build xml. "QUIT\n" ends the worker.
+--           groups is a comma separated list of the output groups to reply with (see outputGroups()). Also for DELTA.
+--           "DELTA <id> <size>\n" followed by <size> bytes of a json list of changes to the loaded build. See applyDelta().
+--           "JOB <id> <size>\n" followed by <size> bytes of a json what-if job. See runJob().
+-- Response: "@@CALC@@ <json>\n" where json is {id, ok, output | error}. Jobs have no output.
+--           "@@PART@@ <json>\n" for each result of a job, before its response. json is {id, key, ...}.
+-- Anything else on stdout is PoB chatter and is ignored by the caller.
+if arg and arg[1] == "--worker" then
+	local dkjson = require("dkjson")
+	local function reply(tbl)
+		io.write("@@CALC@@ ", dkjson.encode(tbl), "\n")
+		io.stdout:flush()
+	end
+	io.write("@@READY@@\n")
+	io.stdout:flush()
+	while true do
+		local header = io.read("*l")
+		if not header or header:match("^QUIT") then
+			break
+		end
+		local command, id, size, groups = header:match("^(%u+) (%d+) (%d+) ?([%w,]*)")
+		if size then
+			local payload = io.read(tonumber(size))
+			local ok, err
+			if command == "CALC" then
+				ok, err = pcall(loadBuildFromXML, payload)
+			elseif command == "DELTA" then
+				ok, err = pcall(function()
+					for _, delta in ipairs(dkjson.decode(payload)) do
+						applyDelta(delta)
+					end
+					-- Calcs are redone on the next frame, using the build already in memory
+					build.buildFlag = true
+					runCallback("OnFrame")
+				end)
+			elseif command == "JOB" then
+				ok, err = pcall(runJob, dkjson.decode(payload), function(part)
+					part.id = tonumber(id)
+					io.write("@@PART@@ ", dkjson.encode(part), "\n")
+					io.stdout:flush()
+				end)
+			else
+				ok, err = false, "Unknown command "..command
+			end
+			if ok and command == "JOB" then
+				reply({ id = tonumber(id), ok = true })
+			elseif ok then
+				reply({ id = tonumber(id), ok = true, output = outputGroups(build.calcsTab.mainOutput, groups) })
+			else
+				reply({ id = tonumber(id), ok = false, error = tostring(err) })
+			end
+		end
+	end
+	return
+end
+
+-- One calculation: the build xml comes from the file named on the command line, or from stdin.
+-- Nothing is written to a shared file, so two of these can run at once.
+local buildXml
+if arg and arg[1] then
+	buildXml = loadText(arg[1])
+else
+	buildXml = io.read("*a")
+end
 loadBuildFromXML(buildXml)
 
 function PrintTable(tbl, prepend)
@@ -385,7 +385,7 @@ class Ui_MainWindow(object):
 
         self.vlayout_SkillsRight.addWidget(self.frame_SkillsRightTop)
 
-        self.list_Skills = QListWidget(self.frame_SkillsRight)
+        self.list_Skills = QListView(self.frame_SkillsRight)
         self.list_Skills.setObjectName(u"list_Skills")
         self.list_Skills.setFrameShape(QFrame.NoFrame)
         self.list_Skills.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
@@ -2,9 +2,11 @@
 This Class manages all the elements and owns some elements of the "CONFIG" tab.
 """
 
+from PySide6.QtCore import Slot
 from PySide6.QtWidgets import QGridLayout
 
-from PoB.constants import default_max_charges
+from PoB.calc_worker import config_delta
+from PoB.constants import bad_text, default_max_charges
 from PoB.settings import Settings
 from PoB.build import Build
 from PoB.utils import list_to_str, str_to_list
@@ -25,6 +27,22 @@ class ConfigUI:
         self.build = _build
         self.win = _win
         self.json_config = {}
+        # True while load() sets the widgets, so their change signals don't save a half loaded config over the build's.
+        self.loading = False
+
+        # Recalculate as soon as a setting changes. Custom modifiers are left for the next calculation, as they change per keystroke.
+        for combo in (
+            self.win.combo_ResPenalty,
+            self.win.combo_Bandits,
+            self.win.combo_MajorPantheon,
+            self.win.combo_MinorPantheon,
+            self.win.combo_igniteMode,
+            self.win.combo_EHPUnluckyWorstOf,
+        ):
+            combo.currentIndexChanged.connect(self.config_changed)
+        for charge_type in ("Power", "Frenzy", "Endurance", "Siphoning", "Challenger", "Blitz", "Ghost"):
+            getattr(self.win, f"check_{charge_type}Charges").stateChanged.connect(self.config_changed)
+            getattr(self.win, f"spin_Num{charge_type}Charges").valueChanged.connect(self.config_changed)
 
     def load(self, _config: dict):
         """
@@ -32,6 +50,7 @@ class ConfigUI:
         :param: _config: dict. The build's copy of json_config
         """
         # print("config.load", self.build.version, self.build.className, print_a_xml_element(_config))
+        self.loading = True
         self.json_config = _config
         _input = self.json_config["Input"]
 
@@ -64,11 +83,22 @@ class ConfigUI:
         custom_mods = _input.get("customMods", "")
         self.win.textedit_CustomModifiers.setPlainText(list_to_str(custom_mods))
         # self.win.textedit_CustomModifiers.setPlainText(custom_mods.replace("~^", "\n"))
-
-    def save(self):
+        self.loading = False
+
+    @Slot()
+    def config_changed(self):
+        """A config widget has changed. Send just the changed inputs to the calc engine."""
+        if self.loading:
+            return
+        deltas = self.save()
+        if deltas:
+            self.win.do_calcs_delta(deltas)
+
+    def save(self) -> list:
         """
         Save internal structures back to the build object, overwriting what is there.
         So if power charges are turned off, then no settings for power charges will be saved.
+        :return: list: config deltas (see calc_worker.config_delta()) for each input that changed or was removed.
         """
         # Don't use self.build.properties, as we overwrite self.json_config["Input"] below
         # General.
@@ -113,7 +143,16 @@ class ConfigUI:
         if custom_mods:
             _input["customMods"] = custom_mods
 
+        old_input = self.json_config.get("Input", {})
+        deltas = []
+        for name, value in _input.items():
+            if old_input.get(name, bad_text) != value:
+                # luaPoB holds customMods as one string
+                deltas.append(config_delta(name, name == "customMods" and "\n".join(value) or value))
+        deltas.extend(config_delta(name, None) for name in old_input if name not in _input)
+
         self.json_config["Input"] = _input
+        return deltas
 
     def initial_startup_setup(self):
         """Configure configuration tab widgets on startup"""
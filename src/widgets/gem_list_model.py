@@ -0,0 +1,82 @@
+"""
+GemListModel Class
+
+One list of gems shared by every GemUI() gem combo, rather than each combo adding, colouring and sorting its own copy.
+The gems are added, coloured and sorted once, when the gems are loaded.
+GemFilterProxy() shows the part of the list for a "Show support gems" choice ("All", "Normal" or "Awakened").
+  There is one per choice, made when first needed and shared by all combos.
+"""
+
+from PySide6.QtCore import QSortFilterProxyModel, Qt
+from PySide6.QtGui import QBrush, QColor, QStandardItem, QStandardItemModel
+
+from PoB.constants import ColourCodes
+
+# The base item's name, which is what "Awakened" shows. EG: "Awakened Added Fire Damage Support"
+display_name_role = Qt.UserRole + 1
+
+
+class GemFilterProxy(QSortFilterProxyModel):
+    def __init__(self, source_model, show_support_gems) -> None:
+        """
+        GemFilterProxy
+        :param source_model: GemListModel:
+        :param show_support_gems: str: "All", "Normal" or "Awakened"
+        """
+        super().__init__()
+        self.show_support_gems = show_support_gems
+        # Width of the dropdown list. Measuring every gem is slow, so the first combo to use this does it for the rest.
+        self.view_width = 0
+        self.setSourceModel(source_model)
+        if show_support_gems == "Awakened":
+            self.setSortRole(display_name_role)
+            self.sort(0)
+
+    # Overridden function
+    def filterAcceptsRow(self, source_row, source_parent) -> bool:
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        match self.show_support_gems:
+            case "Awakened":
+                return "Awakened" in index.data(display_name_role)
+            case "Normal":
+                return "Awakened" not in index.data(Qt.DisplayRole)
+        return True
+
+    # Overridden function
+    def data(self, index, role=Qt.DisplayRole):
+        if self.show_support_gems == "Awakened" and role in (Qt.DisplayRole, Qt.EditRole):
+            role = display_name_role
+        return super().data(index, role)
+
+
+class GemListModel(QStandardItemModel):
+    def __init__(self, base_gems) -> None:
+        """
+        GemListModel
+        :param base_gems: dict: the gems from base_gems.json, by variantId. See SkillsUI.load_base_gems_json().
+        """
+        super().__init__()
+        # {show_support_gems: GemFilterProxy}
+        self.proxies = {}
+        for variantId, g in (base_gems or {}).items():
+            name = g["grantedEffect"]["name"]
+            item = QStandardItem(name)
+            item.setEditable(False)
+            item.setData(variantId, Qt.UserRole)
+            item.setData((g.get("base_item") or {}).get("display_name", name), display_name_role)
+            item.setData(QBrush(QColor(g.get("colour", ColourCodes.NORMAL.value))), Qt.ForegroundRole)
+            self.appendRow(item)
+        # ToDo: Sort by other methods
+        # Sort Alphabetically
+        self.sort(0)
+
+    def filtered(self, show_support_gems) -> GemFilterProxy:
+        """
+        :param show_support_gems: str: "All", "Normal" or "Awakened"
+        :return: GemFilterProxy: the shared list for this choice.
+        """
+        proxy = self.proxies.get(show_support_gems, None)
+        if proxy is None:
+            proxy = GemFilterProxy(self, show_support_gems)
+            self.proxies[show_support_gems] = proxy
+        return proxy
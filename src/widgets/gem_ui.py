@@ -1,40 +1,52 @@
 """
 A class to show and manage the gem ui on the right hand side of the Skills tab.
+It is the editor for a row of the Skills list. The other rows are painted by GemDelegate() in the same places.
 """
 
 from copy import deepcopy
 
 from PySide6.QtCore import QRect, Slot, QSize, Qt
-from PySide6.QtGui import QColor, QBrush, QIcon
-from PySide6.QtWidgets import QCheckBox, QComboBox, QListWidgetItem, QPushButton, QSpinBox, QWidget
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import QCheckBox, QComboBox, QPushButton, QSpinBox, QWidget
 
 from PoB.constants import ColourCodes, empty_gem_dict
 from PoB.settings import Settings
 from PoB.utils import _debug, bool_to_str, html_colour_text, print_call_stack, str_to_bool, index_exists
 from widgets.ui_utils import set_combo_index_by_data
 
+# Where each widget is in a row. GemDelegate() paints the rows without an editor to match.
+row_width, row_height = 620, 30
+remove_rect = QRect(4, 4, 22, 22)
+gem_list_rect = QRect(30, 3, 260, 22)
+level_rect = QRect(300, 2, 50, 24)
+quality_rect = QRect(360, 2, 50, 24)
+variant_rect = QRect(420, 2, 90, 22)
+enabled_rect = QRect(530, 4, 20, 20)
+count_rect = QRect(570, 2, 50, 24)
+
 
 class GemUI(QWidget):
     """A class to manage one gem/skill on the right hand side of the UI"""
 
-    def __init__(self, list_widget_item: QListWidgetItem, gems_by_name_or_id, parent_notify, _settings: Settings, gem=None) -> None:
+    def __init__(self, parent, gems_by_name_or_id, parent_notify, _settings: Settings, gem=None) -> None:
         """
         init
 
-        :param list_widget_item: QListWidgetItem: the item inthe list box that this instance is attached to.
+        :param parent: QWidget: the Skills list's viewport.
         :param gems_by_name_or_id: dict: a dictionary of skills by id and name.
-        :param parent_notify: function: function to call when a change has happened.
+        :param parent_notify: function(GemUI): function to call when a change has happened.
         :param _settings: A pointer to the settings.
         :param gem: ET.elementree: prefill with this gem.
         """
-        super(GemUI, self).__init__()
+        super(GemUI, self).__init__(parent)
 
         self.settings = _settings
 
-        self.widget_height = 30
-        self.setGeometry(0, 0, 620, self.widget_height)
+        self.widget_height = row_height
+        self.setGeometry(0, 0, row_width, self.widget_height)
         self.setMinimumHeight(self.widget_height)
-        self.list_widget_item = list_widget_item
+        # Cover the painted row underneath
+        self.setAutoFillBackground(True)
         # reference to the loaded json so we can get data for the selected gem
         self.gems_by_name_or_id = gems_by_name_or_id
         self.gem = gem
@@ -44,21 +56,21 @@ class GemUI(QWidget):
 
         # def setupUi(self, gem_list, show_support_gems):
         self.btn_GemRemove = QPushButton(self)
-        self.btn_GemRemove.setGeometry(QRect(4, 4, 22, 22))
+        self.btn_GemRemove.setGeometry(remove_rect)
         cross_icon = QIcon()
         cross_icon.addFile(":/Art/Icons/cross.png", QSize(), QIcon.Normal, QIcon.Off)
         self.btn_GemRemove.setIcon(cross_icon)
         self.combo_gem_list = QComboBox(self)
-        self.combo_gem_list.setGeometry(30, 3, 260, 22)
+        self.combo_gem_list.setGeometry(gem_list_rect)
         self.combo_gem_list.setDuplicatesEnabled(False)
         self.combo_gem_list.setMaxVisibleItems(15)
         self.spin_gem_level = QSpinBox(self)
-        self.spin_gem_level.setGeometry(300, 2, 50, 24)
+        self.spin_gem_level.setGeometry(level_rect)
         self.spin_gem_level.setMinimum(1)
         self.spin_gem_level.setMaximum(20)
         self.spin_gem_level.setValue(self.level)
         self.spin_gem_quality = QSpinBox(self)
-        self.spin_gem_quality.setGeometry(360, 2, 50, 24)
+        self.spin_gem_quality.setGeometry(quality_rect)
         self.spin_gem_quality.setMaximum(40)
         self.spin_gem_quality.setValue(self.quality)
         self.combo_gem_variant = QComboBox(self)
@@ -68,13 +80,13 @@ class GemUI(QWidget):
         # self.combo_gem_variant.addItem("Anomalous", "Alternate1")
         # self.combo_gem_variant.addItem("Divergent", "Alternate2")
         # self.combo_gem_variant.addItem("Phantasmal", "Alternate3")
-        self.combo_gem_variant.setGeometry(420, 2, 90, 22)
+        self.combo_gem_variant.setGeometry(variant_rect)
         self.check_gem_enabled = QCheckBox(self)
-        self.check_gem_enabled.setGeometry(530, 4, 20, 20)
+        self.check_gem_enabled.setGeometry(enabled_rect)
         self.check_gem_enabled.setChecked(True)
         self.check_gem_enabled.setChecked(self.enabled)
         self.spin_gem_count = QSpinBox(self)
-        self.spin_gem_count.setGeometry(570, 2, 50, 24)
+        self.spin_gem_count.setGeometry(count_rect)
         self.spin_gem_count.setMinimum(1)
         self.spin_gem_count.setMaximum(20)
         self.spin_gem_count.setVisible(False)
@@ -165,7 +177,7 @@ class GemUI(QWidget):
 
     def sizeHint(self) -> QSize:
         """Return a known size. Without this the default row height is about 22"""
-        return QSize(620, self.widget_height)
+        return QSize(row_width, self.widget_height)
 
     @property
     def nameSpec(self) -> str:
@@ -298,21 +310,54 @@ class GemUI(QWidget):
         self.spin_gem_count.valueChanged.connect(self.save)
         self.check_gem_enabled.stateChanged.connect(self.save)
         self.combo_gem_variant.currentTextChanged.connect(self.save)
+        # The combo is empty until fill_gem_list(), so this doesn't fire yet.
+        self.combo_gem_list.currentTextChanged.connect(self.combo_gem_list_changed)
 
     def load(self, gem):
         """
-        load the UI elements from the json dict
+        Show a different gem. GemDelegate() reuses one editor for every row, rather than making new ones.
+        The widgets don't save or notify while they are being set.
+
+        :param gem: dict: the gem from the build json, or None for an empty row.
         :return: N/A
         """
-        print(f"gem_ui: load: {gem=}")
-        self.gem = gem
+        # print(f"gem_ui: load: {gem=}")
+        self.gem = gem is None and deepcopy(empty_gem_dict) or gem
+        self.levels = [{}]
+        widgets = (
+            self.spin_gem_level,
+            self.spin_gem_quality,
+            self.spin_gem_count,
+            self.check_gem_enabled,
+            self.combo_gem_variant,
+            self.combo_gem_list,
+        )
+        for widget in widgets:
+            widget.blockSignals(True)
         self.spin_gem_level.setValue(self.level)
         self.spin_gem_quality.setValue(self.quality)
         self.spin_gem_count.setValue(self.count)
         self.check_gem_enabled.setChecked(self.enabled)
         self.combo_gem_variant.setCurrentText(self.qualityId)
-        self.set_triggers()
-        self.combo_gem_list.setCurrentText(gem["nameSpec"])
+        self.select_gem()
+        for widget in widgets:
+            widget.blockSignals(False)
+
+    def select_gem(self):
+        """
+        Set combo_gem_list to this gem, or to nothing for an empty row.
+
+        :return: N/A
+        """
+        if self.variantId != "":
+            self.combo_gem_list.setCurrentText(self.nameSpec)
+            self.combo_gem_list_changed(self.nameSpec, False)
+        else:
+            self.combo_gem_list.setCurrentIndex(-1)
+            self.combo_gem_list.setStyleSheet("")
+            self.combo_gem_list.setToolTip("")
+            self.btn_GemRemove.setEnabled(False)
+            self.spin_gem_count.setVisible(False)
 
     @Slot()
     def save(self, notify=True):
@@ -333,7 +378,7 @@ class GemUI(QWidget):
         self.qualityId = self.combo_gem_variant.currentData()
 
         if notify:
-            self.parent_notify(self.list_widget_item)
+            self.parent_notify(self)
 
         # print(f"gem_ui: save: {self.gem=}")
         return self.gem
@@ -357,53 +402,25 @@ class GemUI(QWidget):
             gem = self.gems_by_name_or_id[self.variantId]
             self.combo_gem_list.setToolTip(f'<font color={gem["colour"]}>{gem["grantedEffect"]["description"]}</font>')
 
-    def fill_gem_list(self, base_gems, show_support_gems):
+    def fill_gem_list(self, gem_list):
         """
-        File the gem list combo. This is called separately as we need the show_support_gems value from SkillsUI()
+        File the gem list combo. This is called separately as SkillsUI() chooses the list, from the show_support_gems value.
+        Nothing is done if the combo already has this list.
 
-        :param base_gems: a list of curated gems available
-        :param show_support_gems: str: "All", "Normal" and "Awakened"
+        :param gem_list: GemFilterProxy: the shared, sorted and coloured list of gems. See GemListModel().
         :return:
         """
-
-        def add_colour(index):
-            """
-            Add colour to a gem name.
-
-            :param index: int: Index into the combolist
-            :return: N/A
-            """
-            colour = g.get("colour", ColourCodes.NORMAL.value)
-            self.combo_gem_list.setItemData(index, QBrush(colour), Qt.ForegroundRole)
-
-        if show_support_gems == "Awakened":
-            for variantId, g in base_gems.items():
-                display_name = g["base_item"]["display_name"]
-                if "Awakened" in display_name:
-                    self.combo_gem_list.addItem(display_name, variantId)
-                    add_colour(self.combo_gem_list.count() - 1)
-        else:
-            for variantId, g in base_gems.items():
-                display_name = g["grantedEffect"]["name"]
-                if show_support_gems == "Normal" and "Awakened" in display_name:
-                    continue
-                self.combo_gem_list.addItem(display_name, userData=variantId)
-                add_colour(self.combo_gem_list.count() - 1)
-
+        if self.combo_gem_list.model() is gem_list:
+            return
+        # Setting the model selects its first gem, which mustn't be saved into the json dict
+        self.combo_gem_list.blockSignals(True)
+        self.combo_gem_list.setModel(gem_list)
         # set the ComboBox dropdown width.
-        self.combo_gem_list.view().setMinimumWidth(self.combo_gem_list.minimumSizeHint().width())
-        # ToDo: Sort by other methods
-        # Sort Alphabetically
-        self.combo_gem_list.model().sort(0)
-        if self.gem is not None and self.variantId != "":
-            # self.combo_gem_list.setCurrentIndex(set_combo_index_by_data(self.combo_gem_list, self.skillId))
-            self.combo_gem_list.setCurrentText(self.nameSpec)
-            self.combo_gem_list_changed(self.nameSpec, False)
-        else:
-            self.combo_gem_list.setCurrentIndex(-1)
-
-        # Setup trigger to save information back to the json dict
-        self.combo_gem_list.currentTextChanged.connect(self.combo_gem_list_changed)
+        if gem_list.view_width == 0:
+            gem_list.view_width = self.combo_gem_list.minimumSizeHint().width()
+        self.combo_gem_list.view().setMinimumWidth(gem_list.view_width)
+        self.select_gem()
+        self.combo_gem_list.blockSignals(False)
 
 
 # def test() -> None:
@@ -7,21 +7,36 @@ Abyssal sockets are precreated and are made visble or hidden based on what is in
 from copy import deepcopy
 from pathlib import Path
 import enum
+import hashlib
 import pyperclip
 import re
 
-from PySide6.QtCore import Qt, Slot, QThread
+from PySide6.QtCore import Qt, Slot, QThread, QTimer
 from PySide6.QtWidgets import QListWidgetItem, QApplication
 from PySide6.QtGui import QClipboard
 
 from ui.PoB_Main_Window import Ui_MainWindow
 from PoB.settings import Settings
 from PoB.build import Build
-from PoB.constants import ColourCodes, empty_item_dict, empty_itemset_dict, empty_item_slots_dict, influencers, slot_map, slot_names
-from PoB.item import Item
+from PoB.calc_worker import item_delta
+from PoB.constants import (
+    ColourCodes,
+    comparison_stats,
+    empty_item_dict,
+    empty_itemset_dict,
+    empty_item_slots_dict,
+    influencers,
+    player_stats_list,
+    slot_map,
+    slot_names,
+)
+from PoB.item import Item, ItemRecord
+from PoB.item_query import ItemQuery, numeric_term_regex
+from PoB.mod import mod_cache_report
 from PoB.pob_file import read_json
-from PoB.utils import _debug, html_colour_text, print_call_stack
-from PoB.pob_xml import save_item_to_xml
+from PoB.utils import _debug, format_number, html_colour_text, print_call_stack
+from PoB.pob_xml import save_item_to_xml, save_to_xml_string
+from PoB.search_index import SearchIndex
 from dialogs.craft_items_dialog import CraftItemsDlg
 from dialogs.itemsets_dialog import ManageItemsetDlg
 from widgets.item_slot_ui import ItemSlotUI
@@ -54,6 +69,12 @@ class ItemsUI:
 
         # dictionary of Items() indexed by id. This is the same order as in the dict
         self.itemlist_by_id = {}
+        # Words of the items in itemlist_by_id, by id. Kept up to date by add_item_to_itemlist_lwi() and friends.
+        self.items_index = SearchIndex()
+        # Numbers of the items in itemlist_by_id, for searches like "life>=60". Made when needed. See build_items_query().
+        self.items_query = None
+        # Ids of the items luaPoB was sent in the last full build. Items added or edited since can't be sent as a delta.
+        self.calc_item_ids = set()
         self.items = None
         self.current_itemset = None
         self.itemsets = None
@@ -70,6 +91,7 @@ class ItemsUI:
 
         # set the key_event - handler - self.item_list_keypressed
         self.win.list_Items.key_press_handler = self.item_list_keypressed
+        self.win.list_Items.tooltip_handler = lambda lwi: lwi.data(Qt.UserRole).tooltip()
         self.win.list_Items.set_delegate()
 
         """Create the ui elements for displaying on the left side of the tab"""
@@ -103,27 +125,51 @@ class ItemsUI:
         self.slot_ui_hide("Weapon 2 Swap", hidden=True)
         # self.win.frame_SocketedJewels.setVisible(False)
 
+        # The unique and rare template ItemRecord()s. Loaded the first time they are needed. See load_import_items().
+        self.import_items_loaded = False
         self.item_types = set()
         self.uniques_items = []
-        self.load_unique_items()
 
         # A dictionary list of jewels that the tree_view can use for showing the correct image
         self.jewels = {}
 
         self.rare_template_items = []
-        self.load_rare_template_items()
+        # Words of the uniques and rare templates, by ItemRecord().
+        self.import_index = SearchIndex()
+        # Numbers of the uniques and rare templates. Made when needed. See import_items_query().
+        self.import_query = None
         # dictionary list of current items in the imported items list widget
         self.import_items_list = {}
-        self.fill_import_items_list("")
+        # Comparison of import items against what is equipped. {build hash: {(slot, item text): {stat: change}}}
+        #   Only the last few builds are kept. See compare_import_items().
+        self.comparison_cache = {}
+        # The import list entries being compared. [((slot, item text), QListWidgetItem)], indexed by the key sent to the calc pool.
+        self.comparison_entries = []
+        for stat_name in comparison_stats:
+            self.win.combo_ItemsImportSort.addItem(f'Sort by {player_stats_list[stat_name]["label"]}', stat_name)
+        self.win.list_ImportItems.key_press_handler = self.import_list_keypressed
+        self.win.list_ImportItems.tooltip_handler = lambda lwi: lwi.data(Qt.UserRole).tooltip()
 
         self.win.combo_ItemsImportFrom.currentTextChanged.connect(self.fill_import_items_list)
         self.win.combo_ItemsImportSlot.currentIndexChanged.connect(self.change_import_slot_combo)
         self.win.combo_ItemsImportType.currentIndexChanged.connect(self.change_import_type_combo)
         self.win.combo_ItemsImportLeague.currentTextChanged.connect(self.fill_import_items_list)
         self.win.combo_ItemsImportSource.currentTextChanged.connect(self.fill_import_items_list)
+        self.win.combo_ItemsImportSort.currentTextChanged.connect(self.fill_import_items_list)
+        self.win.combo_ItemsImportRequirements.setEnabled(True)
+        self.win.combo_ItemsImportRequirements.currentTextChanged.connect(self.fill_import_items_list)
         self.win.combo_ItemsImportSearchSource.currentTextChanged.connect(self.change_import_search_widgets)
-        self.win.lineedit_ItemsImportSearch.textChanged.connect(self.change_import_search_widgets)
-        self.win.lineedit_ItemsSearch.textChanged.connect(self.filter_items_list)
+        # Wait for a pause in typing before searching, rather than searching on every key press.
+        self.import_search_timer = QTimer(self.win)
+        self.import_search_timer.setSingleShot(True)
+        self.import_search_timer.setInterval(150)
+        self.import_search_timer.timeout.connect(lambda: self.change_import_search_widgets(""))
+        self.win.lineedit_ItemsImportSearch.textChanged.connect(lambda text: self.import_search_timer.start())
+        self.items_search_timer = QTimer(self.win)
+        self.items_search_timer.setSingleShot(True)
+        self.items_search_timer.setInterval(150)
+        self.items_search_timer.timeout.connect(lambda: self.filter_items_list(self.win.lineedit_ItemsSearch.text()))
+        self.win.lineedit_ItemsSearch.textChanged.connect(lambda text: self.items_search_timer.start())
         self.win.btn_ManageItemSet.clicked.connect(self.manage_itemset_button_clicked)
         self.win.btn_ItemsManageTree.clicked.connect(self.tree_ui.open_manage_trees)
         self.win.btn_DeleteItem.clicked.connect(self.item_list_delete_item)
@@ -357,6 +403,7 @@ class ItemsUI:
         dlg = CraftItemsDlg(self.settings, self.base_items, self.mods, "add", self.win)
         item = Item(self.settings, self.base_items)
         item.load_from_json(new_item)
+        _debug(f"process_item_from_clipboard: {mod_cache_report()}")
         # dlg.item is a property that triggers internal procedures. Don't set it to an empty Item and expect it to work.
         dlg.item = item
         _return = dlg.exec()
@@ -388,6 +435,7 @@ class ItemsUI:
             self.itemlist_by_id[new_item.id] = new_item
             if "Jewel" in new_item.base_name:
                 self.jewels[new_item.id] = new_item
+        _debug(f"load_from_json: {len(self.items['Items'])} items. {mod_cache_report()}")
 
         self.itemsets = self.items["ItemSets"]
         titles = [item["title"] for item in self.itemsets]
@@ -531,6 +579,8 @@ class ItemsUI:
         if loading:
             self.win.list_Items.clear()
             self.itemlist_by_id.clear()
+            self.items_index.clear()
+            self.items_query = None
         for name in self.item_slot_ui_list:
             slot: ItemSlotUI = self.item_slot_ui_list[name]
             slot.clear()
@@ -692,22 +742,48 @@ class ItemsUI:
             self.win.vlayout_Items2.setStretch(2, 0)
             self.win.vlayout_Items2.setStretch(3, 2)
 
+    def load_import_items(self):
+        """
+        Load the unique and rare template items, the first time the import list is used.
+        These are a large part of startup time otherwise, and many sessions never look at them.
+        :return: N/A
+        """
+        if self.import_items_loaded:
+            return
+        self.import_items_loaded = True
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        self.load_unique_items()
+        self.load_rare_template_items()
+        for record in self.uniques_items + self.rare_template_items:
+            self.import_index.add(
+                record,
+                {
+                    "name": f"{record.name} {record.type} {record.sub_type}",
+                    "league": record.league,
+                    "source": record.source,
+                    "mods": record.mods_text,
+                },
+            )
+        QApplication.restoreOverrideCursor()
+        self.fill_import_items_list("")
+
     def load_unique_items(self):
         item_leagues = set()
         u_json = read_json(Path(self.settings._data_dir, "uniques.json"))
         for key in u_json.keys():
             for _item in u_json[key]:
-                new_item = Item(self.settings, self.base_items, template=True)
-                new_item.load_from_json(_item, "UNIQUE")
-                new_item.quality = 20
+                new_item = ItemRecord(self.settings, self.base_items, _item, "UNIQUE", 20)
                 self.uniques_items.append(new_item)
                 if new_item.type:
                     self.item_types.add(new_item.type)
                     self.item_types.add(new_item.sub_type)
                 if new_item.league:
                     item_leagues.update(new_item.league.split(", "))
+        _debug(f"load_unique_items: {len(self.uniques_items)} uniques. {mod_cache_report()}")
 
-        # Update the Import items type combo
+        # Update the Import items type combo. The list is filled afterwards, so don't let these changes fill it.
+        self.win.combo_ItemsImportType.blockSignals(True)
+        self.win.combo_ItemsImportLeague.blockSignals(True)
         self.item_types = sorted(self.item_types)
         self.win.combo_ItemsImportType.clear()
         self.win.combo_ItemsImportType.addItems(self.item_types)
@@ -717,13 +793,36 @@ class ItemsUI:
         self.win.combo_ItemsImportLeague.addItems(sorted(item_leagues))
         self.win.combo_ItemsImportLeague.setItemText(0, "Any League")
         self.win.combo_ItemsImportLeague.view().setMinimumWidth(self.win.combo_ItemsImportLeague.minimumSizeHint().width())
+        self.win.combo_ItemsImportType.blockSignals(False)
+        self.win.combo_ItemsImportLeague.blockSignals(False)
 
     def load_rare_template_items(self):
         t_json = read_json(Path(self.settings._data_dir, "rare_templates.json"))
         for _item in t_json:
-            new_item = Item(self.settings, self.base_items, template=True)
-            new_item.load_from_json(_item, "RARE")
-            self.rare_template_items.append(new_item)
+            self.rare_template_items.append(ItemRecord(self.settings, self.base_items, _item, "RARE"))
+        _debug(f"load_rare_template_items: {len(self.rare_template_items)} templates. {mod_cache_report()}")
+
+    def import_items_query(self) -> ItemQuery:
+        """
+        The numbers of the uniques and rare templates, read the first time a numeric search or filter needs them.
+        :return: ItemQuery:
+        """
+        if self.import_query is None:
+            self.import_query = ItemQuery()
+            for record in self.uniques_items + self.rare_template_items:
+                self.import_query.add(record, record.json, record.base_item)
+        return self.import_query
+
+    def build_items_query(self) -> ItemQuery:
+        """
+        The numbers of the build's items, read again if the items have changed since they were last needed.
+        :return: ItemQuery:
+        """
+        if self.items_query is None:
+            self.items_query = ItemQuery()
+            for _item in self.itemlist_by_id.values():
+                self.items_query.add(_item, _item.pob_item, _item.base_item)
+        return self.items_query
 
     def add_item_to_itemlist_lwi(self, _item):
         """
@@ -741,23 +840,48 @@ class ItemsUI:
                 _id += 1
             _item.id = _id
         self.itemlist_by_id[_item.id] = _item
+        self.index_item(_item)
+        self.add_itemlist_lwi(_item)
+        return _item
+
+    def index_item(self, _item):
+        """
+        Add, or replace, an item in the searches. See filter_items_list.
+
+        :param _item: Item(). The item to be added
+        :return: N/A
+        """
+        self.items_query = None
+        self.items_index.add(
+            _item.id,
+            {
+                "name": f"{_item.name} {_item.type} {_item.sub_type}",
+                "mods": " ".join(mod.line for mod in _item.full_implicitMods_list + _item.full_explicitMods_list),
+            },
+        )
+
+    def add_itemlist_lwi(self, _item):
+        """
+        Add an Item() to the list widget only. EG: when filtering, as it is already in the internal lists.
+        The tooltip is left to list_Items.tooltip_handler, so filtering doesn't make one for every match.
+
+        :param _item: Item(). The item to be added to the list
+        :return: N/A
+        """
         lwi = QListWidgetItem(html_colour_text(_item.rarity, _item.name))
-        lwi.setToolTip(_item.tooltip())
         lwi.setWhatsThis(_item.name)
         lwi.setData(Qt.UserRole, _item)
         self.win.list_Items.addItem(lwi)
-        return _item
 
     def add_item_to_importlist_lwi(self, _item, idx):
         """
-        Add an Item() class to the list widget.
+        Add an ItemRecord() to the list widget. The tooltip is left to list_ImportItems.tooltip_handler.
 
-        :param _item: Item(). The item to be added to the list
+        :param _item: ItemRecord(). The item to be added to the list
         :param idx: int. Index of this item in self.rare_template_items or self.uniques_items
-        :return: the passed in Item() class object
+        :return: the passed in ItemRecord() class object
         """
         lwi = QListWidgetItem(html_colour_text(_item.rarity, _item.name))
-        lwi.setToolTip(_item.tooltip())
         lwi.setWhatsThis(_item.name)
         lwi.setData(Qt.UserRole, _item)
         self.win.list_ImportItems.addItem(lwi)
@@ -784,7 +908,12 @@ class ItemsUI:
             return
         # Any other functionality that requires a loaded system
         self.itemset_list_active_items()
-        self.win.do_calcs()
+        if slot_name in slot_names.values() and (item is None or item.id in self.calc_item_ids):
+            self.win.do_calcs_delta([item_delta(slot_name, item is not None and item.id or 0)])
+        else:
+            # Abyssal and jewel sockets are named differently in luaPoB, and luaPoB doesn't have items added or edited since
+            #   the last full build, so send the whole build
+            self.win.do_calcs()
 
     @Slot()
     def weapon_swap2(self, checked):
@@ -919,6 +1048,11 @@ class ItemsUI:
             lwi.setData(Qt.UserRole, dlg.item)
             lwi.setText(html_colour_text(dlg.item.rarity, dlg.item.name))
             lwi.setToolTip(dlg.item.tooltip(True))
+            self.index_item(dlg.item)
+            # luaPoB has the item as it was
+            self.calc_item_ids.discard(dlg.original_item.id)
+            if dlg.original_item.active:
+                self.win.do_calcs()
         else:
             print(f"Discarded: {dlg.item.name}")
             self.itemlist_by_id[dlg.original_item.id] = dlg.original_item
@@ -939,6 +1073,8 @@ class ItemsUI:
                 self.slot_ui_delete_item(_item)
                 self.win.list_Items.takeItem(self.win.list_Items.row(lwi))
                 self.itemlist_by_id.pop(_item.id, 0)
+                self.items_index.remove(_item.id)
+                self.items_query = None
                 del lwi  # fm doco: "Items removed from a list widget will not be managed by Qt, and will need to be deleted manually."
                 del _item
         self.win.btn_DeleteItem.setDisabled(True)
@@ -970,7 +1106,7 @@ class ItemsUI:
     def import_items_list_double_clicked(self, item: QListWidgetItem):
         """Actions for editing an item"""
         dlg = CraftItemsDlg(self.settings, self.base_items, self.mods, "add", self.win)
-        dlg.item = self.import_items_list[item.whatsThis()]
+        dlg.item = self.import_items_list[item.whatsThis()].item
         _return = dlg.exec()
         if _return:
             self.add_item_to_itemlist_lwi(dlg.item)
@@ -1174,18 +1310,20 @@ class ItemsUI:
         self.win.list_Items.clear()
         if search_text == "":
             # Searching complete, put it all back
-            for _id in self.itemlist_by_id:
-                self.add_item_to_itemlist_lwi(self.itemlist_by_id[_id])
+            for _item in self.itemlist_by_id.values():
+                self.add_itemlist_lwi(_item)
         else:
-            # search item's name, type and mods.
-            for _id in self.itemlist_by_id:
-                item = self.itemlist_by_id[_id]
-                # mod_list is just long string to search in (includes variants)
-                # mod_list = " ".join(mod.line.lower() for mod in item.full_implicitMods_list)
-                # mod_list += "".join(mod.line.lower() for mod in item.full_explicitMods_list)
-                # if search_text in item.name.lower() or search_text in mod_list or search_text in item.type:
-                if search_text in item.name.lower() or search_text in item.type or search_text in item.tooltip():
-                    self.add_item_to_itemlist_lwi(item)
+            # search item's name, type and mods. Every word must match the start of a word.
+            # Numeric terms (EG: "life>=60") are split out and tested against the mods' values.
+            items = list(self.itemlist_by_id.values())
+            if numeric_term_regex.search(search_text):
+                query = self.build_items_query()
+                predicate, search_text = query.parse(search_text)
+                items = query.query(predicate, query.sort_column(predicate))
+            matches = self.items_index.search(search_text)
+            for item in items:
+                if item.id in matches:
+                    self.add_itemlist_lwi(item)
 
     @Slot()
     def fill_import_items_list(self, text):
@@ -1201,6 +1339,10 @@ class ItemsUI:
             uniques = 0
             rares = 1
 
+        if not self.import_items_loaded:
+            # load_import_items() fills the list once it is done
+            self.load_import_items()
+            return
         items = []
         self.win.list_ImportItems.clear()
         import_from = ImportFromType(self.win.combo_ItemsImportFrom.currentIndex())
@@ -1213,7 +1355,6 @@ class ItemsUI:
                 self.win.combo_ItemsImportSource.setHidden(False)
             case ImportFromType.rares:
                 items = self.rare_template_items
-                self.win.combo_ItemsImportSort.setHidden(True)
                 self.win.combo_ItemsImportLeague.setHidden(True)
                 self.win.combo_ItemsImportRequirements.setHidden(True)
                 self.win.combo_ItemsImportSource.setHidden(True)
@@ -1233,26 +1374,39 @@ class ItemsUI:
                 temp_list.append(item)
         items = temp_list
 
-        # search item's name and mods. Only iterate through items once so as to avoid duplicates.
-        search_text = self.win.lineedit_ItemsImportSearch.text().lower()
+        # Requirements and numeric terms in the search (EG: "life>=60 level<=40"). Sorted by the first term's value, if it has one.
+        predicates = []
+        match self.win.combo_ItemsImportRequirements.currentIndex():
+            case 1:  # Current level
+                predicates = [("Level", "<=", self.build.level)]
+            case 2:  # Current attributes
+                predicates = [(attrib, "<=", self.win.player.stats.get(attrib, 0)) for attrib in ("Str", "Dex", "Int")]
+            case 3:  # Current useable
+                predicates = [("Level", "<=", self.build.level)]
+                predicates += [(attrib, "<=", self.win.player.stats.get(attrib, 0)) for attrib in ("Str", "Dex", "Int")]
+        search_text = self.win.lineedit_ItemsImportSearch.text()
+        sort_column = ""
+        if predicates or numeric_term_regex.search(search_text):
+            query = self.import_items_query()
+            predicate, search_text = query.parse(search_text)
+            sort_column = query.sort_column(predicate)
+            if predicate is not None:
+                predicates.append(predicate)
+            matches = query.query(("and", predicates), sort_column)
+            # the query's order, as it may be sorted
+            wanted = set(items)
+            items = [item for item in matches if item in wanted]
+
+        # search item's name and mods (includes variants). Every word must match the start of a word.
         if search_text != "":
-            temp_list = []
-            # mod_list = []
-            for item in items:
-                # mod_list is just a long string to search in (includes variants)
-                mod_list = " ".join(mod.line.lower() for mod in item.full_implicitMods_list)
-                mod_list += "".join(mod.line.lower() for mod in item.full_explicitMods_list)
-                match self.win.combo_ItemsImportSearchSource.currentText():
-                    case "Anywhere":
-                        if search_text in item.name.lower() or search_text in mod_list:
-                            temp_list.append(item)
-                    case "Names":
-                        if search_text in item.name.lower():
-                            temp_list.append(item)
-                    case "Modifiers":
-                        if search_text in mod_list:
-                            temp_list.append(item)
-            items = temp_list
+            match self.win.combo_ItemsImportSearchSource.currentText():
+                case "Names":
+                    matches = self.import_index.search(search_text, ["name"])
+                case "Modifiers":
+                    matches = self.import_index.search(search_text, ["mods"])
+                case _:
+                    matches = self.import_index.search(search_text)
+            items = [item for item in items if item in matches]
 
         if self.win.combo_ItemsImportSource.currentIndex() != 0:
             temp_list = []
@@ -1278,22 +1432,141 @@ class ItemsUI:
                             temp_list.append(item)
             items = temp_list
 
-        # ToDo: Need to know where to get level and str and stuff from the build. how to represent it in the character
-        # if self.win.combo_ItemsImportRequirements.currentIndex() != 0:
-        #     temp_list = []
-        #     items = temp_list
-
         # add the culled list to the list widget and internal list
         for idx, item in enumerate(items):
             self.add_item_to_importlist_lwi(item, idx)
             self.import_items_list[item.name] = item
 
-        if import_from == ImportFromType.uniques:
-            match self.win.combo_ItemsImportSort.currentText():
-                case "Sort by Name":
-                    self.win.list_ImportItems.sortItems()
-        else:
+        if not sort_column:
             self.win.list_ImportItems.sortItems()
+        if self.win.combo_ItemsImportSort.currentData() in comparison_stats:
+            self.compare_import_items()
+        else:
+            self.win.calc_pool.cancel("items")
+
+    def import_item_slot(self, item):
+        """
+        Which slot an import item would be compared in: the chosen slot if there is one, otherwise the first it fits.
+        :param item: ItemRecord():
+        :return: str: slot name, or "" if it doesn't go in an equipment slot (EG: jewels).
+        """
+        import_slot = self.win.combo_ItemsImportSlot.currentText()
+        if import_slot in item.slots and import_slot in slot_names.values():
+            return import_slot
+        return next((slot for slot in item.slots if slot in slot_names.values()), "")
+
+    def compare_import_items(self):
+        """
+        Show what equipping each item in the import list would do to the chosen stat, and sort by it.
+        Results are cached per slot, item, stat and build, so only new items, a new stat or a changed build go to the calc pool.
+        Only the chosen stat is asked for, as FullDPS is much slower to calculate than the others.
+        The pool works in the background and the list updates as results arrive.
+        :return: N/A
+        """
+        # Tree changes are only in the current spec until it is saved
+        self.build.current_spec.save()
+        xml_text = save_to_xml_string(self.build.json, True)
+        build_hash = hashlib.sha1(xml_text.encode("utf8")).hexdigest()
+        if build_hash not in self.comparison_cache:
+            self.comparison_cache[build_hash] = {}
+            # Keep a few builds, for flicking between item sets or undoing a change
+            while len(self.comparison_cache) > 5:
+                del self.comparison_cache[next(iter(self.comparison_cache))]
+        cache = self.comparison_cache[build_hash]
+        stat = self.win.combo_ItemsImportSort.currentData()
+
+        self.comparison_entries = []
+        candidates = []
+        for row in range(self.win.list_ImportItems.count()):
+            lwi = self.win.list_ImportItems.item(row)
+            record = lwi.data(Qt.UserRole)
+            slot = self.import_item_slot(record)
+            if not slot:
+                continue
+            item_text = save_item_to_xml(record.item.save(), True)
+            # The same ring compares differently in Ring 1 and Ring 2
+            if stat in cache.get((slot, item_text), {}):
+                self.show_import_item_comparison(lwi, cache[(slot, item_text)])
+            else:
+                candidates.append({"key": len(self.comparison_entries), "slot": slot, "raw": item_text})
+                self.comparison_entries.append(((slot, item_text), lwi))
+
+        if candidates:
+            job = {"kind": "items", "stats": [stat], "items": candidates}
+            self.win.calc_pool.run(
+                "items",
+                xml_text,
+                job,
+                "items",
+                lambda part: self.import_item_compared(cache, stat, part),
+                self.import_items_compared,
+                chunk_size=20,
+            )
+        else:
+            self.win.calc_pool.cancel("items")
+            self.sort_import_items_by_comparison()
+
+    def import_item_compared(self, cache: dict, stat: str, part: dict):
+        """
+        One item's result has arrived from the calc pool.
+        :param cache: dict: the comparison cache for the build the item was compared against.
+        :param stat: str: the stat that was asked for.
+        :param part: dict: {"key": index into self.comparison_entries, "values": {stat: change}} or {"key", "error"}
+        :return: N/A
+        """
+        cache_key, lwi = self.comparison_entries[part["key"]]
+        # An item that can't be calculated is a change of 0, so it isn't asked for again
+        cache.setdefault(cache_key, {})[stat] = part.get("values", {}).get(stat, 0)
+        self.show_import_item_comparison(lwi, cache[cache_key])
+        done, total = self.win.calc_pool.progress("items")
+        if done % 25 == 0:
+            self.win.update_status_bar(f"Comparing items: {done} of {total}. Press Escape in the list to stop.")
+
+    def import_items_compared(self):
+        """The calc pool has finished comparing the import list."""
+        self.sort_import_items_by_comparison()
+        self.win.update_status_bar("Comparing items: done")
+
+    def show_import_item_comparison(self, lwi: QListWidgetItem, values: dict):
+        """
+        Add the change in the chosen stat to an import list entry.
+        :param lwi: QListWidgetItem: the entry.
+        :param values: dict: {stat: change}
+        :return: N/A
+        """
+        item = lwi.data(Qt.UserRole)
+        value = values.get(self.win.combo_ItemsImportSort.currentData(), 0)
+        lwi.setData(Qt.UserRole + 1, value)
+        text = html_colour_text(item.rarity, item.name)
+        if value:
+            text += f" {format_number(value, '%+0.1f', self.settings, True)}"
+        lwi.setText(text)
+
+    def sort_import_items_by_comparison(self):
+        """
+        Reorder the import list by the chosen stat, best first. Items without a result go to the bottom.
+        :return: N/A
+        """
+        lwis = [self.win.list_ImportItems.takeItem(0) for _ in range(self.win.list_ImportItems.count())]
+        lwis.sort(key=lambda lwi: lwi.data(Qt.UserRole + 1) is None and float("-inf") or lwi.data(Qt.UserRole + 1), reverse=True)
+        for lwi in lwis:
+            self.win.list_ImportItems.addItem(lwi)
+
+    def import_list_keypressed(self, key, ctrl_pressed, alt_pressed, shift_pressed, event):
+        """
+        Respond to some key presses in the import list. Escape stops an item comparison.
+        :param: key: the key pressed.
+        :param: ctrl_pressed: bool
+        :param: alt_pressed: bool
+        :param: shift_pressed: bool
+        :param: event: QKeyEvent
+        :return: N/A
+        """
+        if key == Qt.Key_Escape and self.win.calc_pool.running("items"):
+            self.win.calc_pool.cancel("items")
+            self.sort_import_items_by_comparison()
+            self.win.update_status_bar("Comparing items: stopped")
+        event.ignore()
 
     @Slot()
     def change_import_slot_combo(self, index):
@@ -5,7 +5,7 @@ Pob implementation of QlistWidget to enable the HTML Delegate, for coloured outp
 from copy import deepcopy
 
 from PySide6.QtWidgets import QListWidget
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QEvent, Qt
 
 from widgets.ui_utils import HTMLDelegate
 
@@ -19,6 +19,8 @@ class ListBox(QListWidget):
 
         # Respond to key presses if desired
         self.key_press_handler = None
+        # function(QListWidgetItem) -> str. Supplies the tooltip of an item without one, when it is first hovered.
+        self.tooltip_handler = None
 
         # Allow us to print in colour
         self.delegate = HTMLDelegate(self)
@@ -42,6 +44,20 @@ class ListBox(QListWidget):
             event.ignore()
         super(ListBox, self).keyPressEvent(event)
 
+    # Overridden function
+    def viewportEvent(self, event):
+        """
+        Fill in tooltips only when they are about to be shown, for lists where making them is costly.
+
+        :param: QEvent. The event matrix
+        :return: bool
+        """
+        if event.type() == QEvent.ToolTip and self.tooltip_handler:
+            lwi = self.itemAt(event.pos())
+            if lwi is not None and not lwi.toolTip():
+                lwi.setToolTip(self.tooltip_handler(lwi))
+        return super(ListBox, self).viewportEvent(event)
+
     def set_delegate(self):
         """Set the HTML delegate after the UI has initialized. Allows for listboxes to not have to display colour"""
         self.setItemDelegate(self.delegate)
@@ -7,8 +7,8 @@ from pathlib import Path
 import re
 from random import randint
 
-from PySide6.QtCore import QSize, Qt, Slot
-from PySide6.QtWidgets import QLabel, QListWidgetItem, QSizePolicy, QSpacerItem
+from PySide6.QtCore import QPersistentModelIndex, QSize, Qt, Slot
+from PySide6.QtWidgets import QAbstractItemView, QLabel, QListWidgetItem, QSizePolicy, QSpacerItem
 
 from PoB.constants import (
     ColourCodes,
@@ -29,7 +29,8 @@ from PoB.utils import _debug, bool_to_int, bool_to_str, html_colour_text, index_
 from widgets.ui_utils import set_combo_index_by_data, set_combo_index_by_text
 from dialogs.popup_dialogs import yes_no_dialog
 from dialogs.skillsets_dialog import ManageSkillsDlg
-from widgets.gem_ui import GemUI
+from widgets.gem_list_model import GemListModel
+from widgets.socket_group_model import GemDelegate, SocketGroupModel
 
 from ui.PoB_Main_Window import Ui_MainWindow
 
@@ -81,6 +82,8 @@ class SkillsUI:
         self.gems_by_name_or_id = {}
         self.hidden_skills_by_name_or_id = {}
         self.base_gems, self.hidden_skills = self.load_base_gems_json()
+        # The gems for the gem combos, shared by all GemUI()s.
+        self.gem_list_model = GemListModel(self.base_gems)
         # tracks the state of the triggers, to stop setting triggers more than once or disconnecting when not connected
         self.triggers_connected = False
         self.internal_clipboard = []
@@ -119,9 +122,28 @@ class SkillsUI:
         self.socket_group_to_be_moved = None
         self.win.list_SocketGroups.model().rowsMoved.connect(self.socket_groups_rows_moved)  # , Qt.QueuedConnection)
         self.win.list_SocketGroups.model().rowsAboutToBeMoved.connect(self.socket_groups_rows_about_to_be_moved)  # , Qt.QueuedConnection
-        self.skill_gem_to_be_moved = None
-        self.win.list_Skills.model().rowsMoved.connect(self.skill_gem_row_moved)  # , Qt.QueuedConnection)
-        self.win.list_Skills.model().rowsAboutToBeMoved.connect(self.skill_gem_row_about_to_be_moved)  # , Qt.QueuedConnection
+        # The gems of the current socket group. gem_delegate paints the rows and makes a GemUI() for the row under the mouse.
+        self.gem_rows = SocketGroupModel()
+        self.gem_delegate = GemDelegate(
+            self.win.list_Skills,
+            self.gems_by_name_or_id,
+            lambda: self.gem_list_model.filtered(self.win.combo_ShowSupportGems.currentText()),
+            self.remove_gem,
+            self.settings,
+        )
+        # The row with the GemUI() editor. Only one row has one.
+        self.edited_gem_row = QPersistentModelIndex()
+        self.win.list_Skills.setModel(self.gem_rows)
+        self.win.list_Skills.setItemDelegate(self.gem_delegate)
+        # Every row is the same height, so the list doesn't need to ask each one for its size
+        self.win.list_Skills.setUniformItemSizes(True)
+        # Editors are opened by edit_gem_row(), not by clicking
+        self.win.list_Skills.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.win.list_Skills.setMouseTracking(True)
+        self.win.list_Skills.entered.connect(self.edit_gem_row)
+        self.win.list_Skills.selectionModel().currentChanged.connect(lambda current, previous: self.edit_gem_row(current))
+        self.gem_rows.dataChanged.connect(self.gem_rows_changed)
+        self.gem_rows.rowsMoved.connect(self.gem_rows_changed)
 
         self.list_label = QLabel(self.win.frame_SkillsRight)
         self.list_label.setWordWrap(True)
@@ -802,7 +824,7 @@ class SkillsUI:
         :return: N/A
         """
         self.disconnect_skill_triggers()
-        self.clear_gem_ui_list()
+        self.gem_rows.set_gems(None)
         self.win.combo_SocketedIn.setCurrentIndex(-1)
         self.win.lineedit_SkillLabel.setText("")
         self.win.check_SocketGroupEnabled.setChecked(False)
@@ -905,15 +927,12 @@ class SkillsUI:
                                 self.win.remove_item_or_node_with_skills(source)
                     else:
                         # No "Source", so regular Socket Group
-                        for idx, gem in enumerate(self.current_socket_group["Gems"]):
-                            self.create_gem_ui(idx, gem)
-                        # Create an empty gem at the end
-                        self.create_gem_ui(len(self.current_socket_group["Gems"]), None)
+                        self.gem_rows.set_gems(self.current_socket_group["Gems"])
                 else:
                     # Create an empty gem at the end
                     self.list_label.setHidden(True)
                     self.win.list_Skills.setHidden(False)
-                    self.create_gem_ui(len(self.current_socket_group["Gems"]), None)
+                    self.gem_rows.set_gems(self.current_socket_group["Gems"])
 
         self.connect_skill_triggers()
 
@@ -1055,142 +1074,45 @@ class SkillsUI:
 
     """ ################################################### GEM UI ################################################### """
 
-    def gem_ui_notify(self, w_item: QListWidgetItem):
+    def edit_gem_row(self, index):
         """
-        React to a wigdet change from an instance of GemUI(), where that widget is not the remove button.
+        Put the GemUI() editor on a row of the Skills list, taking it off the last row. The other rows are only painted.
 
-        :param w_item: the triggering WidgetItem from list_Skills.
+        :param index: QModelIndex: the row under the mouse, or the current row.
         :return: N/A
         """
-        row = self.win.list_Skills.row(w_item)
-        gem_ui: GemUI = self.win.list_Skills.itemWidget(w_item)
-        # print(f"gem_ui_notify1:, {w_item.text()=}, {row=}, {gem_ui=}")
-        # If gem_ui.gem *is* in self.current_socket_group["Gems"], then we are altering an existing gemUI, and don't add it.
-        if gem_ui.gem is not None and gem_ui.variantId != "" and gem_ui.gem not in self.current_socket_group["Gems"]:
-            self.current_socket_group["Gems"].append(gem_ui.gem)
-            # print(f"gem_ui_notify2: {gem_ui.variantId} not found, adding.")
-            # Create an empty gem at the end
-            self.create_gem_ui(len(self.current_socket_group["Gems"]), None)
-        self.update_socket_group_labels()
-        self.load_main_skill_combo()
-
-    def create_gem_ui(self, index, gem=None):
-        """
-        Add a new row to the Skills list.
-
-        :param index: int: number of this gem in this skill group
-        :param gem: dict: The item to be added (from the build json)
-        :return:
-        """
-        # print("create_gem_ui", index, gem)
-        item = QListWidgetItem()
-        self.win.list_Skills.insertItem(index, item)
-        gem_ui = GemUI(item, self.gems_by_name_or_id, self.gem_ui_notify, self.settings, gem)
-        gem_ui.fill_gem_list(self.base_gems, self.win.combo_ShowSupportGems.currentText())
-        item.setSizeHint(gem_ui.sizeHint())
-        self.win.list_Skills.setItemWidget(item, gem_ui)
-
-        # this is for deleting the gem
-        gem_ui.btn_GemRemove.clicked.connect(lambda checked: self.gems_remove_checkbox_selected(item, gem_ui))
-        return gem_ui
+        if not index.isValid() or self.edited_gem_row == index:
+            return
+        if self.edited_gem_row.isValid():
+            self.win.list_Skills.closePersistentEditor(self.edited_gem_row)
+        self.edited_gem_row = QPersistentModelIndex(index)
+        self.win.list_Skills.openPersistentEditor(index)
 
-    def clear_gem_ui_list(self):
+    def gem_rows_changed(self, *args):
         """
-        Clear the gem_ui_list, destroying the UI elements as we go.
+        React to a gem being changed, added or moved in the Skills list. The model has already changed the socket group.
 
+        :param args: the model's signal arguments. Not Used.
         :return: N/A
         """
-        # print(f"clear_gem_ui_list, self.win.list_Skills.count()={self.win.list_Skills.count()}")
-        for idx, w_item in enumerate(self.win.list_Skills.items(None)):
-            gem_ui = self.win.list_Skills.itemWidget(w_item)
-            # print("clear_gem_ui_list", idx)
-            if gem_ui is not None and gem_ui.gem is not None:
-                # Don't notify, cause that causes a loop
-                gem_ui.save(False)
-        self.win.list_Skills.clear()
-
-    def remove_gem_ui(self, index):
-        """
-        Remove a GemUI class. TBA on full actions needed. May not be needed
-
-        :param index: int: index of frame/GemUI() to remove
-        :return:
-        """
-        print("remove_gem_ui")
-        if index_exists(self.gem_ui_list, index):
-            self.current_socket_group["Gems"].remove(index)
-            # self.current_skill_set[_index].remove(self.gem_ui_list[index].gem)
-            del self.gem_ui_list[index]
-        # update all gem_ui's index in case the one being deleted was in the middle
-        for idx, key in enumerate(self.gem_ui_list.keys()):
-            self.gem_ui_list[key].index = idx
+        self.update_socket_group_labels()
+        self.load_main_skill_combo()
 
-    @Slot()
-    def gems_remove_checkbox_selected(self, item, gem_ui):
+    def remove_gem(self, gem):
         """
         Actions required for selecting the red cross to the left of the GemUI().
 
-        :param item: the row passed through to/from lambda
-        :param gem_ui: the GemUI passed through to/from lambda
+        :param gem: dict: the editor's gem.
         :return: N/A
         """
-        print("gems_remove_checkbox_selected", item, gem_ui)
-        row = self.win.list_Skills.row(item)
-        self.win.list_Skills.takeItem(row)
-        _gem = gem_ui.gem
-        if self.current_socket_group is not None and _gem in self.current_socket_group["Gems"]:
-            # print("gem_ui_notify", row, ui)
-            # self.remove_gem_ui(_key)
-            self.current_socket_group["Gems"].remove(_gem)
-        # Make sure there is always one GemUI available
-        if self.win.list_Skills.count() == 0:
-            self.create_gem_ui(0)
+        gems = self.gem_rows.gems or []
+        row = next((idx for idx, _gem in enumerate(gems) if _gem is gem), -1)
+        if row >= 0:
+            # The gems below move up a row, leaving an empty gem at the end
+            self.gem_rows.removeRows(row, 1)
         self.update_socket_group_labels()
         self.load_main_skill_combo()
 
-    def skill_gem_row_moved(self, parent, start, end, destination, dest_row):
-        """
-        Respond to a socket group being moved, by moving it's matching xml element. It's called 4 times (sometimes)
-
-        :param parent: QModelIndex: not Used.
-        :param start: int: where the row was moved from.
-        :param end: int: not Used. It's the same as start as multi-selection is not allowed.
-        :param destination: QModelIndex: not Used.
-        :param dest_row: int: The destination row.
-        :return: N/A
-        """
-        # print("skill_gem_row_moved")
-        # if not None, do move in current_xml_group and set self.socket_group_to_be_moved = None
-        # this way the last three are ignored.
-        if self.socket_group_to_be_moved is None:
-            return
-        # Do move
-        if self.current_socket_group is not None:
-            # item = self.win.list_SocketGroups.item(start)
-            if start < dest_row:
-                # need to decrement dest by one as we are going to remove start first
-                dest_row -= 1
-            _sg = self.current_socket_group.pop(start)
-            self.current_socket_group.insert(dest_row, _sg)
-
-        # reset to none, this way we only respond to the first call of the four.
-        self.skill_gem_to_be_moved = None
-
-    @Slot()
-    def skill_gem_row_about_to_be_moved(self, source_parent, source_start, source_end, dest_parent, dest_row):
-        """
-        Setup for a socket group move. It's called 4 times (sometimes).
-
-        :param source_parent: QModelIndex: Used to notify the move
-        :param source_start: int: not Used
-        :param source_end: int: not Used
-        :param dest_parent: QModelIndex: not Used
-        :param dest_row: int: not Used
-        :return: N/A
-        """
-        # print("skill_gem_row_about_to_be_moved")
-        self.skill_gem_to_be_moved = source_parent
-
     def import_gems_ggg_json(self, json_items, delete_all):
         """
         Import skills from the json supplied by GGG.
@@ -0,0 +1,229 @@
+"""
+SocketGroupModel Class
+
+The gems of the current socket group, for the Skills list, plus an empty row at the end for adding a gem.
+The rows are the socket group's "Gems" list from the build json, so moving or removing a row changes the build.
+
+GemDelegate() paints each row, and only makes a GemUI() (the combo, spin boxes and check box) for the row being edited.
+  SkillsUI() edits the row under the mouse, so there is one GemUI() however many gems a socket group has.
+  The editor is hidden and kept when its row is closed, and reused for the next row.
+"""
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSize, Qt
+from PySide6.QtGui import QColor, QIcon, QPalette
+from PySide6.QtWidgets import QApplication, QStyle, QStyleOptionButton, QStyleOptionComboBox, QStyledItemDelegate
+
+from PoB.constants import ColourCodes
+from PoB.settings import Settings
+from widgets.gem_ui import (
+    GemUI,
+    count_rect,
+    enabled_rect,
+    gem_list_rect,
+    level_rect,
+    quality_rect,
+    remove_rect,
+    row_height,
+    row_width,
+    variant_rect,
+)
+
+
+class SocketGroupModel(QAbstractListModel):
+    def __init__(self) -> None:
+        super().__init__()
+        # The socket group's "Gems" list, or None when no socket group is shown.
+        self.gems = None
+
+    def set_gems(self, gems):
+        """
+        Show another socket group's gems.
+        :param gems: list: the socket group's "Gems", or None for no rows.
+        :return: N/A
+        """
+        self.beginResetModel()
+        self.gems = gems
+        self.endResetModel()
+
+    def gem(self, row) -> dict:
+        """
+        data() can't be used for the gem itself, as Qt hands back a copy of a dict and the editor has to change the build's.
+        :param row: int:
+        :return: dict: the gem on a row, or None for the empty row.
+        """
+        return self.gems is not None and 0 <= row < len(self.gems) and self.gems[row] or None
+
+    # Overridden function
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() or self.gems is None:
+            return 0
+        return len(self.gems) + 1
+
+    # Overridden function
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            gem = self.gem(index.row())
+            return gem is not None and gem.get("nameSpec", "") or ""
+        return None
+
+    # Overridden function
+    def setData(self, index, value, role=Qt.EditRole) -> bool:
+        """
+        Called by GemDelegate.setModelData() after the editor has changed its gem.
+        :param index: QModelIndex: the row edited.
+        :param value: dict: the editor's gem. The editor has already saved its changes into it.
+        :param role: only Qt.UserRole is used.
+        :return: bool: True if the gem was changed.
+        """
+        if not index.isValid() or role != Qt.UserRole or self.gems is None or value is None:
+            return False
+        row = index.row()
+        if row == len(self.gems):
+            # A gem was chosen on the empty row. Add it and another empty row.
+            if value.get("variantId", "") == "":
+                return False
+            self.beginInsertRows(QModelIndex(), row + 1, row + 1)
+            self.gems.append(value)
+            self.endInsertRows()
+        self.dataChanged.emit(index, index)
+        return True
+
+    # Overridden function
+    def flags(self, index):
+        if not index.isValid():
+            # Gems are dropped between rows, not on them
+            return Qt.ItemIsDropEnabled
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+        return self.gem(index.row()) is not None and flags | Qt.ItemIsDragEnabled or flags
+
+    # Overridden function
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    # Overridden function
+    def removeRows(self, row, count, parent=QModelIndex()) -> bool:
+        if parent.isValid() or self.gems is None or row < 0 or row + count > len(self.gems):
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        del self.gems[row : row + count]
+        self.endRemoveRows()
+        return True
+
+    # Overridden function
+    def moveRows(self, source_parent, source_row, count, destination_parent, destination_row) -> bool:
+        """
+        Move gems within the socket group. The list view calls this when a row is dragged.
+        :param source_parent: QModelIndex: not Used.
+        :param source_row: int: the first row moved.
+        :param count: int: how many rows.
+        :param destination_parent: QModelIndex: not Used.
+        :param destination_row: int: the row they go before, counted before the move.
+        :return: bool: True if the gems moved.
+        """
+        if source_parent.isValid() or destination_parent.isValid() or self.gems is None:
+            return False
+        # The empty row stays at the end
+        destination_row = min(destination_row, len(self.gems))
+        if source_row < 0 or source_row + count > len(self.gems) or source_row <= destination_row <= source_row + count:
+            return False
+        if not self.beginMoveRows(source_parent, source_row, source_row + count - 1, destination_parent, destination_row):
+            return False
+        moved = self.gems[source_row : source_row + count]
+        del self.gems[source_row : source_row + count]
+        if destination_row > source_row:
+            destination_row -= count
+        self.gems[destination_row:destination_row] = moved
+        self.endMoveRows()
+        return True
+
+
+class GemDelegate(QStyledItemDelegate):
+    def __init__(self, parent, gems_by_name_or_id, gem_list, remove_gem, _settings: Settings) -> None:
+        """
+        GemDelegate
+        :param parent: QListView: the Skills list.
+        :param gems_by_name_or_id: dict: a dictionary of skills by id and name.
+        :param gem_list: function() -> GemFilterProxy: the gems for the editor's combo. See GemListModel().
+        :param remove_gem: function(gem: dict). Called when the editor's remove button is clicked.
+        :param _settings: A pointer to the settings
+        """
+        super().__init__(parent)
+        self.settings = _settings
+        self.gems_by_name_or_id = gems_by_name_or_id
+        self.gem_list = gem_list
+        self.remove_gem = remove_gem
+        self.cross_icon = QIcon()
+        self.cross_icon.addFile(":/Art/Icons/cross.png", QSize(), QIcon.Normal, QIcon.Off)
+        # The editor of the last row closed, to be used for the next one.
+        self.spare_editor = None
+
+    # Overridden function
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(row_width, row_height)
+
+    # Overridden function
+    def paint(self, painter, option, index):
+        """
+        Draw a row like GemUI() shows it, without making the widgets.
+        """
+        style = option.widget is None and QApplication.style() or option.widget.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+        gem = index.model().gem(index.row())
+        left, top = option.rect.x(), option.rect.y()
+        painter.save()
+        combo = QStyleOptionComboBox()
+        combo.rect = gem_list_rect.translated(left, top)
+        combo.state = QStyle.State_Enabled
+        combo.palette = option.palette
+        style.drawComplexControl(QStyle.CC_ComboBox, combo, painter, option.widget)
+        if gem is not None:
+            self.cross_icon.paint(painter, remove_rect.translated(left, top))
+            text_rect = style.subControlRect(QStyle.CC_ComboBox, combo, QStyle.SC_ComboBoxEditField, option.widget)
+            ggg_gem = self.gems_by_name_or_id.get(gem.get("variantId", ""), {})
+            painter.setPen(QColor(ggg_gem.get("colour", ColourCodes.NORMAL.value)))
+            painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, gem.get("nameSpec", ""))
+            painter.setPen(option.palette.color(QPalette.Text))
+            columns = [(level_rect, gem.get("level", 1)), (quality_rect, gem.get("quality", 0)), (variant_rect, "Default")]
+            if "Support" not in gem.get("variantId", ""):
+                columns.append((count_rect, gem.get("count", 1)))
+            for rect, value in columns:
+                painter.drawText(rect.translated(left + 4, top), Qt.AlignLeft | Qt.AlignVCenter, f"{value}")
+            check = QStyleOptionButton()
+            check.rect = enabled_rect.translated(left, top)
+            check.state = QStyle.State_Enabled | (gem.get("enabled", True) and QStyle.State_On or QStyle.State_Off)
+            style.drawControl(QStyle.CE_CheckBox, check, painter, option.widget)
+        painter.restore()
+
+    # Overridden function
+    def createEditor(self, parent, option, index):
+        editor, self.spare_editor = self.spare_editor, None
+        if editor is None:
+            editor = GemUI(parent, self.gems_by_name_or_id, self.commitData.emit, self.settings)
+            editor.btn_GemRemove.clicked.connect(lambda checked: self.remove_gem(editor.gem))
+        editor.fill_gem_list(self.gem_list())
+        return editor
+
+    # Overridden function
+    def destroyEditor(self, editor, index):
+        # The view has already hidden it
+        if self.spare_editor is None:
+            self.spare_editor = editor
+        else:
+            super().destroyEditor(editor, index)
+
+    # Overridden function
+    def setEditorData(self, editor, index):
+        gem = index.model().gem(index.row())
+        # Changes made in the editor come back here. It already shows them.
+        if gem is None or gem is not editor.gem:
+            editor.load(gem)
+
+    # Overridden function
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.gem, Qt.UserRole)
+
+    # Overridden function
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
@@ -0,0 +1,182 @@
+"""
+StatsModel Class
+
+The stats down the left of the main window, as a table of label, value and the change since the last calc.
+
+What to show for each stat (which entry, its label, format, colour and test) only changes with the main skill,
+  so display_rules() works that out once, in set_skill(). Each calc then only tests and formats the values (update()),
+  and only the rows whose text has changed are redrawn. If the same stats are shown, no rows are added or removed.
+"""
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor
+
+from PoB.constants import ColourCodes, bad_text, player_stats_list
+from PoB.settings import Settings
+from PoB.utils import format_number
+
+# Columns
+label_column, value_column, delta_column = 0, 1, 2
+# The resists that show how far over the cap they are. EG: "75% (12%)"
+overcap_stats = ("FireResist", "ColdResist", "LightningResist")
+
+
+def stat_entry(stat_name, stat, skill_flags) -> dict:
+    """
+    Stats like Speed have an entry per kind of skill. Choose the one to show.
+    :param stat_name: str: the key in player_stats_list.
+    :param stat: dict: the value in player_stats_list.
+    :param skill_flags: list. See Player.skill_flags.
+    :return: dict: with label, fmt and maybe colour.
+    """
+    match stat_name:
+        case "Speed":
+            return stat["attack" in skill_flags and "attack" or "spell" in skill_flags and "spell" or "trigger"]
+        case "AverageDamage" | "HitChance":
+            # ToDo: what is monster explode and where do we get it.
+            return stat["attack"]
+        case "TotalDPS" | "ImpaleDPS" | "WithImpaleDPS":
+            # ToDo: Need to work out the diff for "showAverage" and "notAverage".
+            return stat["showAverage"]
+    return stat
+
+
+def display_rules(skill_flags) -> list:
+    """
+    :param skill_flags: list. See Player.skill_flags.
+    :return: list: (stat_name, entry, condition) for each row, in order. Blank rows are ("", {}, "").
+        condition is "Y" for a test in Player.stat_condition(), the name of an entry in Player.conditions,
+        or "" to show the stat if it isn't 0 (or never, if the stat has hideStat).
+    """
+    rules = []
+    for stat_name, stat in player_stats_list.items():
+        if "blank" in stat_name:
+            # Prevent duplicate blank lines
+            if rules and rules[-1][0] != "":
+                rules.append(("", {}, ""))
+        else:
+            rules.append((stat_name, stat_entry(stat_name, stat, skill_flags), stat.get("condition", "")))
+    return rules
+
+
+class StatsModel(QAbstractTableModel):
+    def __init__(self, _settings: Settings) -> None:
+        """
+        StatsModel
+        :param _settings: A pointer to the settings
+        """
+        super().__init__()
+        self.settings = _settings
+        self.skill_flags = []
+        self.rules = display_rules(self.skill_flags)
+        # [stat_name, label, value text, colour, delta text, delta colour] for each row shown. stat_name is "" for a blank row.
+        self.rows = []
+        # {stat_name: value} from the last calc, for the deltas.
+        self.values = {}
+
+    # Overridden function
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return parent.isValid() and 0 or len(self.rows)
+
+    # Overridden function
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return parent.isValid() and 0 or 3
+
+    # Overridden function
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+        match role:
+            case Qt.DisplayRole:
+                return row[(1, 2, 4)[column]]
+            case Qt.ForegroundRole:
+                colour = (row[3], row[3], row[5])[column]
+                return colour and QBrush(QColor(colour)) or None
+            case Qt.TextAlignmentRole:
+                return column == label_column and Qt.AlignRight | Qt.AlignVCenter or Qt.AlignLeft | Qt.AlignVCenter
+            case Qt.ToolTipRole:
+                return row[0] or None
+        return None
+
+    def set_skill(self, skill_flags):
+        """
+        Work out the rows to show for a main skill. The values are shown on the next update().
+        :param skill_flags: list. See Player.skill_flags.
+        :return: N/A
+        """
+        skill_flags = list(skill_flags or [])
+        if skill_flags != self.skill_flags:
+            self.skill_flags = skill_flags
+            self.rules = display_rules(skill_flags)
+
+    def clear(self):
+        """
+        Empty the table and forget the last values, EG: when loading another build.
+        :return: N/A
+        """
+        self.beginResetModel()
+        self.rows = []
+        self.values = {}
+        self.endResetModel()
+
+    def update(self, player):
+        """
+        Show the stats of the latest calc.
+        :param player: Player(): with the stats and conditions from the calc.
+        :return: N/A
+        """
+        stats = player.stats
+        rows = []
+        for stat_name, entry, condition in self.rules:
+            if stat_name == "":
+                # Prevent duplicate blank lines
+                if rows and rows[-1][0] != "":
+                    rows.append(["", "", "", "", "", ""])
+                continue
+            stat_value = stats.get(stat_name, bad_text)
+            if stat_value == bad_text:
+                continue
+            label = entry["label"]
+            match condition:
+                case "Y":
+                    display = player.stat_condition(stat_name, stat_value, self.skill_flags)
+                case "":
+                    display = not entry.get("hideStat", False) and stat_value != 0
+                case _:
+                    display = player.conditions.get(condition, False)
+            if stat_name == "LightningMaximumHitTaken" and not display:
+                # Special Case for (Lightning,Fire,Cold)MaximumHitTaken are all the same
+                display = True
+                label = entry["alt_label"]
+            if not display:
+                continue
+
+            fmt = entry.get("fmt", "%d")
+            value_text = format_number(stat_value, fmt, self.settings)
+            if stat_name in overcap_stats:
+                overcap = stats.get(f"{stat_name}OverCap", 0)
+                if overcap > 0:
+                    value_text += format_number(overcap, " (%d%%)", self.settings)
+            colour = stat_value < 0 and ColourCodes.NEGATIVE.value or entry.get("colour", self.settings.qss_default_text)
+            previous = self.values.get(stat_name, stat_value)
+            delta = stat_value - previous
+            delta_text, delta_colour = "", ""
+            # Changes too small to show in the value's format aren't changes
+            if delta and format_number(previous, fmt, self.settings) != format_number(stat_value, fmt, self.settings):
+                delta_text = format_number(delta, fmt.replace("%", "%+", 1), self.settings)
+                delta_colour = delta > 0 and ColourCodes.POSITIVE.value or ColourCodes.NEGATIVE.value
+            rows.append([stat_name, f"{label}:", value_text, colour, delta_text, delta_colour])
+        self.values = dict(stats)
+
+        if [row[0] for row in rows] != [row[0] for row in self.rows]:
+            # Different stats are shown. Start again.
+            self.beginResetModel()
+            self.rows = rows
+            self.endResetModel()
+            return
+        for idx, row in enumerate(rows):
+            if row != self.rows[idx]:
+                self.rows[idx] = row
+                self.dataChanged.emit(self.index(idx, label_column), self.index(idx, delta_column))
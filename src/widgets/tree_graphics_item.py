@@ -2,12 +2,15 @@
 TreeItem Class
 
 This class represents a graphical instance of one visual element of a Passive Tree for a given tree version.
+
+Given a LazySprite (see Tree.process_sprite_map()), the pixmap isn't made until the item is first painted.
+  Its size is known up front, so the scene can place it without the image.
 """
 
 from copy import deepcopy
 
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap, QGuiApplication
+from PySide6.QtCore import QRectF, Qt
+from PySide6.QtGui import QGuiApplication, QPainterPath, QPixmap
 from PySide6.QtWidgets import QGraphicsPixmapItem
 
 from PoB.constants import ColourCodes
@@ -24,11 +27,19 @@ class TreeGraphicsItem(QGraphicsPixmapItem):
         self.filename = ""
         self.tool_tip = ""
         self.data = ""
-        self.setPixmap(_image)
-        if not type(_image) is QPixmap:
-            self.filename = str(_image)
-        self.width = self.pixmap().size().width()
-        self.height = self.pixmap().size().height()
+        # The LazySprite this item shows, or None if it was given a pixmap. LazySprite makes the pixmap when it is first painted.
+        self.sprite = isinstance(_image, dict) and _image or None
+        # The default (MaskShape) builds a mask from the pixmap for hover tests. A rectangle is plenty for a tree image.
+        self.setShapeMode(QGraphicsPixmapItem.BoundingRectShape)
+        if self.sprite is not None:
+            self.width = self.sprite["width"]
+            self.height = self.sprite["height"]
+        else:
+            self.setPixmap(_image)
+            if not type(_image) is QPixmap:
+                self.filename = str(_image)
+            self.width = self.pixmap().size().width()
+            self.height = self.pixmap().size().height()
         self._z_value = z_value
         self.layer = z_value
 
@@ -89,6 +100,33 @@ class TreeGraphicsItem(QGraphicsPixmapItem):
         self._item = new_item
         self.name = new_item.name
 
+    # Inherited, don't change definition
+    def boundingRect(self):
+        if self.sprite is not None:
+            return QRectF(self.offset().x(), self.offset().y(), self.sprite["width"], self.sprite["height"])
+        return super(TreeGraphicsItem, self).boundingRect()
+
+    # Inherited, don't change definition
+    def shape(self):
+        if self.sprite is not None:
+            path = QPainterPath()
+            path.addRect(self.boundingRect())
+            return path
+        return super(TreeGraphicsItem, self).shape()
+
+    # Inherited, don't change definition
+    def pixmap(self):
+        if self.sprite is not None:
+            return self.sprite["handle"]
+        return super(TreeGraphicsItem, self).pixmap()
+
+    # Inherited, don't change definition
+    def paint(self, painter, option, widget=None):
+        if self.sprite is not None:
+            painter.drawPixmap(self.offset(), self.sprite["handle"])
+        else:
+            super(TreeGraphicsItem, self).paint(painter, option, widget)
+
     # Inherited, don't change definition
     def setScale(self, scale: int = 1):
         super(TreeGraphicsItem, self).setScale(scale)
@@ -4,11 +4,12 @@ This Class manages all the elements and owns some elements of the "TREE" tab.
 
 import re
 
-from PySide6.QtCore import Qt, Slot, QSize
+from PySide6.QtCore import Qt, Slot, QSize, QTimer
 from PySide6.QtGui import QBrush
 from PySide6.QtWidgets import QCheckBox, QComboBox, QLabel, QLineEdit, QPushButton, QDialog
 
-from PoB.constants import colourEscapes, tree_versions, ColourCodes, PlayerClasses, _VERSION_str
+from PoB.constants import colourEscapes, comparison_stats, player_stats_list, tree_versions, ColourCodes, PlayerClasses, _VERSION_str
+from PoB.pob_xml import save_to_xml_string
 from PoB.settings import Settings
 from PoB.spec import Spec
 from dialogs.manage_tree_dialog import ManageTreeDlg
@@ -35,6 +36,8 @@ class TreeUI:
         self.dlg = None  # Is a dialog active
         self.json_tree = None
         self.json_treeview = None
+        # Results of the last node power run. {node_id: {"values": {stat: change}, "path": {...}, "pathLength": int}}
+        self.node_power = {}
 
         self.win.action_ManageTrees.triggered.connect(self.open_manage_trees)
 
@@ -100,6 +103,9 @@ class TreeUI:
         self.combo_show_node_power.setMaximumSize(QSize(180, 16777215))
         self.combo_show_node_power.setVisible(False)
         self.combo_show_node_power.setEnabled(True)
+        for stat_name in comparison_stats:
+            self.combo_show_node_power.addItem(player_stats_list[stat_name]["label"], stat_name)
+        self.combo_show_node_power.currentIndexChanged.connect(self.refresh_node_power)
         self.layout_tree_tools.addWidget(self.combo_show_node_power)
         self.btn_show_power_report = QPushButton()
         self.btn_show_power_report.setText(f'{self.tr("Show Power Report")} ...')
@@ -108,7 +114,12 @@ class TreeUI:
         self.layout_tree_tools.addWidget(self.btn_show_power_report)
         """ End Adding Widgets to the QFrame at the bottom of the TreeView. """
 
-        self.lineEdit_Search.textChanged.connect(self.search_text_changed)
+        # Wait for a pause in typing before searching, rather than searching on every key press.
+        self.search_timer = QTimer(self.win)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.search_text_changed)
+        self.lineEdit_Search.textChanged.connect(lambda text: self.search_timer.start())
         self.lineEdit_Search.returnPressed.connect(self.search_text_return_pressed)
 
     def load(self, _config: dict, _treeview: dict):
@@ -171,6 +182,66 @@ class TreeUI:
         """
         self.combo_show_node_power.setVisible(checked_state > 0)
         self.btn_show_power_report.setVisible(checked_state > 0)
+        self.refresh_node_power()
+
+    @Slot()
+    def refresh_node_power(self):
+        """
+        Work out, for every node that could be allocated, what allocating it would do to the chosen stat.
+        The calc pool does the work and the heat map fills in as results arrive. Called after every calculation,
+        as the values depend on the rest of the build. A run still going is abandoned.
+        :return: N/A
+        """
+        if not self.check_show_node_power.isChecked():
+            self.win.calc_pool.cancel("node_power")
+            self.win.gview_Tree.clear_node_power()
+            self.node_power.clear()
+            return
+        tree = self.build.current_tree
+        allocated = self.build.current_spec.nodes
+        # Masteries need an effect chosen, and starting nodes can't be clicked on
+        candidates = [
+            node.id
+            for node in tree.nodes.values()
+            if node.id not in allocated
+            and node.type != "Mastery"
+            and not node.isProxy
+            and not node.isAscendancyStart
+            and node.classStartIndex < 0
+            and node.ascendancyName in ("", self.build.ascendClassName)
+        ]
+        # Nodes that are now allocated lose their spot. The others keep theirs until new results arrive, for less flicker
+        self.win.gview_Tree.clear_node_power([node_id for node_id in self.node_power if node_id in allocated])
+        self.node_power.clear()
+        job = {"kind": "power", "stats": [self.combo_show_node_power.currentData()], "nodes": candidates}
+        # Tree changes are only in the current spec until it is saved
+        self.build.current_spec.save()
+        self.win.calc_pool.run(
+            "node_power", save_to_xml_string(self.build.json, True), job, "nodes", self.node_power_part, self.node_power_done
+        )
+
+    def node_power_part(self, part: dict):
+        """
+        One node's result has arrived from the calc pool.
+        :param part: dict: {"key": node_id, "values": {stat: change}, "path": {stat: change}, "pathLength": int}
+        :return: N/A
+        """
+        node_id = part["key"]
+        self.node_power[node_id] = part
+        self.win.gview_Tree.show_node_power(node_id, part["values"].get(self.combo_show_node_power.currentData(), 0))
+        done, total = self.win.calc_pool.progress("node_power")
+        if done % 50 == 0:
+            self.win.update_status_bar(f"Node power: {done} of {total}")
+
+    def node_power_done(self):
+        """
+        The calc pool has finished a node power run. Remove any spots left from nodes that had no result this time.
+        :return: N/A
+        """
+        self.win.gview_Tree.clear_node_power(
+            [node_id for node_id in self.win.gview_Tree.node_power_spots if node_id not in self.node_power]
+        )
+        self.win.update_status_bar(f"Node power: {len(self.node_power)} nodes")
 
     @Slot()
     def shortcut_CtrlM(self):
@@ -286,9 +357,10 @@ class TreeUI:
     @Slot()
     def search_text_changed(self):
         """
-        Store the text of Search edit as it is typed.
+        Store the text of Search edit once typing pauses, and show the search rings.
         Should we use this or just use the return_pressed function
         """
+        self.search_timer.stop()
         self.build.search_text = self.lineEdit_Search.text()
         self.win.gview_Tree.refresh_search_rings()
 
@@ -11,16 +11,23 @@ A Tree instance is tied to a Version of the Tree as released by GGG and thus old
 
 from PySide6.QtCore import QLineF, QRectF, Qt
 from PySide6.QtGui import QBrush, QColor, QPen, QPainter, QPixmap
-from PySide6.QtWidgets import QFrame, QGraphicsEllipseItem, QGraphicsScene, QGraphicsView, QDialogButtonBox
+from PySide6.QtWidgets import QFrame, QGraphicsEllipseItem, QGraphicsPixmapItem, QGraphicsScene, QGraphicsView, QDialogButtonBox
 
 from ui.PoB_Main_Window import Ui_MainWindow
 from PoB.constants import ColourCodes, class_backgrounds, Layers, PlayerClasses
 from PoB.settings import Settings
 from PoB.build import Build
+from PoB.calc_worker import node_delta
 from dialogs.popup_dialogs import MasteryPopup
 from widgets.tree_graphics_item import TreeGraphicsItem
 from PoB.utils import _debug, html_colour_text, print_call_stack
 
+# Zoomed out further than this, the inactive tree is drawn from a few pre-rendered tiles instead of thousands of items.
+lod_zoom = 0.15
+# The resolution the tiles are rendered at (pixels per scene unit) and the size of a tile in pixels.
+lod_tile_scale = 0.15
+lod_tile_size = 1024
+
 
 class TreeView(QGraphicsView):
     def __init__(self, _settings: Settings, _build: Build, _win: Ui_MainWindow) -> None:
@@ -36,9 +43,25 @@ class TreeView(QGraphicsView):
         self.build = _build
 
         self.search_rings = []
-        self.active_nodes = []
-        self.active_lines = []
-        self.compare_nodes_items = []
+        # What is drawn for the current spec, so add_tree_images() only needs to change the differences.
+        # The tree those are from. A different tree means starting again.
+        self.drawn_tree = None
+        # {node_id: (node_look(), [active images])}
+        self.active_nodes = {}
+        # {node_id: TreeGraphicsItem} for jewels in sockets. These are made by us, not the Tree().
+        self.jewel_images = {}
+        # {(node_id, node_id): QGraphicsLineItem}
+        self.active_lines = {}
+        # {node_id: (colour, QGraphicsEllipseItem)}
+        self.compare_nodes_items = {}
+        # Node power heat map. {node_id: QGraphicsEllipseItem}, and the biggest value, which the colours are relative to.
+        self.node_power_spots = {}
+        self.node_power_max = 0
+        # True when the inactive tree is being drawn from Tree().lod_tiles. See update_lod().
+        self.lod_active = False
+        # Rings and lines showing what a click on the node under the mouse would allocate or remove.
+        self.path_preview = []
+        self.path_preview_node_id = 0
 
         self._scene = QGraphicsScene()
         self.setScene(self._scene)
@@ -48,6 +71,8 @@ class TreeView(QGraphicsView):
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setFrameShape(QFrame.NoFrame)
         self.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        # Every item restores the painter and none draw outside their bounding rect, so Qt can skip the checks.
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
         # set a background of black as this stops the tree looking ugly when a non-dark theme is selected.
         # ascendancy-background-3.jpg also has a hard coded black background.
         self.setBackgroundBrush(QBrush(Qt.black, Qt.SolidPattern))
@@ -56,6 +81,8 @@ class TreeView(QGraphicsView):
         self.fitInView(True, 0.1)
 
         self.setDragMode(QGraphicsView.ScrollHandDrag)
+        # mouseMoveEvent is needed without a button down, for the path preview
+        self.setMouseTracking(True)
         # Stop the drag icon being the default, which the above line would do
         self.viewport().setCursor(Qt.ArrowCursor)
 
@@ -105,6 +132,32 @@ class TreeView(QGraphicsView):
         # Stop hand cursor
         self.viewport().setCursor(Qt.ArrowCursor)
 
+    # Inherited, don't change definition
+    def mouseMoveEvent(self, event) -> None:
+        """
+        Preview what clicking on the node under the mouse would do.
+
+        :param event: Internal event matrix
+        :return: N/A
+        """
+        super(TreeView, self).mouseMoveEvent(event)
+        # Dragging the tree around
+        if event.buttons() != Qt.NoButton:
+            return
+        scene_pos = self.mapToScene(event.pos())
+        node = self.build.current_tree.node_at(scene_pos.x(), scene_pos.y())
+        self.show_path_preview(node)
+
+    # Inherited, don't change definition
+    def leaveEvent(self, event) -> None:
+        """
+        Remove the path preview when the mouse leaves the tree.
+        :param event: Internal event matrix
+        :return: N/A
+        """
+        super(TreeView, self).leaveEvent(event)
+        self.clear_path_preview()
+
     # Inherited, don't change definition
     def mouseReleaseEvent(self, event) -> None:
         """
@@ -118,59 +171,53 @@ class TreeView(QGraphicsView):
         super(TreeView, self).mouseReleaseEvent(event)
         # Ensure hand cursor is gone (it's sneaky)
         self.viewport().setCursor(Qt.ArrowCursor)
-        # If compare is on, then the compare circles will be the first item detected (highest in the Z order)
-        # Get all items at that pos and find the first TreeGraphicsItem
-        graphic_items = self.items(event.pos())
-        if len(graphic_items) < 1:
-            return
-        # for i in graphic_items:
-        #     if type(i) is TreeGraphicsItem:
-        #         print(f"{i.node_id=}, {i.name=}")
-        g_item: TreeGraphicsItem = next((i for i in graphic_items if isinstance(i, TreeGraphicsItem)), None)
-        if (
-            g_item
-            and type(g_item) is TreeGraphicsItem
-            and g_item.node_id != 0
-            and not g_item.node_isAscendancyStart
-            and g_item.node_classStartIndex < 0
-        ):
-            # print("mouseReleaseEvent", g_item.node_id)
+        # Ask the tree's spatial index, not the scene. self.items() tests the shape of every item under the mouse.
+        scene_pos = self.mapToScene(event.pos())
+        node = self.build.current_tree.node_at(scene_pos.x(), scene_pos.y())
+        if node is not None and not node.isAscendancyStart and node.classStartIndex < 0:
+            # print("mouseReleaseEvent", node.id)
+            # What changed, so the calc engine only needs to apply that to the build it holds
+            deltas = []
             if event.button() == Qt.LeftButton:
-                if g_item.node_id in self.build.current_spec.nodes:
-                    if g_item.node_type == "Mastery":
-                        self.build.current_spec.remove_mastery_effect(g_item.node_id)
-                    # elif g_item.node_type == "Socket":
-                    #     del self.build.current_spec.sockets[g_item.node_id]
-                    self.build.current_spec.remove_node(g_item.node)
+                spec = self.build.current_spec
+                tree = self.build.current_tree
+                if node.id in spec.nodes:
+                    # Remove the node and anything that was only connected through it
+                    for node_id in [node.id] + tree.orphans(spec.nodes - {node.id}):
+                        if tree.nodes[node_id].type == "Mastery":
+                            spec.remove_mastery_effect(node_id)
+                        spec.remove_node(tree.nodes[node_id])
+                        deltas.append(node_delta(node_id, False))
                 else:
-                    node = g_item.node
-                    # Check to see if node is connected to an active node
-                    for node_id in node.nodes_out.union(node.nodes_in):
-                        if node_id in self.build.current_spec.nodes:
-                            if g_item.node_type == "Mastery":
-                                # print("mastery_popup", self.build.current_tree.nodes[g_item.node_id])
-                                m_effect = self.mastery_popup(self.build.current_tree.nodes[g_item.node_id])
-                                if m_effect != 0:
-                                    self.build.current_spec.add_node(g_item.node)
-                                    g_item.build_tooltip(m_effect)
-                            elif g_item.node_type == "Socket":
-                                # ToDo: Do we need a popup to select a jewel ?
-                                self.build.current_spec.add_node(g_item.node)
-                            else:
-                                # print(f"mouseReleaseEvent, {g_item.node_type=}")
-                                self.build.current_spec.add_node(g_item.node)
-                            break
+                    # Allocate the shortest path to the node. The first node of the path is already allocated.
+                    path = tree.path_to(node.id, spec.nodes)[1:]
+                    m_effect = 0
+                    if path and node.type == "Mastery":
+                        # print("mastery_popup", node)
+                        m_effect = self.mastery_popup(node)
+                        if m_effect == 0:
+                            path = []
+                        else:
+                            node.inactive_image.build_tooltip(m_effect)
+                    # ToDo: Do we need a popup to select a jewel for a Socket ?
+                    for node_id in path:
+                        spec.add_node(tree.nodes[node_id])
+                        deltas.append(node_delta(node_id, True, node_id == node.id and m_effect or 0))
             elif event.button() == Qt.RightButton:
                 # look for Mastery and popup a dialog
-                # print("RightButton", _item.node_type)
-                if g_item.node_type == "Mastery" and g_item.node_id in self.build.current_spec.nodes:
-                    self.mastery_popup(self.build.current_tree.nodes[g_item.node_id])
+                # print("RightButton", node.type)
+                if node.type == "Mastery" and node.id in self.build.current_spec.nodes:
+                    m_effect = self.mastery_popup(node)
+                    if m_effect != 0:
+                        deltas.append(node_delta(node.id, True, m_effect))
+            self.clear_path_preview()
             self.add_tree_images()
             # count the new nodes ...
             self.build.count_allocated_nodes()
             # ... and display them
             self.win.display_number_node_points(-1)
-            self.win.do_calcs()
+            if deltas:
+                self.win.do_calcs_delta(deltas)
 
     # Function Overridden
     def fitInView(self, scale=True, factor=None):
@@ -191,6 +238,81 @@ class TreeView(QGraphicsView):
             self.scale(1 / unity.width(), 1 / unity.height())
         else:
             self.scale(factor, factor)
+        self.update_lod()
+
+    def lod_items(self, tree):
+        """
+        The items that are drawn from tiles when zoomed out. The ascendancy backgrounds change opacity, so they are left out.
+
+        :param tree: Tree():
+        :return: list of QGraphicsItems
+        """
+        return [item for item in tree.graphics_items if item not in tree.ascendancy_group_list] + tree.lines
+
+    def build_lod_tiles(self, tree):
+        """
+        Render the inactive tree into tiles for drawing when zoomed out. The tree's items must be in the scene.
+
+        :param tree: Tree():
+        :return: N/A
+        """
+        detail = self.lod_items(tree)
+        if not detail or detail[0].scene() is not self._scene:
+            return
+        # Only the inactive tree goes in the tiles, so hide everything else while rendering
+        detail_ids = set(id(item) for item in detail)
+        others = [item for item in self._scene.items() if id(item) not in detail_ids and item.isVisible()]
+        for item in others:
+            item.setVisible(False)
+        for item in detail:
+            item.setVisible(True)
+        bounds = QRectF()
+        for item in detail:
+            bounds = bounds.united(item.sceneBoundingRect())
+        step = lod_tile_size / lod_tile_scale
+        y = bounds.top()
+        while y < bounds.bottom():
+            x = bounds.left()
+            while x < bounds.right():
+                pixmap = QPixmap(lod_tile_size, lod_tile_size)
+                pixmap.fill(Qt.transparent)
+                painter = QPainter(pixmap)
+                painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+                self._scene.render(painter, QRectF(0, 0, lod_tile_size, lod_tile_size), QRectF(x, y, step, step))
+                painter.end()
+                tile = QGraphicsPixmapItem(pixmap)
+                tile.setPos(x, y)
+                tile.setScale(1 / lod_tile_scale)
+                tile.setTransformationMode(Qt.SmoothTransformation)
+                tile.setZValue(Layers.group)
+                tile.setAcceptedMouseButtons(Qt.NoButton)
+                tile.setVisible(False)
+                tree.lod_tiles.append(tile)
+                self._scene.addItem(tile)
+                x += step
+            y += step
+        for item in others:
+            item.setVisible(True)
+
+    def update_lod(self, force=False):
+        """
+        Swap between drawing the inactive tree as separate items (zoomed in) and as pre-rendered tiles (zoomed out).
+        Hidden items are skipped by the scene's index, so panning a zoomed out tree only paints a few tiles.
+
+        :param force: bool: Set the items' visibility even if the zoom hasn't crossed lod_zoom. EG: a new tree.
+        :return: N/A
+        """
+        tree = self.build.current_tree
+        lod = self.transform().m11() < lod_zoom
+        if tree is None or (lod == self.lod_active and not force):
+            return
+        if lod and not tree.lod_tiles:
+            self.build_lod_tiles(tree)
+        self.lod_active = lod
+        for item in self.lod_items(tree):
+            item.setVisible(not lod)
+        for tile in tree.lod_tiles:
+            tile.setVisible(lod)
 
     def mastery_popup(self, node):
         """
@@ -254,55 +376,156 @@ class TreeView(QGraphicsView):
 
     def refresh_search_rings(self):
         """
-        clear and redraw search rings around nodes.
+        Show search rings around the nodes matching the search text. See Tree().search() for what matches.
+        Rings are kept between searches and moved, rather than made again for every key press.
 
         :return: N/A
         """
-
-        def add_circle(_image: TreeGraphicsItem, colour, line_width=10, z_value=10):
-            """
-            Draw a circle around an overlay image.
-
-            :param _image: TreegraphicsItem: The image to have a circle drawn around it.
-            :param colour: ColourCodes.value: yep.
-            :param line_width: int: yep.
-            :param z_value: Layers: which layer shall we draw it.
-            :return: a reference to the circle.
-            """
-            _circle = QGraphicsEllipseItem(
+        line_width = 12
+        # We only put search rings around a node's overlay, not the node itself.
+        # This stops the ring appearing under or over the node's overlay.
+        nodes = [node for node in self.build.current_tree.search(self.build.search_text) if node.inactive_overlay_image is not None]
+        for idx, node in enumerate(nodes):
+            if idx == len(self.search_rings):
+                ring = QGraphicsEllipseItem()
+                ring.setPen(QPen(QColor(Qt.yellow), line_width, Qt.SolidLine))
+                ring.setZValue(10)
+                self._scene.addItem(ring)
+                self.search_rings.append(ring)
+            _image = node.inactive_overlay_image
+            ring = self.search_rings[idx]
+            ring.setRect(
                 _image.pos().x() + _image.offset().x() - line_width / 2,
                 _image.pos().y() + _image.offset().y() - line_width / 2,
                 _image.width + line_width,
                 _image.height + line_width,
             )
-            _circle.setPen(QPen(QColor(colour), line_width, Qt.SolidLine))
-            _circle.setZValue(z_value)
-            # _circle.setStartAngle(90 * 16)
-            # _circle.setSpanAngle(90 * 16)
-
-            return _circle
-            # add_circle
-
-        for item in self.search_rings:
-            self._scene.removeItem(item)
-            del item
-        self.search_rings.clear()
-        if self.build.search_text == "":
+            ring.setVisible(True)
+        for ring in self.search_rings[len(nodes) :]:
+            ring.setVisible(False)
+
+    def show_path_preview(self, node):
+        """
+        Show the nodes a left click would allocate (with the lines between them), or the nodes it would remove.
+
+        :param node: Node: the node under the mouse. None for no node.
+        :return: N/A
+        """
+
+        def add_ring(_node, colour):
+            """Draw a ring around a node's image."""
+            _image = _node.inactive_overlay_image is None and _node.inactive_image or _node.inactive_overlay_image
+            if _image is None:
+                return
+            _ring = QGraphicsEllipseItem(
+                _image.pos().x() + _image.offset().x(),
+                _image.pos().y() + _image.offset().y(),
+                _image.width,
+                _image.height,
+            )
+            _ring.setPen(QPen(QColor(colour), 8, Qt.SolidLine))
+            _ring.setZValue(Layers.jewels)
+            _ring.setAcceptedMouseButtons(Qt.NoButton)
+            self.path_preview.append(_ring)
+            self._scene.addItem(_ring)
+
+        node_id = node is not None and node.id or 0
+        if node_id == self.path_preview_node_id:
             return
-        # We only put search rings around a node's overlay, not the node itself.
-        # This stops the ring appearing under or over the node's overlay.
-        for image in self.build.current_tree.graphics_items:
-            if image.node_isoverlay and self.build.search_text in image.build_tooltip():
-                circle = add_circle(image, Qt.yellow, 12)
-                self.search_rings.append(circle)
-                self._scene.addItem(circle)
+        self.clear_path_preview()
+        self.path_preview_node_id = node_id
+        if node is None or node.isAscendancyStart or node.classStartIndex >= 0:
+            return
+        tree = self.build.current_tree
+        allocated = self.build.current_spec.nodes
+        if node_id in allocated:
+            for _node_id in [node_id] + tree.orphans(allocated - {node_id}):
+                add_ring(tree.nodes[_node_id], ColourCodes.RED.value)
+        else:
+            path = tree.path_to(node_id, allocated)
+            for from_id, to_id in zip(path, path[1:]):
+                from_node, to_node = tree.nodes[from_id], tree.nodes[to_id]
+                line = self._scene.addLine(
+                    from_node.x, from_node.y, to_node.x, to_node.y, QPen(QColor(ColourCodes.CURRENCY.value), 4, Qt.DashLine)
+                )
+                line.setZValue(Layers.active_connectors)
+                self.path_preview.append(line)
+                add_ring(to_node, ColourCodes.CURRENCY.value)
+
+    def clear_path_preview(self):
+        """
+        Remove the path preview.
+
+        :return: N/A
+        """
+        for item in self.path_preview:
+            if item.scene() is self._scene:
+                self._scene.removeItem(item)
+        self.path_preview.clear()
+        self.path_preview_node_id = 0
+
+    def show_node_power(self, node_id, value):
+        """
+        Colour a node by how much allocating it would change the chosen stat. Called repeatedly as results arrive.
+
+        :param node_id: int: the node.
+        :param value: int/float: the change to the stat. 0 removes the node's spot.
+        :return: N/A
+        """
+
+        def colour_spot(_spot, _value):
+            """Red for better, blue for worse. The stronger the colour, the nearer to the best (or worst) node."""
+            _spot.setBrush(QBrush(_value > 0 and Qt.red or Qt.blue, Qt.SolidPattern))
+            _spot.setOpacity(0.15 + 0.7 * min(abs(_value) / self.node_power_max, 1))
+
+        node = self.build.current_tree.nodes.get(node_id, None)
+        if node is None or node.inactive_image is None:
+            return
+        if value == 0:
+            self.clear_node_power([node_id])
+            return
+        spot = self.node_power_spots.get(node_id, None)
+        if spot is None:
+            _image = node.inactive_overlay_image is None and node.inactive_image or node.inactive_overlay_image
+            spot = QGraphicsEllipseItem(
+                _image.pos().x() + _image.offset().x(),
+                _image.pos().y() + _image.offset().y(),
+                _image.width,
+                _image.height,
+            )
+            spot.setZValue(9)
+            spot.setAcceptedMouseButtons(Qt.NoButton)
+            self.node_power_spots[node_id] = spot
+            self._scene.addItem(spot)
+        spot.setData(0, value)
+        if abs(value) > self.node_power_max:
+            # Every colour is relative to the biggest, so they all need redoing
+            self.node_power_max = abs(value)
+            for _spot in self.node_power_spots.values():
+                colour_spot(_spot, _spot.data(0))
+        else:
+            colour_spot(spot, value)
+
+    def clear_node_power(self, node_ids=None):
+        """
+        Remove the node power heat map, or just some of it.
+
+        :param node_ids: list: nodes to remove the spot from. None for all of them.
+        :return: N/A
+        """
+        if node_ids is None:
+            node_ids = list(self.node_power_spots.keys())
+            self.node_power_max = 0
+        for node_id in node_ids:
+            spot = self.node_power_spots.pop(node_id, None)
+            if spot is not None:
+                self._scene.removeItem(spot)
 
     def add_tree_images(self, full_clear=False):
         """
-        Used when swapping tree's in a build.
-        It will remove all assets, including selected nodes and connecting lines and present an empty tree.
-        It is expected another function will be called to created selected nodes and connecting lines.
-        :param: full_clear: bool: If set, delete the tree images also. If not set, only delete the active images
+        Bring the scene up to date with the current tree and spec.
+        Only the nodes, lines and compare spots that have changed since the last call are added or removed.
+        :param: full_clear: bool: If set, replace the tree images also. EG: the tree's version has changed.
         :return: N/A
         """
 
@@ -326,12 +549,70 @@ class TreeView(QGraphicsView):
             _spot.setOpacity(0.3)
             _spot.setZValue(z_value)
             _spot.setAcceptedMouseButtons(Qt.NoButton)
-            self.compare_nodes_items.append(_spot)
             self._scene.addItem(_spot)
 
             return _spot
             # add_compare_spot
 
+        def node_look(_node):
+            """
+            What, other than being allocated, changes how an active node looks.
+
+            :param _node: Node:
+            :return: the chosen mastery effect, the jewel in a socket, or None.
+            """
+            if _node.masteryEffects:
+                return self.build.current_spec.get_mastery_effect(_node.id)
+            if _node.type == "Socket" and self.items_jewels:
+                return self.items_jewels.get(self.build.current_spec.sockets.get(_node.id, None), None)
+            return None
+
+        def add_node_images(_node, look):
+            """
+            Add the images for an active node.
+
+            :param _node: Node:
+            :param look: the result of node_look().
+            :return: list: the images added.
+            """
+            images = []
+            if _node.active_image is not None:
+                images.append(_node.active_image)
+                if _node.active_overlay_image is not None:
+                    images.append(_node.active_overlay_image)
+            if _node.masteryEffects:
+                _node.activeEffectImage.build_tooltip(look)
+                images.append(_node.activeEffectImage)
+            if _node.type == "Socket":
+                if look is not None:
+                    sprite = _node.sprites.get(look.sub_type, None)
+                    if sprite is not None:
+                        image = self.add_picture(sprite["handle"], _node.x, _node.y, Layers.jewels, _node, True)
+                        image.setOffset(sprite["ox"], sprite["oy"])
+                        image.item = look
+                        self.jewel_images[_node.id] = image
+                if _node.active_overlay_image is not None and _node.active_overlay_image not in images:
+                    images.append(_node.active_overlay_image)
+            for image in images:
+                self._scene.addItem(image)
+            return images
+
+        def remove_node_images(_node_id):
+            """
+            Remove the images for a node that is no longer active, or needs redrawing.
+
+            :param _node_id: int:
+            :return: N/A
+            """
+            for image in self.active_nodes.pop(_node_id, (None, []))[1]:
+                self._scene.removeItem(image)
+            image = self.jewel_images.pop(_node_id, None)
+            if image is not None:
+                self._scene.removeItem(image)
+
+        def has_lines(_node):
+            return _node is not None and _node.type not in ("ClassStart", "Mastery")
+
         # leave the print in till we have everything working.
         # It is what tells us how often the assets are being redrawn.
         # _debug(f"add_tree_images, full_clear={full_clear}")
@@ -340,10 +621,20 @@ class TreeView(QGraphicsView):
 
         tree = self.build.current_tree
         # do not use self.clear as it deletes the graphics assets from memory
-        if full_clear:
+        if full_clear or tree is not self.drawn_tree:
             # don't delete the images for the nodes as they are owned by the relevant Tree() class.
             for g_item in self.items():
                 self._scene.removeItem(g_item)
+            self.node_power_spots.clear()
+            self.node_power_max = 0
+            self.active_nodes.clear()
+            self.jewel_images.clear()
+            self.active_lines.clear()
+            self.compare_nodes_items.clear()
+            self.path_preview.clear()
+            self.path_preview_node_id = 0
+            self.search_rings.clear()
+            self.drawn_tree = tree
 
             # Add inactive tree assets
             for image in tree.graphics_items:
@@ -353,6 +644,11 @@ class TreeView(QGraphicsView):
             for line in tree.lines:
                 self._scene.addItem(line)
 
+            # Add the zoomed out images of the above, if they have been made
+            for tile in tree.lod_tiles:
+                self._scene.addItem(tile)
+            self.update_lod(True)
+
             # Hack to draw class background art, the position data isn't in the tree JSON.
             if self.build.current_class != PlayerClasses.SCION:
                 bkgnd = class_backgrounds[self.build.current_class]
@@ -360,88 +656,47 @@ class TreeView(QGraphicsView):
                     QPixmap(f":/Art/TreeData/{bkgnd['n']}"), bkgnd["x"], bkgnd["y"], Layers.backgrounds
                 )
                 self._char_class_bkgnd_image.filename = bkgnd["n"]
-        else:
-            # don't delete the images for the nodes as they are owned by the relevant Tree() class.
-            # Remove active tree assets
-            for item in self.active_nodes:
-                if item is not None:
-                    self._scene.removeItem(item)
-            # Remove active tree lines
-            for item in self.active_lines:
-                self._scene.removeItem(item)
-                del item
-            # Remove search rings
-            for item in self.compare_nodes_items:
-                self._scene.removeItem(item)
-                del item
-        self.active_nodes.clear()
-        self.active_lines.clear()
-        self.compare_nodes_items.clear()
 
-        # loop though active nodes and add them and their connecting lines
-        lines_db = {}
+        # Active nodes. Only add or remove what changed since last time.
         active_nodes = self.build.current_spec.nodes
+        for node_id in [node_id for node_id in self.active_nodes if node_id not in active_nodes]:
+            remove_node_images(node_id)
         for node_id in active_nodes:
             node = tree.nodes.get(node_id, None)
             if node is not None:
-                if node.active_image is not None:
-                    self.active_nodes.append(node.active_image)
-                    self.active_nodes.append(node.active_overlay_image)
-                    self._scene.addItem(node.active_image)
-                    if node.active_overlay_image is not None:
-                        self._scene.addItem(node.active_overlay_image)
-                if node.masteryEffects:
-                    node.activeEffectImage.build_tooltip(self.build.current_spec.get_mastery_effect(node_id))
-                    self.active_nodes.append(node.activeEffectImage)
-                    self._scene.addItem(node.activeEffectImage)
-                if node.type == "Socket":
-                    jewels = self.build.current_spec.sockets
-                    image = None
-                    if self.items_jewels and node.id in jewels.keys():
-                        jewel_node_id = jewels[node.id]
-                        # if jewel_node_id != 0:
-                        jewel_item = self.items_jewels.get(jewel_node_id, None)
-                        if jewel_item:
-                            sprite = node.sprites.get(jewel_item.sub_type, None)
-                            if sprite is not None:
-                                image = self.add_picture(sprite["handle"], node.x, node.y, Layers.jewels, node, True)
-                                image.setOffset(sprite["ox"], sprite["oy"])
-                                image.item = jewel_item
-                    if image:
-                        self.active_nodes.append(image)
-                    self.active_nodes.append(node.active_overlay_image)
-                    self._scene.addItem(node.active_overlay_image)
-
-                # Draw active lines
-                if node.type not in ("ClassStart", "Mastery"):
-                    in_out_nodes = []
-                    for other_node_id in node.nodes_out.union(node.nodes_in) & active_nodes:
-                        other_node = tree.nodes.get(other_node_id, None)
-                        if (
-                            other_node is not None
-                            and other_node.type not in ("ClassStart", "Mastery")
-                            # This stops lines crossing out of the Ascendancy circles
-                            and node.ascendancyName == other_node.ascendancyName
-                        ):
-                            in_out_nodes.append(other_node)
-
-                    for other_node in in_out_nodes:
-                        # check if we have this line already
-                        ids = sorted([node.id, other_node.id])
-                        index = f"{ids[0]}_{ids[1]}"
-                        if not lines_db.get(index, False):
-                            lines_db[index] = True
-                            line = self.scene().addLine(
-                                node.x,
-                                node.y,
-                                other_node.x,
-                                other_node.y,
-                                QPen(QColor(ColourCodes.CURRENCY.value), 4),
-                            )
-                            line.setAcceptTouchEvents(False)
-                            line.setAcceptHoverEvents(False)
-                            line.setZValue(Layers.active_connectors)
-                            self.active_lines.append(line)
+                look = node_look(node)
+                drawn = self.active_nodes.get(node_id, None)
+                if drawn is not None and drawn[0] == look:
+                    continue
+                remove_node_images(node_id)
+                self.active_nodes[node_id] = (look, add_node_images(node, look))
+
+        # Active lines. Worked out in full (it's only sets of ints), but only the changes touch the scene.
+        wanted_lines = set()
+        for node_id in active_nodes:
+            node = tree.nodes.get(node_id, None)
+            if has_lines(node):
+                for other_node_id in node.nodes_out.union(node.nodes_in) & active_nodes:
+                    other_node = tree.nodes.get(other_node_id, None)
+                    # This stops lines crossing out of the Ascendancy circles
+                    if has_lines(other_node) and node.ascendancyName == other_node.ascendancyName:
+                        wanted_lines.add(node_id < other_node_id and (node_id, other_node_id) or (other_node_id, node_id))
+        for ids in [ids for ids in self.active_lines if ids not in wanted_lines]:
+            self._scene.removeItem(self.active_lines.pop(ids))
+        for ids in wanted_lines:
+            if ids not in self.active_lines:
+                node, other_node = tree.nodes[ids[0]], tree.nodes[ids[1]]
+                line = self.scene().addLine(
+                    node.x,
+                    node.y,
+                    other_node.x,
+                    other_node.y,
+                    QPen(QColor(ColourCodes.CURRENCY.value), 4),
+                )
+                line.setAcceptTouchEvents(False)
+                line.setAcceptHoverEvents(False)
+                line.setZValue(Layers.active_connectors)
+                self.active_lines[ids] = line
 
         # Darken Ascendancy backgrouds.
         current_ascendancy = f"Classes{self.build.ascendClassName}"
@@ -453,18 +708,25 @@ class TreeView(QGraphicsView):
             else:
                 item.setOpacity(dim)
 
-        # Draw spots for comparing trees
+        # Draw spots for comparing trees. Green for nodes only the compare spec has, red for nodes only the current one has.
+        wanted_spots = {}
         if self.win.tree_ui.check_Compare.isChecked() and self.build.compare_spec is not None:
             current = set(self.build.current_spec.nodes)
-            nodes_not_in_compare_spec = [x for x in self.build.compare_spec.nodes if x not in current]
-            for node in nodes_not_in_compare_spec:
-                add_compare_spot(tree.nodes[node], Qt.green, 6)
-
             compare = set(self.build.compare_spec.nodes)
-            nodes_not_in_current_spec = [x for x in self.build.current_spec.nodes if x not in compare]
-            for node in nodes_not_in_current_spec:
-                add_compare_spot(tree.nodes[node], Qt.red, 6)
+            for node_id in compare - current:
+                wanted_spots[node_id] = Qt.green
+            for node_id in current - compare:
+                wanted_spots[node_id] = Qt.red
             # Can add lines too. How to find the node that connects back to an active node ?
             # Possibly add all active and difference nodes ?
             # Add them to Layers.connectors-1 ? To have the active lines overwrite them
+        for node_id in list(self.compare_nodes_items):
+            colour, spot = self.compare_nodes_items[node_id]
+            if wanted_spots.get(node_id, None) != colour:
+                self._scene.removeItem(spot)
+                del self.compare_nodes_items[node_id]
+        for node_id, colour in wanted_spots.items():
+            node = tree.nodes.get(node_id, None)
+            if node_id not in self.compare_nodes_items and node is not None and node.inactive_image is not None:
+                self.compare_nodes_items[node_id] = (colour, add_compare_spot(node, colour, 6))
         # add_tree_images
@@ -21,17 +21,21 @@ from typing import Union
 from pathlib import Path
 import psutil
 
-from PySide6.QtCore import Qt, QPoint, QProcess, Slot
+from PySide6.QtCore import Qt, QPoint, Slot
 from PySide6.QtGui import QAction, QColor, QPalette
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QApplication,
     QCheckBox,
     QComboBox,
+    QFrame,
+    QHeaderView,
     QLabel,
     QLineEdit,
     QMainWindow,
     QPushButton,
     QSpinBox,
+    QTableView,
     QTextEdit,
     QToolButton,
     QWidget,
@@ -43,6 +47,7 @@ from PoB.constants import (
     PlayerClasses,
     bandits,
     bad_text,
+    comparison_stats,
     def_theme,
     empty_gem_dict,
     pantheon_major_gods,
@@ -54,11 +59,15 @@ from PoB.constants import (
 )
 
 from PoB.build import Build
+from PoB.build_index import BuildIndex
+from PoB.calc_cache import CalcCache, fold_deltas
+from PoB.calc_pool import CalcPool
+from PoB.calc_worker import CalcWorker, minion_output_groups, player_output_groups
 from PoB.settings import Settings
 from PoB.pob_file import get_file_info
 from PoB.player import Player
-from PoB.utils import html_colour_text, format_number, is_str_a_number, print_call_stack, str_to_bool, _debug
-from PoB.pob_xml import load_from_xml, save_to_xml
+from PoB.utils import html_colour_text, format_number, print_call_stack, _debug
+from PoB.pob_xml import load_from_xml, save_to_xml, save_to_xml_string
 from dialogs.browse_file_dialog import BrowseFileDlg
 from dialogs.export_dialog import ExportDlg
 from dialogs.import_dialog import ImportDlg
@@ -71,6 +80,7 @@ from widgets.listbox import ListBox
 from widgets.notes_ui import NotesUI
 from widgets.player_stats import PlayerStats
 from widgets.skills_ui import SkillsUI
+from widgets.stats_model import StatsModel
 from widgets.tree_ui import TreeUI
 from widgets.tree_view import TreeView
 from widgets.ui_utils import set_combo_index_by_data
@@ -118,6 +128,21 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         atexit.register(self.exit_handler)
         self.setWindowTitle(program_title)  # Do not translate
 
+        # Long-lived luajit process. Lua PoB is loaded once and reused for every calculation. Started once the UI is ready.
+        self.calc_worker = CalcWorker(self.settings, self.do_calcs_callback)
+        # luajit processes for batches of what-if calculations (node power, item comparisons). Started when first needed.
+        self.calc_pool = CalcPool(self.settings)
+        # Class and level of build files, for the recent builds menu and the Open/Save dialogs
+        self.build_index = BuildIndex(self.settings)
+        # Outputs of earlier calcs, so a build calculated before shows its stats without waiting for luaPoB.
+        self.calc_cache = CalcCache(self.settings)
+        # The cache key of the last full build sent, the deltas sent since, and the key of the output to expect.
+        self.calc_build_key = ""
+        self.calc_delta_state = {}
+        self.calc_key = ""
+        # True if the output for calc_key has been shown from the cache.
+        self.calc_cached = False
+
         # Start with an empty build. This ensures there are values for widgets as they set themselves up.
         self.build = Build(self.settings, self)
         # self.current_filename = self.settings.build_path
@@ -205,6 +230,26 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # These two should point to the same pointer, so further updates through items_ui will update both.
         self.gview_Tree.items_jewels = self.items_ui.jewels
 
+        # Swap the Statistics text box for a table, so a calc only redraws the stats that changed.
+        self.stats_model = StatsModel(self.settings)
+        self.tableview_Statistics = QTableView(self.frame_Left)
+        self.tableview_Statistics.setModel(self.stats_model)
+        self.tableview_Statistics.setMinimumSize(self.textedit_Statistics.minimumSize())
+        self.tableview_Statistics.setFont(self.textedit_Statistics.font())
+        self.tableview_Statistics.setFocusPolicy(Qt.NoFocus)
+        self.tableview_Statistics.setFrameShape(QFrame.NoFrame)
+        self.tableview_Statistics.setSelectionMode(QAbstractItemView.NoSelection)
+        self.tableview_Statistics.setShowGrid(False)
+        self.tableview_Statistics.setWordWrap(False)
+        self.tableview_Statistics.horizontalHeader().hide()
+        self.tableview_Statistics.verticalHeader().hide()
+        self.tableview_Statistics.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tableview_Statistics.verticalHeader().setDefaultSectionSize(self.tableview_Statistics.fontMetrics().height() + 2)
+        self.tableview_Statistics.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tableview_Statistics.horizontalHeader().setStretchLastSection(True)
+        self.glayout_LeftFrame.replaceWidget(self.textedit_Statistics, self.tableview_Statistics)
+        self.textedit_Statistics.hide()
+
         # Add our FlowLayout to Config tab
         self.layout_config = FlowLayout(None, 0)
         self.frame_Config.setLayout(self.layout_config)
@@ -298,8 +343,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Start the statusbar self updating
         self.update_status_bar()
 
-        self.calc_process = None
-        self.current_stats = []  # list of lines from the luajit. Used for future comparisons.
+        self.calc_worker.start()
+        self.current_stats = {}  # mainOutput from the luajit. Used for future comparisons.
         # self.do_calcs()
 
         # init
@@ -439,13 +484,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         for idx, full_path in enumerate(recent_builds):
 
             if full_path is not None and full_path != "":
-                text, class_name = get_file_info(self.settings, full_path, max_length, 70, menu=True)
+                header = self.build_index.header(full_path)
+                text, class_name = get_file_info(self.settings, full_path, max_length, 70, menu=True, header=header)
                 # print(f"set_recent_builds_menu_items: {class_name=}, {full_path=}")
                 ql = QLabel(text)
                 _action = QWidgetAction(self.menu_Builds)
                 _action.setDefaultWidget(ql)
                 self.menu_Builds.addAction(_action)
                 make_connection(full_path)
+        self.build_index.save()
 
     def add_recent_build_menu_item(self):
         """
@@ -497,6 +544,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             # don't disturb the previous settings if you are maximized.
             self.settings.size = self.size()
         self.settings.write()
+        self.calc_worker.stop()
+        self.calc_pool.stop()
+        self.build.tree_loader.stop()
+        self.build_index.stop()
+        self.calc_cache.save()
         # Logic for checking we need to save and save if needed, goes here...
         # filePtr = open("edit.html", "w")
         # try:
@@ -682,6 +734,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # print(f"build_loader: {filename_or_dict}, {imported_name=}")
         self.alerting = False
         self.player.clear()
+        self.stats_model.clear()
         self.config_ui.initial_startup_setup()
         new = filename_or_dict == "Default"
         self.settings.open_build = ""
@@ -736,8 +789,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.alerting = True
 
-        # Do calcs. Needs to be nearly last in this function
-        # self.do_calcs()
+        # Do calcs. Needs to be nearly last in this function. If this build has been calculated before, its stats show straight away.
+        self.do_calcs()
         self.build.save()
         # save_to_xml("test.xml", self.build.json)
 
@@ -1047,6 +1100,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         # Focus a Widget
         tab_focus.get(index).setFocus()
+        if self.tab_main.widget(index) == self.tab_Items:
+            self.items_ui.load_import_items()
         # update the build
         self.build.viewMode = self.tab_main.tabWhatsThis(self.tab_main.currentIndex())
         # Turn on / off actions as needed
@@ -1112,6 +1167,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         :return: N/A
         """
         self.player.current_skill = self.skills_ui.gems_by_name_or_id.get(_skill_text, None)
+        # Only ask luaPoB for the minion's stats when there is a minion to show
+        has_minion = "minion" in self.player.skill_flags
+        self.calc_worker.output_groups = has_minion and minion_output_groups or player_output_groups
+        # Which stats to show, and how, only changes with the main skill
+        self.stats_model.set_skill(self.player.skill_flags)
         self.do_calcs()
 
     def load_main_skill_combo(self, _list: list) -> None:
@@ -1228,123 +1288,91 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Leave this on so we can see how many times do_calcs is called in a row. Ideally only once.
         # But changing trees ran five times on tree change.
         _debug(f"do_calcs: {self.alerting=}")
-        if not self.alerting or self.calc_process is not None:
-            # Don't keep calculating as a build is loaded or a thread running
+        if not self.alerting:
+            # Don't keep calculating as a build is loaded
             return
 
+        # Calls in quick succession are coalesced into one calc, and a result for an older build is never shown.
+        self.calc_worker.request(self.calc_xml)
+
+    def calc_xml(self) -> str:
+        """
+        Called by calc_worker when a coalesced do_calcs is sent, so the build is only written once for a burst of calls.
+        :return: str: the build as xml, with the current config.
+        """
         self.config_ui.save()
-        save_to_xml(f"{self.settings._exe_dir}/lua/src/Builds/stats.xml", self.build.json, True)
+        # Items added or edited since the last full build are only in items_ui until it is saved
+        self.items_ui.save()
+        self.items_ui.calc_item_ids = set(self.items_ui.itemlist_by_id)
+        # Tree changes are only in the current spec until it is saved. The cache key is made from what luaPoB is sent.
+        self.build.current_spec.save()
+        self.calc_build_key = self.calc_cache.build_key(self.build.json, self.calc_worker.output_groups)
+        self.calc_delta_state = {}
+        self.show_cached_calc()
+        return save_to_xml_string(self.build.json, True)
+
+    def show_cached_calc(self):
+        """
+        If the build luaPoB is about to calculate has been calculated before, show those stats now.
+        The build is still sent to luaPoB, as node power, item comparisons and deltas need it to hold the current build.
+        :return: N/A
+        """
+        self.calc_key = self.calc_cache.key(self.calc_build_key, self.calc_delta_state)
+        output = self.calc_cache.get(self.calc_key)
+        self.calc_cached = output is not None
+        if self.calc_cached:
+            _debug(f"show_cached_calc: {self.calc_cache.report()}")
+            self.show_calc_output(output)
 
-        # self.thread_data = []
-        # self.calc_process = threading.Thread(target=self.do_calcs_thread(self.thread_data), daemon=True, name="PyPoB Do Calcs")
-        self.calc_process = QProcess()
-        _debug(f"pre_start: {self.alerting=}")
-        self.calc_process.finished.connect(self.do_calcs_callback)
-        self.calc_process.setWorkingDirectory(f"{self.settings._exe_dir}/lua/src")
-        self.calc_process.start(f"{self.settings._exe_dir}/lua/runtime/luajit.exe", ["../PoB_jit.lua"])
+    def do_calcs_delta(self, deltas: list) -> None:
+        """
+        Recalculate after a small change (node, item in a slot, config input), sending only the change to luaPoB.
+        Falls back to a full do_calcs if luaPoB doesn't hold the build yet.
+        :param deltas: list of dicts from calc_worker's node_delta(), item_delta() or config_delta().
+        :return: N/A
+        """
+        _debug(f"do_calcs_delta: {self.alerting=}, {deltas=}")
+        if not self.alerting:
+            return
+        if not self.calc_worker.calc_delta(deltas):
+            self.do_calcs()
+        elif not self.calc_worker.coalesce_timer.isActive():
+            # Otherwise the deltas are part of a full build that is yet to be made
+            fold_deltas(self.calc_delta_state, deltas)
+            self.show_cached_calc()
 
-    @Slot()
-    def do_calcs_callback(self) -> None:
-        """Callback function from luajit Process started by do_calcs"""
+    def do_calcs_callback(self, output: dict) -> None:
+        """
+        Callback function from the CalcWorker started by do_calcs
+        :param output: dict: mainOutput from Lua PoB. MainHand, OffHand and Minion are nested dicts.
+        :return: N/A
+        """
+        _debug(f"do_calcs_callback: {self.calc_worker.metrics_report()}")
+        self.calc_cache.put(self.calc_key, output)
+        # If the cache was right, this output is already shown. Showing it again would clear the changes since the last calc.
+        if not self.calc_cached or output != self.current_stats:
+            self.show_calc_output(output)
+        self.calc_cached = False
 
-        def get_resist_overcap_value(res_type):
-            """
-            Get a resists over cap value andreturn it if it's not 0
-            :param res_type: str: Fire|Cold|Lightning
-            :return: str: formate string for adding to the main Res value
-            """
-            _value = self.player.stats.get(f"{res_type}ResistOverCap", 0)
-            if _value > 0:
-                _value_str = format_number(_value, " (%d%%)", self.settings)
-                return html_colour_text("DARKGRAY", _value_str)
-            else:
-                return ""
+        # Node power and item comparisons depend on the whole build, so they are out of date now.
+        #   They are left until now, even if the stats came from the cache, as they are worked out by the luaPoB that just finished.
+        self.tree_ui.refresh_node_power()
+        if self.tab_main.currentWidget() == self.tab_Items and self.combo_ItemsImportSort.currentData() in comparison_stats:
+            self.items_ui.compare_import_items()
 
-        _debug(f"do_calcs_callback:")
-        self.current_stats = bytes(self.calc_process.readAllStandardOutput()).decode("utf8").splitlines()
+    def show_calc_output(self, output: dict) -> None:
+        """
+        Show the stats of a calc, from luaPoB or the cache.
+        :param output: dict: mainOutput from Lua PoB. MainHand, OffHand and Minion are nested dicts.
+        :return: N/A
+        """
+        self.current_stats = output
 
-        # Add the lines with ' = ' in them to player Stats
-        self.player.clear()
-        for line in [line for line in self.current_stats if "=" in line]:
-            key, value = line.strip().split(" = ")
-            if value and is_str_a_number(value):
-                if "." in value:
-                    self.player.stats[key] = float(value)
-                else:
-                    self.player.stats[key] = int(value)
-            elif value and value[1:].lower() in ("t", "f"):
-                self.player.conditions[key] = str_to_bool(value)
-            if "Minion." in key:
-                # self.minion.stats[key.replace('Minion.','')] = value
-                pass
-            elif "MainHand." in key:
-                self.player.mainhand[key.replace("MainHand.", "")] = value
-            elif "OffHand." in key:
-                self.player.offhand[key.replace("OffHand.", "")] = value
-        # print(self.player.stats)
-
-        # Now show them
-        # print(f"{self.player.current_skill=}")
-        self.textedit_Statistics.clear()
-        just_added_blank = False  # Prevent duplicate blank lines. Faster than investigating the last line added of a QLineEdit.
-        for stat_name in player_stats_list:
-            if stat_name in ("Speed", "HitChance"):
-                # ToDo: What are the other entries for ??
-                # Speed has attack, spell and "". How do we differentiate?
-                stat = deepcopy(player_stats_list[stat_name]["attack"])
-            elif stat_name in ("ImpaleDPS", "WithImpaleDPS"):
-                stat = deepcopy(player_stats_list[stat_name]["showAverage"])
-            else:
-                stat = deepcopy(player_stats_list[stat_name])
-            # print(f"{stat_name=}, {type(stat)=}, {stat.values()=}")
-            if "blank" in stat_name:
-                if not just_added_blank:
-                    self.textedit_Statistics.append("")
-                    just_added_blank = True
-            # elif stat.get("label", 0) == 0:
-            # ToDo: Need to use the flag attribute to separate
-            # stat = list(stat.values())[0]
-            else:
-                # Do we have this stat in our stats dict
-                stat_value = self.player.stats.get(stat_name, bad_text)
-                # print(f"{stat_name=}, {stat_value=}, {stat.get('condition', bad_text)=}")
-                if stat_value != bad_text:
-                    # Work out if we can show this stat
-                    stat_condition = stat.get("condition", bad_text)
-                    if stat_condition != bad_text:
-                        if stat_condition == "Y":
-                            display, stat = self.player.stat_conditions(
-                                stat_name, stat_value, stat, self.player.current_skill.get("baseFlags", [])
-                            )
-                        else:
-                            display = self.player.conditions.get(stat.get("condition"), False)
-                    else:
-                        display = not stat.get("hideStat", False) and stat_value != 0
-                    if stat_name == "LightningMaximumHitTaken" and not display:
-                        # Special Case for (Lightning,Fire,Cold)MaximumHitTaken are all the same
-                        display = (
-                            self.player.stats.get("LightningMaximumHitTaken", bad_text)
-                            == self.player.stats.get("FireMaximumHitTaken", bad_text)
-                            == self.player.stats.get("ColdMaximumHitTaken", bad_text)
-                        )
-                        stat["label"] = "Elemental Max Hit"
-
-                    if display:
-                        _colour = stat.get("colour", self.settings.qss_default_text)
-                        _fmt = stat.get("fmt", "%d")
-                        _str_value = format_number(stat_value, _fmt, self.settings, True)
-                        match stat_name:
-                            case "FireResist" | "ColdResist" | "LightningResist":
-                                _extra_value = get_resist_overcap_value(stat_name.replace("Resist", ""))
-                            case _:
-                                _extra_value = ""
-                        self.textedit_Statistics.append(
-                            f'<span style="white-space: pre; color:{_colour};">{stat["label"]:>24}:</span> {_str_value} {_extra_value}'
-                        )
-                        just_added_blank = False
-            self.calcs_active = False
-            self.calc_process = None
-            self.calcs_active = False
+        # Numbers go to player Stats, booleans to player Conditions
+        self.player.set_output(self.current_stats)
+
+        # Now show them. Only the rows that changed are redrawn.
+        self.stats_model.update(self.player)
 
     @Slot()
     def do_calcs_difference_callback(self) -> None:
@@ -1393,7 +1421,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             else:
                 # Do we have this stat in our stats dict
                 stat_value = self.player.stats.get(stat_name, bad_text)
-                if stat_value != bad_text and self.player.stat_conditions(stat_name, stat_value):
+                if stat_value != bad_text and self.player.stat_condition(stat_name, stat_value):
                     _colour = stat.get("colour", self.settings.qss_default_text)
                     _fmt = stat.get("fmt", "%d")
                     _str_value = format_number(stat_value, _fmt, self.settings, True)